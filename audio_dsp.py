@@ -0,0 +1,283 @@
+"""
+🎛️ Audio DSP (NumPy)
+====================
+Vectorised replacements for the pydub effects used on the voice-over.
+
+Samples are float32 arrays in [-1, 1], shaped (n,) or (n, channels).
+
+- IIR filters are applied in the frequency domain (zero-padded FFT with
+  the filter's transfer function), which is exact linear filtering with
+  no per-sample Python loop
+- pydub-compatible one-pole low/high-pass designs, plus RBJ biquads
+- Peak normalisation
+- Block-wise RMS compressor that follows pydub's attack/release logic
+  with one state update per millisecond instead of per sample
+- Resampling-based pitch shift
+
+deep_voice_chain() reproduces the pydub "deep voice" chain the
+voice-over used to go through.
+"""
+
+import math
+
+import numpy as np
+
+# Bump whenever deep_voice_chain's output changes (used in cache keys)
+DSP_CHAIN_VERSION = 1
+
+# --- Deep voice settings ---
+DEEP_VOICE_OCTAVES = -0.15
+DEEP_VOICE_RATE = 44100
+DEEP_VOICE_LOW_PASS = 3800
+DEEP_VOICE_HIGH_PASS = 85
+DEEP_VOICE_THRESHOLD_DB = -20.0
+DEEP_VOICE_RATIO = 3.0
+
+# Impulse-response energy below this is treated as fully decayed
+IIR_TAIL_TOLERANCE = 1e-7
+
+
+def db_to_gain(db):
+    return 10.0 ** (db / 20.0)
+
+
+def gain_to_db(gain):
+    return 20.0 * math.log10(gain)
+
+
+def to_float(samples, sample_width=2):
+    """Integer PCM array -> float32 in [-1, 1]."""
+    return np.asarray(samples, dtype=np.float32) / float(1 << (8 * sample_width - 1))
+
+
+def to_int16(samples):
+    """Float PCM in [-1, 1] -> int16."""
+    return (np.clip(samples, -1.0, 1.0) * 32767.0).astype(np.int16)
+
+
+def to_channels(samples, channels=2):
+    """(n,) or (n, c) PCM -> (n, channels), duplicating a mono track."""
+    samples = np.asarray(samples, dtype=np.float32)
+    if samples.ndim == 1:
+        samples = samples[:, None]
+    if samples.shape[1] == channels:
+        return samples
+    if samples.shape[1] == 1:
+        return np.repeat(samples, channels, axis=1)
+    return np.repeat(samples.mean(axis=1, keepdims=True), channels, axis=1)
+
+
+def fit_length(samples, length):
+    """Trim or zero-pad a PCM buffer to `length` samples."""
+    if len(samples) >= length:
+        return samples[:length]
+    pad = np.zeros((length - len(samples),) + samples.shape[1:], dtype=samples.dtype)
+    return np.concatenate([samples, pad])
+
+
+# --- Filters ---
+def lowpass_coeffs(cutoff, rate):
+    """One-pole RC low-pass (same design as pydub's low_pass_filter)."""
+    rc = 1.0 / (cutoff * 2 * math.pi)
+    dt = 1.0 / rate
+    alpha = dt / (rc + dt)
+    return [alpha], [1.0, -(1.0 - alpha)]
+
+
+def highpass_coeffs(cutoff, rate):
+    """One-pole RC high-pass (same design as pydub's high_pass_filter)."""
+    rc = 1.0 / (cutoff * 2 * math.pi)
+    dt = 1.0 / rate
+    alpha = rc / (rc + dt)
+    return [alpha, -alpha], [1.0, -alpha]
+
+
+def biquad_coeffs(kind, cutoff, rate, q=1 / math.sqrt(2)):
+    """RBJ cookbook biquad ("lowpass" or "highpass"), normalised so a[0] = 1."""
+    w0 = 2 * math.pi * cutoff / rate
+    cos_w0 = math.cos(w0)
+    alpha = math.sin(w0) / (2 * q)
+    if kind == "lowpass":
+        b = [(1 - cos_w0) / 2, 1 - cos_w0, (1 - cos_w0) / 2]
+    elif kind == "highpass":
+        b = [(1 + cos_w0) / 2, -(1 + cos_w0), (1 + cos_w0) / 2]
+    else:
+        raise ValueError(f"Unknown biquad type: {kind}")
+    a = [1 + alpha, -2 * cos_w0, 1 - alpha]
+    return [v / a[0] for v in b], [v / a[0] for v in a]
+
+
+def _iir_tail(a):
+    """Samples until the filter's impulse response has decayed."""
+    poles = np.abs(np.roots(a)) if len(a) > 1 else np.array([0.0])
+    radius = float(poles.max()) if poles.size else 0.0
+    if radius <= 0.0:
+        return len(a)
+    if radius >= 1.0:
+        raise ValueError("Unstable IIR filter")
+    return int(math.ceil(math.log(IIR_TAIL_TOLERANCE) / math.log(radius))) + len(a)
+
+
+def iir_filter(samples, b, a):
+    """
+    Apply the IIR filter b/a along axis 0, via FFT.
+
+    Equivalent to a direct-form recursion with zero initial state; the
+    signal is zero-padded by the impulse-response tail so the circular
+    convolution does not wrap.
+    """
+    x = np.asarray(samples, dtype=np.float64)
+    n = x.shape[0]
+    if n == 0:
+        return x.astype(np.float32)
+
+    n_fft = 1 << (n + _iir_tail(a) - 1).bit_length()
+    response = np.fft.rfft(b, n_fft) / np.fft.rfft(a, n_fft)
+    if x.ndim > 1:
+        response = response[:, None]
+
+    y = np.fft.irfft(np.fft.rfft(x, n_fft, axis=0) * response, n_fft, axis=0)[:n]
+    return y.astype(np.float32)
+
+
+def low_pass(samples, cutoff, rate):
+    return iir_filter(samples, *lowpass_coeffs(cutoff, rate))
+
+
+def high_pass(samples, cutoff, rate):
+    return iir_filter(samples, *highpass_coeffs(cutoff, rate))
+
+
+# --- Dynamics ---
+def normalize_peak(samples, headroom=0.1):
+    """Scale so the peak sits `headroom` dB below full scale (like pydub's normalize)."""
+    peak = float(np.max(np.abs(samples))) if len(samples) else 0.0
+    if peak == 0.0:
+        return samples
+    return (samples * (db_to_gain(-headroom) / peak)).astype(np.float32)
+
+
+def compress(samples, rate, threshold=-20.0, ratio=4.0, attack=5.0, release=50.0,
+             block_ms=1.0):
+    """
+    Block-wise RMS compressor.
+
+    Follows pydub's compress_dynamic_range: RMS over the preceding `attack`
+    ms, attenuation ramping up over `attack` and down over `release`, but
+    with one state update per `block_ms` block and the gain interpolated
+    between block centres.
+
+    Args:
+        samples: Float PCM, (n,) or (n, channels)
+        rate: Sample rate
+        threshold: Threshold in dBFS
+        ratio: Compression ratio
+        attack: Attack in ms
+        release: Release in ms
+        block_ms: Gain computer resolution in ms
+
+    Returns:
+        Compressed float32 samples
+    """
+    x = np.asarray(samples, dtype=np.float32)
+    n = x.shape[0]
+    if n == 0:
+        return x
+
+    thresh_rms = db_to_gain(threshold)
+    look = max(1, int(rate * attack / 1000.0))
+    block = max(1, int(rate * block_ms / 1000.0))
+    attack_frames = rate * attack / 1000.0
+    release_frames = rate * release / 1000.0
+
+    # Sliding mean-square over [i - look, i) for each block start, via cumsum
+    power = x.astype(np.float64) ** 2
+    if power.ndim > 1:
+        power = power.mean(axis=1)
+    cumulative = np.concatenate(([0.0], np.cumsum(power)))
+    starts = np.arange(0, n, block)
+    lo = np.maximum(starts - look, 0)
+    counts = np.maximum(starts - lo, 1)
+    rms = np.sqrt((cumulative[starts] - cumulative[lo]) / counts)
+
+    with np.errstate(divide="ignore"):
+        over_db = np.where(rms > 0, 20.0 * np.log10(rms / thresh_rms), 0.0)
+    max_attenuation = (1.0 - 1.0 / ratio) * np.maximum(over_db, 0.0)
+    above = rms > thresh_rms
+    inc = max_attenuation * (block / attack_frames)
+    dec = max_attenuation * (block / release_frames)
+
+    # Attack/release state machine - one step per block
+    attenuation = np.empty(len(starts))
+    att = 0.0
+    for i in range(len(starts)):
+        if above[i] and att <= max_attenuation[i]:
+            att = min(att + inc[i], max_attenuation[i])
+        else:
+            att = max(att - dec[i], 0.0)
+        attenuation[i] = att
+
+    centers = np.minimum(starts + block / 2.0, n - 1)
+    gain = np.interp(np.arange(n), centers, 10.0 ** (-attenuation / 20.0)).astype(np.float32)
+    if x.ndim > 1:
+        gain = gain[:, None]
+    return x * gain
+
+
+# --- Pitch ---
+def resample(samples, rate, target_rate):
+    """Linear-interpolation resampling along axis 0."""
+    x = np.asarray(samples, dtype=np.float32)
+    if rate == target_rate or x.shape[0] == 0:
+        return x
+    n_out = int(round(x.shape[0] * target_rate / rate))
+    positions = np.arange(n_out) * (rate / target_rate)
+    source = np.arange(x.shape[0])
+    if x.ndim == 1:
+        return np.interp(positions, source, x).astype(np.float32)
+    return np.stack(
+        [np.interp(positions, source, x[:, c]) for c in range(x.shape[1])], axis=1
+    ).astype(np.float32)
+
+
+def pitch_shift(samples, rate, octaves, target_rate=None):
+    """
+    Shift pitch by playing the samples at a different rate, then resampling
+    to `target_rate` (tempo changes with pitch, as in the pydub version).
+
+    Returns:
+        (samples, target_rate)
+    """
+    target_rate = target_rate or rate
+    shifted_rate = int(rate * (2.0 ** octaves))
+    return resample(samples, shifted_rate, target_rate), target_rate
+
+
+# --- Voice chain ---
+def deep_voice_time_scale(rate):
+    """How much deep_voice_chain stretches time for input at `rate` (the pitch shift slows it down)."""
+    return rate / int(rate * (2.0 ** DEEP_VOICE_OCTAVES))
+
+
+def deep_voice_chain(samples, rate):
+    """
+    Gentle deepening + EQ + normalise + compress for the voice-over.
+
+    Args:
+        samples: Float PCM, (n,) or (n, channels)
+        rate: Sample rate of `samples`
+
+    Returns:
+        (samples, rate): float32 PCM at DEEP_VOICE_RATE
+    """
+    # Gentle deepening for natural sound
+    voice, rate = pitch_shift(samples, rate, DEEP_VOICE_OCTAVES, DEEP_VOICE_RATE)
+
+    # Balanced EQ for clarity and naturalness
+    voice = low_pass(voice, DEEP_VOICE_LOW_PASS, rate)
+    voice = high_pass(voice, DEEP_VOICE_HIGH_PASS, rate)
+
+    # Normalize and compress for consistency
+    voice = normalize_peak(voice)
+    voice = compress(voice, rate, threshold=DEEP_VOICE_THRESHOLD_DB, ratio=DEEP_VOICE_RATIO)
+    return voice, rate
@@ -0,0 +1,198 @@
+"""
+🎚️ Voice + Music Mixer
+======================
+Builds the finished reel soundtrack from NumPy buffers in one pass,
+before encoding starts:
+
+1. Voice envelope: block RMS, held and smoothed (zero-phase, so the duck
+   starts slightly before the voice does)
+2. Sidechain ducking: the music drops by up to DUCK_DEPTH_DB while the
+   voice is above DUCK_THRESHOLD_DB and swells back in the pauses
+3. Mix, then a look-ahead peak limiter keeps the sum under the ceiling
+
+Gains are computed per block (a few ms) and interpolated per sample, so
+nothing loops over samples in Python.
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from audio_dsp import db_to_gain, fit_length, iir_filter, lowpass_coeffs, to_channels
+from encoder import AUDIO_FPS
+
+# --- Mix settings ---
+MUSIC_GAIN = 0.3          # Music level under the voice before ducking (old flat mix)
+DUCK_DEPTH_DB = 6.0       # Extra music attenuation while the voice speaks
+DUCK_THRESHOLD_DB = -40.0 # Voice level where ducking starts
+DUCK_KNEE_DB = 10.0       # Range over which ducking fades in
+DUCK_HOLD_MS = 200.0      # Bridge short gaps between words
+DUCK_SMOOTH_MS = 80.0     # Duck attack/release smoothing
+LIMITER_CEILING_DB = -1.0
+LIMITER_LOOKAHEAD_MS = 5.0
+LIMITER_RELEASE_MS = 60.0
+ENVELOPE_BLOCK_MS = 10.0
+LIMITER_BLOCK_MS = 1.0
+
+
+def _block_size(rate, block_ms):
+    return max(1, int(rate * block_ms / 1000.0))
+
+
+def _blocks(values, block):
+    """Reshape a per-sample signal to (n_blocks, block), zero-padding the last block."""
+    n_blocks = -(-len(values) // block)
+    padded = np.zeros(n_blocks * block, dtype=np.float32)
+    padded[:len(values)] = values
+    return padded.reshape(n_blocks, block)
+
+
+def _block_rms(samples, block):
+    """RMS per block (channels averaged)."""
+    power = np.square(samples, dtype=np.float32)
+    if power.ndim > 1:
+        power = power.mean(axis=1)
+    return np.sqrt(_blocks(power, block).mean(axis=1))
+
+
+def _block_peak(samples, block):
+    """Absolute peak per block (across channels)."""
+    peak = np.abs(samples)
+    if peak.ndim > 1:
+        peak = peak.max(axis=1)
+    return _blocks(peak, block).max(axis=1)
+
+
+def _sliding(values, width, reducer):
+    """Centred sliding max/min with edge padding."""
+    width = max(1, int(width))
+    if width == 1:
+        return values
+    padded = np.pad(values, (width // 2, width - 1 - width // 2), mode="edge")
+    return reducer(sliding_window_view(padded, width), axis=1)
+
+
+def _smooth(values, time_ms, block_ms):
+    """Zero-phase one-pole smoothing of a per-block control signal."""
+    if time_ms <= 0 or len(values) < 2:
+        return values
+    block_rate = 1000.0 / block_ms
+    b, a = lowpass_coeffs(1000.0 / (2 * np.pi * time_ms), block_rate)
+    # Edge padding of a few time constants avoids ramping in from zero
+    pad = int(5 * time_ms / block_ms) + 1
+    padded = np.pad(values, pad, mode="edge")
+    forward = iir_filter(padded, b, a)
+    both = iir_filter(forward[::-1], b, a)[::-1]
+    return both[pad:pad + len(values)]
+
+
+def _per_sample(gains, block, length):
+    """Interpolate per-block gains to per-sample gains (block centres)."""
+    centers = np.arange(len(gains)) * block + block / 2.0
+    return np.interp(np.arange(length), centers, gains).astype(np.float32)
+
+
+def voice_envelope(voice, rate=AUDIO_FPS, hold=DUCK_HOLD_MS, smooth=DUCK_SMOOTH_MS,
+                   block_ms=ENVELOPE_BLOCK_MS):
+    """
+    Smoothed RMS envelope of the voice, one value per block.
+
+    Args:
+        voice: Float PCM, (n,) or (n, channels)
+        rate: Sample rate
+        hold: Peak-hold window in ms (bridges gaps between words)
+        smooth: Smoothing time in ms
+        block_ms: Block size in ms
+
+    Returns:
+        Linear RMS level per block
+    """
+    block = _block_size(rate, block_ms)
+    rms = _block_rms(np.asarray(voice, dtype=np.float32), block)
+    held = _sliding(rms, hold / block_ms, np.max)
+    return np.maximum(_smooth(held, smooth, block_ms), 0.0)
+
+
+def ducking_gain(voice, length, rate=AUDIO_FPS, depth=DUCK_DEPTH_DB,
+                 threshold=DUCK_THRESHOLD_DB, knee=DUCK_KNEE_DB,
+                 hold=DUCK_HOLD_MS, smooth=DUCK_SMOOTH_MS, block_ms=ENVELOPE_BLOCK_MS):
+    """
+    Per-sample music gain (0-1] that dips while the voice is active.
+
+    Returns:
+        (length,) float32 gain
+    """
+    # Past the end of the voice the music comes back up
+    voice = fit_length(np.asarray(voice, dtype=np.float32), length)
+    envelope = voice_envelope(voice, rate, hold, smooth, block_ms)
+    level_db = 20.0 * np.log10(np.maximum(envelope, 1e-9))
+    amount = np.clip((level_db - threshold) / knee, 0.0, 1.0)
+    gains = _smooth(db_to_gain(-depth * amount), smooth, block_ms)
+    return _per_sample(gains, _block_size(rate, block_ms), length)
+
+
+def limit(samples, rate=AUDIO_FPS, ceiling=LIMITER_CEILING_DB,
+          lookahead=LIMITER_LOOKAHEAD_MS, release=LIMITER_RELEASE_MS,
+          block_ms=LIMITER_BLOCK_MS):
+    """
+    Look-ahead peak limiter.
+
+    The gain each block needs to stay under the ceiling is spread over the
+    look-ahead window (so it ramps down before a peak), smoothed for the
+    release, and never allowed above what any block needs.
+
+    Returns:
+        Limited float32 samples
+    """
+    x = np.asarray(samples, dtype=np.float32)
+    if len(x) == 0:
+        return x
+    ceiling_gain = db_to_gain(ceiling)
+    block = _block_size(rate, block_ms)
+
+    peaks = _block_peak(x, block)
+    needed = np.minimum(1.0, ceiling_gain / np.maximum(peaks, 1e-9))
+    if needed.min() >= 1.0:
+        return x
+
+    window = 2 * int(lookahead / block_ms) + 3
+    guarded = _sliding(needed, window, np.min)
+    gains = np.minimum(_smooth(guarded, release, block_ms), guarded)
+
+    gain = _per_sample(gains, block, len(x))
+    if x.ndim > 1:
+        gain = gain[:, None]
+    return np.clip(x * gain, -ceiling_gain, ceiling_gain)
+
+
+def mix_voice_music(voice=None, music=None, length=None, rate=AUDIO_FPS,
+                    music_gain=MUSIC_GAIN, duck_depth=DUCK_DEPTH_DB, channels=2):
+    """
+    Mix voice and music into one finished PCM track.
+
+    Args:
+        voice: Voice PCM (mono or multi-channel) or None
+        music: Music PCM (already looped/trimmed, unity gain) or None
+        length: Output length in samples (default: longest input)
+        rate: Sample rate of both inputs
+        music_gain: Music level under the voice (music alone plays at full level)
+        duck_depth: Extra ducking in dB while the voice is active
+        channels: Output channel count
+
+    Returns:
+        (length, channels) float32 PCM, or None without any input
+    """
+    tracks = [t for t in (voice, music) if t is not None]
+    if not tracks:
+        return None
+    if length is None:
+        length = max(len(t) for t in tracks)
+
+    if voice is None:
+        return limit(fit_length(to_channels(music, channels), length), rate)
+
+    mix = fit_length(to_channels(voice, channels), length).copy()
+    if music is not None:
+        music = fit_length(to_channels(music, channels), length)
+        gain = ducking_gain(voice, length, rate, depth=duck_depth) * np.float32(music_gain)
+        mix += music * gain[:, None]
+    return limit(mix, rate)
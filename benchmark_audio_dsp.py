@@ -0,0 +1,87 @@
+"""
+⏱️ Deep Voice DSP Benchmark
+===========================
+Times the old pydub "deep voice" chain against the vectorised NumPy
+chain (audio_dsp.deep_voice_chain) on the same synthetic voice-like
+signal and reports the speedup and how far the outputs differ.
+
+Usage:
+    python benchmark_audio_dsp.py [seconds]
+"""
+
+import sys
+import time
+
+import numpy as np
+from pydub import AudioSegment
+from pydub.effects import compress_dynamic_range, normalize
+
+from audio_dsp import deep_voice_chain, to_float, to_int16
+
+SOURCE_RATE = 24000  # edge-tts output rate
+
+
+def synthetic_voice(seconds, rate=SOURCE_RATE, seed=7):
+    """Harmonic-rich, syllable-modulated mono signal (int16)."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * rate)) / rate
+    pitch = 140 + 25 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / rate
+    voice = sum(np.sin(k * phase) / k for k in range(1, 12))
+    syllables = np.clip(np.sin(2 * np.pi * 3.5 * t), 0, None) ** 2
+    loudness = 0.2 + 0.8 * (rng.random(int(seconds) + 1)[t.astype(int)])
+    signal = voice * syllables * loudness + 0.01 * rng.standard_normal(len(t))
+    signal /= np.abs(signal).max() * 1.5
+    return (signal * 32767).astype(np.int16)
+
+
+def pydub_chain(sound):
+    """The original pydub chain of the voice-over."""
+    octaves = -0.15
+    new_sample_rate = int(sound.frame_rate * (2.0 ** octaves))
+    deep_sound = sound._spawn(sound.raw_data, overrides={'frame_rate': new_sample_rate})
+    deep_sound = deep_sound.set_frame_rate(44100)
+    deep_sound = deep_sound.low_pass_filter(3800).high_pass_filter(85)
+    deep_sound = normalize(deep_sound)
+    deep_sound = compress_dynamic_range(deep_sound, threshold=-20.0, ratio=3.0)
+    return deep_sound
+
+
+def numpy_chain(sound):
+    samples = to_float(sound.get_array_of_samples(), sound.sample_width)
+    deep, rate = deep_voice_chain(samples, sound.frame_rate)
+    return to_int16(deep), rate
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 15.0
+    pcm = synthetic_voice(seconds)
+    sound = AudioSegment(pcm.tobytes(), sample_width=2, frame_rate=SOURCE_RATE, channels=1)
+
+    print(f"⏱️ Deep voice chain on {seconds:.0f}s of audio @ {SOURCE_RATE} Hz\n")
+
+    start = time.perf_counter()
+    reference = pydub_chain(sound)
+    pydub_time = time.perf_counter() - start
+    print(f"   pydub: {pydub_time:.2f}s")
+
+    start = time.perf_counter()
+    result, rate = numpy_chain(sound)
+    numpy_time = time.perf_counter() - start
+    print(f"   NumPy: {numpy_time:.3f}s")
+
+    ref = np.array(reference.get_array_of_samples(), dtype=np.float64) / 32768.0
+    out = result.astype(np.float64) / 32768.0
+    n = min(len(ref), len(out))
+    diff = ref[:n] - out[:n]
+    snr = 10 * np.log10(np.sum(ref[:n] ** 2) / max(np.sum(diff ** 2), 1e-20))
+
+    print(f"\n🚀 Speedup: {pydub_time / numpy_time:.0f}x")
+    print(f"📏 Length: pydub {len(ref)} / NumPy {len(out)} samples "
+          f"@ {reference.frame_rate}/{rate} Hz")
+    print(f"📏 Peak: pydub {np.abs(ref).max():.3f} / NumPy {np.abs(out).max():.3f}")
+    print(f"📏 Max abs difference: {np.abs(diff).max():.4f}, SNR vs pydub: {snr:.1f} dB")
+
+
+if __name__ == "__main__":
+    main()
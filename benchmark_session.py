@@ -0,0 +1,178 @@
+"""
+⏱️ Instagram Session Benchmark
+==============================
+Starts a local stand-in for the Instagram private API (http.server) that
+answers the login checks after a fixed latency, points instagrapi clients
+at it, and compares N uploads' worth of logins:
+- the old way: a new Client + login_by_sessionid + account_info() per upload
+- login.InstagramSession: one warm client, validated once per TTL
+
+Then it checks the session lifecycle against the same server:
+- a new process resumes the saved session.json without any request
+- a session.json without a saved check time (e.g. copied from elsewhere)
+  is validated before use
+- an expired session (the server answers login_required) falls back to
+  the sessionid and is saved again
+
+Nothing talks to Instagram; session files go to a temp folder.
+
+Usage:
+    python benchmark_session.py [uploads] [latency_seconds]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from requests.adapters import HTTPAdapter
+
+from login import InstagramSession, instagrapi_client
+
+HOST = "127.0.0.1"
+USER_ID = "1234567890"
+SESSIONID = f"{USER_ID}%3AStandInSession%3A1%3AAYe"
+STANDIN_USER = {
+    "pk": USER_ID,
+    "username": "standin_reels",
+    "full_name": "Stand-in",
+    "is_private": False,
+    "is_verified": False,
+    "profile_pic_url": "https://example.com/pic.jpg",
+    "biography": "",
+    "external_url": None,
+    "is_business": False,
+    "birthday": None,
+    "phone_number": "",
+    "gender": 1,
+    "email": "",
+}
+
+
+class StandinServer:
+    """Answers account_info() and user_info_v1() like Instagram, counting requests."""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.requests = 0
+        self.reject = 0  # Session checks still to answer with login_required
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests += 1
+                time.sleep(server.latency)
+                if server.reject and "current_user" in self.path:
+                    server.reject -= 1
+                    status, body = 403, {"status": "fail", "message": "login_required"}
+                else:
+                    status, body = 200, {"status": "ok", "user": STANDIN_USER}
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_POST = do_GET
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((HOST, 0), Handler)
+        self.url = f"http://{HOST}:{self.httpd.server_port}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def client_factory(self):
+        """instagrapi Client whose HTTPS requests go to the stand-in instead."""
+        url = self.url
+
+        class Redirect(HTTPAdapter):
+            def send(self, request, **kwargs):
+                request.url = url + "/" + request.url.split("/", 3)[3]
+                return super().send(request, **kwargs)
+
+        cl = instagrapi_client()
+        cl.private.mount("https://", Redirect())
+        cl.public.mount("https://", Redirect())
+        return cl
+
+
+def old_login(server):
+    """What login_user() did per upload before the session manager."""
+    cl = server.client_factory()
+    cl.login_by_sessionid(SESSIONID)
+    cl.account_info()
+    return cl
+
+
+def validated_at(settings_path):
+    """Time of the last session check, as saved with the settings."""
+    with open(settings_path, "r", encoding="utf-8") as f:
+        return json.load(f)["validated_at"]
+
+
+def main():
+    uploads = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.2
+
+    server = StandinServer(latency)
+    workdir = tempfile.mkdtemp(prefix="session-bench-")
+    settings_path = os.path.join(workdir, "session.json")
+
+    def session(**options):
+        return InstagramSession(settings_path, username=None, password=None, sessionid=SESSIONID,
+                                sessionid_path=os.path.join(workdir, ".session_id"),
+                                refresh_interval=None, client_factory=server.client_factory,
+                                **options)
+
+    print(f"⏱️ {uploads} uploads, {latency:.2f}s stand-in latency\n")
+
+    start = time.perf_counter()
+    for _ in range(uploads):
+        old_login(server)
+    old_time, old_requests = time.perf_counter() - start, server.requests
+    print(f"   New client per upload: {old_time:.2f}s, {old_requests} requests")
+
+    server.requests = 0
+    manager = session()
+    start = time.perf_counter()
+    for _ in range(uploads):
+        assert manager.client() is not None
+    warm_time, warm_requests = time.perf_counter() - start, server.requests
+    print(f"   Warm session:          {warm_time:.2f}s, {warm_requests} requests")
+
+    # A new process within the TTL: no request at all
+    server.requests = 0
+    assert session().client() is not None
+    print(f"\n🔁 Restart with saved session.json: {server.requests} requests")
+
+    # Settings without the check time are never trusted blindly
+    with open(settings_path, "r", encoding="utf-8") as f:
+        settings = json.load(f)
+    del settings["validated_at"]
+    with open(settings_path, "w", encoding="utf-8") as f:
+        json.dump(settings, f)
+    server.requests = 0
+    assert session().client() is not None and server.requests > 0
+    print(f"🔎 session.json without a check time: validated ({server.requests} requests)")
+
+    # Past the TTL the check is rejected: back to the sessionid, saved again
+    server.requests = 0
+    server.reject = 1
+    expired = session(ttl=0)
+    first = validated_at(settings_path)
+    time.sleep(0.01)
+    cl = expired.client()
+    assert cl is not None and validated_at(settings_path) > first
+    print(f"♻️ Expired session -> sessionid login: {server.requests} requests, settings re-saved")
+
+    print(f"\n🚀 Speedup: {old_time / max(warm_time, 1e-9):.0f}x "
+          f"({old_requests} -> {warm_requests} requests)")
+
+
+if __name__ == "__main__":
+    main()
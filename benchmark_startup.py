@@ -0,0 +1,76 @@
+"""
+⏱️ Startup / Import-Time Benchmark
+==================================
+Imports each entry module in a fresh interpreter under `python -X importtime`
+and reports:
+- the cumulative import time of the module
+- the slowest imports it pulls in
+- which heavy dependencies (Gemini SDK, instagrapi, moviepy, edge_tts,
+  pydub) got loaded at import - these should only load in the stage
+  that uses them
+
+It also times `python main.py --help` end to end.
+
+Usage:
+    python benchmark_startup.py [runs]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+MODULES = ("main", "video_editor", "orchestrator", "daemon", "login")
+HEAVY = ("google.genai", "instagrapi", "moviepy", "edge_tts", "pydub")
+TOP_IMPORTS = 5
+
+
+def import_times(module):
+    """{imported module: cumulative microseconds} of a cold `import module`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)), check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def median_seconds(cmd, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                       cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+
+    print(f"⏱️ Import times (median of {runs} cold interpreters)\n")
+    for module in MODULES:
+        samples = [import_times(module) for _ in range(runs)]
+        total = statistics.median(times[module] for times in samples) / 1e6
+        times = samples[-1]
+        heavy = sorted({name.split(".")[0] if name.split(".")[0] != "google" else "google.genai"
+                        for name in times if name.startswith(HEAVY)})
+        slowest = sorted((t, name) for name, t in times.items() if name != module)[-TOP_IMPORTS:]
+
+        print(f"   {module:<14} {total:6.3f}s   heavy: {', '.join(heavy) or 'none'}")
+        for t, name in reversed(slowest):
+            print(f"      {t / 1e6:6.3f}s  {name}")
+
+    help_time = median_seconds([sys.executable, "main.py", "--help"], runs)
+    print(f"\n🚀 python main.py --help: {help_time:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
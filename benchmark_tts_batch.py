@@ -0,0 +1,90 @@
+"""
+⏱️ Batch TTS Benchmark
+======================
+Starts a local stand-in TTS server (aiohttp) that answers every request
+with a short MP3 after a fixed latency, then synthesises N scripts:
+- one after another (one asyncio.run per script, the old way)
+- as one batch on a shared event loop (tts_engine.synthesize_batch)
+
+The TTS cache is bypassed so every script really hits the server.
+
+Usage:
+    python benchmark_tts_batch.py [scripts] [latency_seconds]
+"""
+
+import asyncio
+import subprocess
+import sys
+import threading
+import time
+
+from aiohttp import web
+
+from ffmpeg_utils import get_ffmpeg_exe
+from tts_engine import HTTPTTSBackend, synthesize_batch, tts_job
+
+HOST = "127.0.0.1"
+PORT = 8765
+
+
+def make_mp3(seconds=2.0):
+    """A short tone encoded like edgeTTS output (24 kHz mono MP3)."""
+    cmd = [get_ffmpeg_exe(), "-v", "error", "-f", "lavfi", "-i", f"sine=f=160:d={seconds}",
+           "-ar", "24000", "-ac", "1", "-b:a", "48k", "-f", "mp3", "pipe:1"]
+    return subprocess.run(cmd, stdout=subprocess.PIPE, check=True).stdout
+
+
+def start_standin_server(mp3_data, latency):
+    """Run the stand-in server on a background thread. Returns its URL."""
+    async def handle(request):
+        payload = await request.json()
+        if not payload.get("text"):
+            raise web.HTTPBadRequest()
+        await asyncio.sleep(latency)
+        return web.Response(body=mp3_data, content_type="audio/mpeg")
+
+    ready = threading.Event()
+
+    def serve():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        app = web.Application()
+        app.router.add_post("/tts", handle)
+        runner = web.AppRunner(app)
+        loop.run_until_complete(runner.setup())
+        loop.run_until_complete(web.TCPSite(runner, HOST, PORT).start())
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=serve, daemon=True).start()
+    ready.wait()
+    return f"http://{HOST}:{PORT}/tts"
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+
+    url = start_standin_server(make_mp3(), latency)
+    backend = HTTPTTSBackend(url)
+    jobs = [tts_job(f"स्क्रिप्ट नंबर {i}") for i in range(count)]
+
+    print(f"⏱️ {count} scripts, {latency:.1f}s server latency\n")
+
+    start = time.perf_counter()
+    for job in jobs:
+        synthesize_batch([job], backend, use_cache=False)
+    sequential = time.perf_counter() - start
+    print(f"   Sequential: {sequential:.2f}s")
+
+    start = time.perf_counter()
+    results = synthesize_batch(jobs, backend, concurrency=count, use_cache=False)
+    batched = time.perf_counter() - start
+    failed = sum(isinstance(r, Exception) for r in results)
+    print(f"   Batch:      {batched:.2f}s ({failed} failed)")
+
+    print(f"\n🚀 Speedup: {sequential / batched:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+"""
+💬 Burned-In Captions
+=====================
+Hindi (Devanagari) / Urdu captions drawn straight into the frame buffer.
+
+- The script is split into short cues (a few words, breaking at phrase
+  punctuation), timed from the TTS word timings when available or spread
+  over the reel by length otherwise
+- Each caption line is rasterised once with Pillow (raqm layout for
+  correct Devanagari conjuncts and right-to-left Urdu when available)
+  into an RGBA tile kept in an LRU cache
+- Per frame, only the active cue's tiles are alpha-blended, and only over
+  their bounding boxes
+
+Fonts are looked up in assets/fonts first, then in common system
+locations (the workflow installs fonts-noto-core and libraqm). Planning a
+captioned reel without a font that covers the script, or without raqm
+layout, is an error: captions are never silently dropped or misdrawn.
+
+Cues are plain, picklable dicts so they travel inside segment specs:
+    {"text": "हार मत मानो", "start": 1.2, "end": 2.4}
+"""
+
+import os
+import re
+from bisect import bisect_right
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont, features
+
+from image_loader import REEL_SIZE
+
+ASSETS_DIR = "assets"
+FONTS_DIR = os.path.join(ASSETS_DIR, "fonts")
+
+DEVANAGARI_FONTS = (
+    os.path.join(FONTS_DIR, "NotoSansDevanagari-Bold.ttf"),
+    os.path.join(FONTS_DIR, "NotoSansDevanagari-Regular.ttf"),
+    "/usr/share/fonts/truetype/noto/NotoSansDevanagari-Bold.ttf",
+    "/usr/share/fonts/truetype/noto/NotoSansDevanagari-Regular.ttf",
+    "/usr/share/fonts/opentype/noto/NotoSansDevanagari-Bold.otf",
+    "/usr/share/fonts/truetype/lohit-devanagari/Lohit-Devanagari.ttf",
+    "C:/Windows/Fonts/NirmalaB.ttf",
+    "C:/Windows/Fonts/Nirmala.ttf",
+    "/System/Library/Fonts/Supplemental/DevanagariMT.ttc",
+)
+URDU_FONTS = (
+    os.path.join(FONTS_DIR, "NotoNastaliqUrdu-Bold.ttf"),
+    os.path.join(FONTS_DIR, "NotoNastaliqUrdu-Regular.ttf"),
+    "/usr/share/fonts/truetype/noto/NotoNastaliqUrdu-Regular.ttf",
+    "/usr/share/fonts/truetype/noto/NotoNaskhArabic-Bold.ttf",
+    "C:/Windows/Fonts/segoeuib.ttf",
+    "/System/Library/Fonts/GeezaPro.ttc",
+)
+
+# --- Caption style ---
+CAPTION_FONT_SCALE = 0.036       # Font size as a fraction of frame height
+CAPTION_MAX_WIDTH = 0.86         # Line width as a fraction of frame width
+CAPTION_CENTER_Y = 0.74          # Vertical centre of the caption block
+CAPTION_LINE_SPACING = 1.25
+CAPTION_MAX_WORDS = 4            # Words per cue
+CAPTION_STROKE = 0.08            # Outline width as a fraction of font size
+CAPTION_FILL = (255, 255, 255, 255)
+CAPTION_STROKE_FILL = (0, 0, 0, 255)
+CAPTION_TILE_CACHE_SIZE = 64
+CAPTION_HOLD = 0.3               # Seconds a cue stays after its last word
+
+_PHRASE_BREAK = re.compile(r"[।॥.!?,;:…]$")
+_URDU = re.compile(r"[\u0600-\u06FF]")
+
+
+def is_urdu(text):
+    return bool(_URDU.search(text))
+
+
+def find_font(text):
+    """First installed font able to show the script of `text`, or None."""
+    for path in (URDU_FONTS if is_urdu(text) else DEVANAGARI_FONTS):
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def _group_words(tokens):
+    """Split tokens into cues of up to CAPTION_MAX_WORDS, breaking after punctuation."""
+    groups = []
+    current = []
+    for token in tokens:
+        current.append(token)
+        text = token if isinstance(token, str) else token["text"]
+        if len(current) >= CAPTION_MAX_WORDS or _PHRASE_BREAK.search(text):
+            groups.append(current)
+            current = []
+    if current:
+        groups.append(current)
+    return groups
+
+
+def build_cues(text, words=None, duration=None):
+    """
+    Timed caption cues for a script.
+
+    Args:
+        text: Script shown on screen
+        words: TTS word timings [{"text", "start", "end"}] (optional)
+        duration: Reel duration; cues never run past it, and without word
+                  timings they are spread over it by length
+
+    Returns:
+        List of cue dicts, in time order
+    """
+    if words:
+        # Show the script's own spelling/punctuation where the words line up
+        script_words = text.split()
+        tokens = [
+            dict(word, text=script_words[i]) if len(script_words) == len(words) else word
+            for i, word in enumerate(words)
+        ]
+        cues = []
+        for group in _group_words(tokens):
+            cues.append({
+                "text": " ".join(word["text"] for word in group),
+                "start": group[0]["start"],
+                "end": group[-1]["end"] + CAPTION_HOLD,
+            })
+        # Never overlap the next cue
+        for cue, following in zip(cues, cues[1:]):
+            cue["end"] = min(cue["end"], following["start"])
+    else:
+        if not duration:
+            return []
+        groups = [" ".join(group) for group in _group_words(text.split())]
+        total = sum(len(g) for g in groups) or 1
+        cues = []
+        position = 0.0
+        for group in groups:
+            length = duration * len(group) / total
+            cues.append({"text": group, "start": position, "end": position + length})
+            position += length
+
+    if duration is not None:
+        cues = [dict(cue, end=min(cue["end"], duration)) for cue in cues if cue["start"] < duration]
+    return cues
+
+
+def slice_cues(cues, start, end):
+    """Cues overlapping [start, end), shifted to local time (for one segment)."""
+    return [
+        {"text": cue["text"], "start": max(cue["start"], start) - start,
+         "end": min(cue["end"], end) - start}
+        for cue in cues
+        if cue["end"] > start and cue["start"] < end
+    ]
+
+
+class CaptionRenderer:
+    """
+    Rasterises caption lines into cached RGBA tiles and blends them.
+
+    Args:
+        size: Frame size (width, height)
+        font_path: Font file (default: found from the text's script)
+        font_size: Font size in pixels (default: CAPTION_FONT_SCALE x height)
+    """
+
+    def __init__(self, size=REEL_SIZE, font_path=None, font_size=None):
+        self.size = (int(size[0]), int(size[1]))
+        self.font_path = font_path
+        self.font_size = int(font_size or round(self.size[1] * CAPTION_FONT_SCALE))
+        self.stroke = max(1, int(round(self.font_size * CAPTION_STROKE)))
+        self.raqm = features.check("raqm")
+        self._fonts = {}
+        self._lines = {}
+        self._tiles = OrderedDict()
+
+    def font(self, text):
+        path = self.font_path or find_font(text)
+        if path is None:
+            return None
+        font = self._fonts.get(path)
+        if font is None:
+            layout = ImageFont.Layout.RAQM if self.raqm else ImageFont.Layout.BASIC
+            font = ImageFont.truetype(path, self.font_size, layout_engine=layout)
+            self._fonts[path] = font
+        return font
+
+    def available(self, text):
+        """Whether a font for this script is installed."""
+        return self.font(text) is not None
+
+    def require(self, text):
+        """
+        Check that captions of this script can be drawn correctly.
+
+        Raises:
+            RuntimeError: No font covers the script, or Pillow has no raqm
+                          layout (needed for Devanagari conjuncts and
+                          right-to-left Urdu)
+        """
+        if not self.available(text):
+            raise RuntimeError(
+                f"❌ No caption font found! Add one to {FONTS_DIR}/ or install "
+                f"fonts-noto-core (or run with --no-captions)")
+        if not self.raqm:
+            raise RuntimeError(
+                "❌ Pillow has no raqm text layout, captions would be misdrawn! "
+                "Install libraqm0 and libfribidi0 (or run with --no-captions)")
+
+    def _text_args(self, text):
+        if not self.raqm:
+            return {}
+        if is_urdu(text):
+            return {"direction": "rtl", "language": "ur"}
+        return {"language": "hi"}
+
+    def wrap(self, text):
+        """Split a cue into lines that fit CAPTION_MAX_WIDTH (memoised)."""
+        lines = self._lines.get(text)
+        if lines is not None:
+            return lines
+
+        font = self.font(text)
+        max_width = self.size[0] * CAPTION_MAX_WIDTH
+        lines = []
+        current = ""
+        for word in text.split():
+            candidate = f"{current} {word}".strip()
+            width = font.getlength(candidate, **self._text_args(candidate))
+            if current and width + 2 * self.stroke > max_width:
+                lines.append(current)
+                current = word
+            else:
+                current = candidate
+        if current:
+            lines.append(current)
+        self._lines[text] = lines
+        return lines
+
+    def tile(self, line):
+        """
+        (rgb, alpha) float32 tile of one line, rasterised on first use.
+        rgb is premultiplied by alpha; alpha is (h, w, 1) in [0, 1].
+        """
+        tile = self._tiles.get(line)
+        if tile is not None:
+            self._tiles.move_to_end(line)
+            return tile
+
+        font = self.font(line)
+        args = self._text_args(line)
+        left, top, right, bottom = font.getbbox(line, stroke_width=self.stroke, **args)
+        image = Image.new("RGBA", (right - left, bottom - top), (0, 0, 0, 0))
+        ImageDraw.Draw(image).text(
+            (-left, -top), line, font=font, fill=CAPTION_FILL,
+            stroke_width=self.stroke, stroke_fill=CAPTION_STROKE_FILL, **args
+        )
+
+        pixels = np.asarray(image, dtype=np.float32) / 255.0
+        alpha = pixels[:, :, 3:4]
+        tile = (pixels[:, :, :3] * alpha * 255.0, alpha)
+
+        self._tiles[line] = tile
+        if len(self._tiles) > CAPTION_TILE_CACHE_SIZE:
+            self._tiles.popitem(last=False)
+        return tile
+
+    def draw(self, text, out):
+        """Blend a cue into `out` (h, w, 3 uint8), touching only its tiles' boxes."""
+        lines = self.wrap(text)
+        line_height = int(self.font_size * CAPTION_LINE_SPACING)
+        w, h = self.size
+        y = int(h * CAPTION_CENTER_Y - len(lines) * line_height / 2)
+        for line in lines:
+            rgb, alpha = self.tile(line)
+            th, tw = alpha.shape[:2]
+            x0 = max((w - tw) // 2, 0)
+            y0 = min(max(y + (line_height - th) // 2, 0), h - th)
+            region = out[y0:y0 + th, x0:x0 + tw]
+            th, tw = region.shape[:2]
+            blended = region * (1.0 - alpha[:th, :tw]) + rgb[:th, :tw]
+            np.copyto(region, blended, casting="unsafe")
+            y += line_height
+        return out
+
+
+_renderers = {}
+
+
+def get_caption_renderer(size=REEL_SIZE):
+    """Shared CaptionRenderer per frame size (keeps the tile cache warm)."""
+    size = (int(size[0]), int(size[1]))
+    renderer = _renderers.get(size)
+    if renderer is None:
+        renderer = _renderers[size] = CaptionRenderer(size)
+    return renderer
+
+
+class CaptionedSegment:
+    """
+    Wraps a segment and burns its caption cues (in local time) into every frame.
+
+    Args:
+        segment: Segment with duration and render(t, out)
+        cues: Caption cues relative to the segment start
+        renderer: CaptionRenderer for the frame size
+    """
+
+    def __init__(self, segment, cues, renderer):
+        self.segment = segment
+        self.duration = segment.duration
+        self.cues = list(cues)
+        self.starts = [cue["start"] for cue in self.cues]
+        self.renderer = renderer
+        self._frame = None
+
+    def render(self, t, out=None):
+        if out is None:
+            if self._frame is None:
+                h, w = self.renderer.size[1], self.renderer.size[0]
+                self._frame = np.empty((h, w, 3), dtype=np.uint8)
+            out = self._frame
+        self.segment.render(t, out)
+
+        index = bisect_right(self.starts, t) - 1
+        if index >= 0 and t < self.cues[index]["end"]:
+            self.renderer.draw(self.cues[index]["text"], out)
+        return out
@@ -0,0 +1,372 @@
+"""
+⏰ Reel Daemon
+==============
+One long-running process instead of a fresh `python main.py` per post:
+
+- Posts on an internal schedule (the auto-post workflow's times, with a
+  few minutes of random jitter so posts don't land on the exact minute)
+- Pre-renders upcoming reels into the outbox while idle, so a scheduled
+  post is only an upload
+- Keeps its warm state for its whole life: the Gemini client, the
+  logged-in Instagram client, and a pool of worker processes with the
+  decoded music, transition bank and graded stills already in memory
+- The outbox is the persistent queue and the schedule is saved next to
+  it, so a restart picks up where the last run stopped
+- SIGINT/SIGTERM finish the render or upload in progress, then exit
+  (a second signal cancels a render: its worker processes are
+  terminated and the partial video removed; an upload always finishes)
+- GET http://127.0.0.1:8765/health returns the daemon state as JSON:
+
+    curl -s http://127.0.0.1:8765/health
+"""
+
+import asyncio
+import json
+import os
+import random
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from encoder import auto_threads
+from orchestrator import batch_output_name, build_batch_graph
+from outbox import OUTBOX_DIR, load_post, mark_posted, pending
+from video_editor import OUTPUT_DIR
+
+# Posting times in UTC (same as .github/workflows/auto-post.yml)
+POST_TIMES_UTC = ("09:30", "12:30", "13:30")
+POST_JITTER_MINUTES = 15     # Each post lands up to this many minutes early or late
+MISSED_POST_GRACE = 3600     # Still post a slot missed by less than this (seconds)
+POST_RETRY_SECONDS = 900     # Wait before retrying a failed upload
+POST_MAX_ATTEMPTS = 3        # Failed uploads per slot before moving on
+
+OUTBOX_TARGET = 2            # Reels kept rendered ahead of the schedule
+RENDER_RETRY_SECONDS = 300   # Wait after a failed pre-render
+IDLE_POLL_SECONDS = 30       # Longest sleep between schedule checks
+
+HEALTH_HOST = "127.0.0.1"
+HEALTH_PORT = 8765
+
+STATE_FILE = ".daemon.json"  # Inside the outbox folder (hidden from the queue)
+
+
+def slot_jitter(slot, jitter_minutes=POST_JITTER_MINUTES):
+    """
+    Random offset (seconds) of a posting slot, seeded by the slot time.
+
+    Every call gives a slot the same offset, so once it has been posted
+    (at its jittered time or later) it can never come up again as the
+    next post.
+    """
+    return random.Random(int(slot)).uniform(-jitter_minutes, jitter_minutes) * 60
+
+
+def next_post_time(after, post_times=POST_TIMES_UTC, jitter_minutes=POST_JITTER_MINUTES):
+    """
+    First jittered posting time after a timestamp.
+
+    Args:
+        after: Unix timestamp
+        post_times: "HH:MM" UTC times of day
+        jitter_minutes: Random offset range (+/-) of each post (see slot_jitter)
+
+    Returns:
+        Unix timestamp of the next post
+    """
+    day = datetime.fromtimestamp(after, timezone.utc).replace(hour=0, minute=0, second=0,
+                                                             microsecond=0)
+    candidates = []
+    for days in range(3):
+        for text in post_times:
+            hour, minute = map(int, text.split(":"))
+            slot = (day + timedelta(days=days, hours=hour, minutes=minute)).timestamp()
+            candidates.append(slot + slot_jitter(slot, jitter_minutes))
+    return min(t for t in candidates if t > after)
+
+
+def _format_time(timestamp):
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat(timespec="seconds")
+
+
+def _init_worker():
+    # Ctrl+C is for the daemon to handle, not to kill a render halfway
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Forked workers inherit the event loop's signal wakeup fd: without
+    # this, a signal to a worker would reach the daemon as another stop()
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.set_wakeup_fd(-1)
+    if hasattr(os, "setpgrp"):
+        # Own process group, so the worker can be killed with its ffmpeg
+        os.setpgrp()
+
+
+class ReelDaemon:
+    """
+    Scheduler, pre-renderer and uploader in one process.
+
+    Args:
+        get_content: Blocking function returning one Gemini content dict
+        login: Blocking function returning a logged-in client (None = render only)
+        upload: Blocking upload(video_path, caption, client) -> success
+        post_times: "HH:MM" UTC posting times
+        jitter_minutes: Random offset (+/-) of each post
+        outbox_target: Reels to keep rendered ahead
+        outbox_dir: Outbox folder (the persistent queue)
+        host, port: Health endpoint address (port None = no endpoint)
+        workers: Process pool size (default: CPU count)
+        render_options: encoder_profile, captions, progressive_grade, draft,
+                        draft_scale (as in orchestrator.build_batch_graph)
+    """
+
+    def __init__(self, get_content, login=None, upload=None, post_times=POST_TIMES_UTC,
+                 jitter_minutes=POST_JITTER_MINUTES, outbox_target=OUTBOX_TARGET,
+                 outbox_dir=OUTBOX_DIR, host=HEALTH_HOST, port=HEALTH_PORT, workers=None,
+                 **render_options):
+        self.get_content = get_content
+        self.login = login
+        self.upload = upload
+        self.post_times = post_times
+        self.jitter_minutes = jitter_minutes
+        self.outbox_target = outbox_target
+        self.outbox_dir = outbox_dir
+        self.host = host
+        self.port = port
+        self.workers = workers or auto_threads()
+        self.render_options = render_options
+
+        self.state_path = os.path.join(outbox_dir, STATE_FILE)
+        self.state = {"next_post": None, "attempts": 0, "last_post": None, "posted": 0}
+        self.client = None
+        self.pool = None
+        self.stopping = False
+        self.started = None
+        self.last_error = None
+        self._wake = None
+        self._render_task = None
+        self._render_after = 0.0
+
+    # --- Persistent state ---
+    def load_state(self):
+        """Resume the schedule of the previous run (if any)."""
+        if os.path.exists(self.state_path):
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                self.state.update(json.load(f))
+
+        now = time.time()
+        next_post = self.state["next_post"]
+        if next_post is None or next_post < now - MISSED_POST_GRACE:
+            if next_post is not None:
+                print(f"⏭️ Missed the post at {_format_time(next_post)} while stopped")
+            self.schedule_next(now)
+        elif next_post < now:
+            print(f"⏰ Catching up the post due at {_format_time(next_post)}")
+
+    def save_state(self):
+        os.makedirs(self.outbox_dir, exist_ok=True)
+        staged = self.state_path + ".tmp"
+        with open(staged, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=1)
+        os.replace(staged, self.state_path)
+
+    def schedule_next(self, after):
+        self.state["next_post"] = next_post_time(after, self.post_times, self.jitter_minutes)
+        self.state["attempts"] = 0
+        self.save_state()
+        print(f"📅 Next post: {_format_time(self.state['next_post'])}")
+
+    # --- Work ---
+    async def render_one(self):
+        """Render one reel into the outbox with the warm worker pool."""
+        seed = random.randrange(2**32)
+        try:
+            graph = build_batch_graph(self.get_content, 1, seed=seed, outbox_dir=self.outbox_dir,
+                                      workers=self.workers, pool=self.pool, **self.render_options)
+            result = (await graph.run(raise_errors=False))["render_0"]
+            if isinstance(result, BaseException):
+                raise result
+            print(f"📬 Pre-rendered: {result} ({len(pending(self.outbox_dir))} in the outbox)")
+        except asyncio.CancelledError:
+            # Cancelled by a second signal (see stop): drop the partial video
+            partial = os.path.join(OUTPUT_DIR, batch_output_name(0, seed))
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+        except Exception as e:
+            print(f"❌ Pre-render failed: {e}")
+            self.last_error = f"render: {e}"
+            self._render_after = time.time() + RENDER_RETRY_SECONDS
+        finally:
+            self._render_task = None
+            self._wake.set()
+
+    def start_render(self):
+        if self._render_task is None:
+            self._render_task = asyncio.ensure_future(self.render_one())
+        return self._render_task
+
+    async def post_next(self):
+        """Upload the oldest reel in the outbox (rendering one first if it is empty)."""
+        if not pending(self.outbox_dir):
+            print("⚠️ Outbox empty at post time - rendering now")
+            await self.start_render()
+
+        entries = pending(self.outbox_dir)
+        ok = False
+        if not entries:
+            self.last_error = "post: outbox empty"
+        elif self.login is None or self.upload is None:
+            print("📝 Render-only daemon: not uploading")
+            ok = True
+        else:
+            entry = entries[0]
+            video_path, caption, _ = load_post(entry)
+            try:
+                if self.client is None:
+                    self.client = await asyncio.to_thread(self.login)
+                ok = bool(self.client) and await asyncio.to_thread(
+                    self.upload, video_path, caption, self.client)
+            except Exception as e:
+                print(f"❌ Upload failed: {e}")
+            if ok:
+                mark_posted(entry)
+                self.state["posted"] += 1
+                self.state["last_post"] = {"entry": os.path.basename(entry), "time": time.time()}
+            else:
+                # Stale session is the usual cause: ask login() again next time
+                # (login.InstagramSession re-validates after a failed upload)
+                self.client = None
+                self.last_error = f"upload: {os.path.basename(entry)}"
+
+        now = time.time()
+        self.state["attempts"] += 1
+        if ok or self.state["attempts"] >= POST_MAX_ATTEMPTS:
+            self.schedule_next(now)
+        else:
+            self.state["next_post"] = now + POST_RETRY_SECONDS
+            self.save_state()
+            print(f"🔁 Retrying the post at {_format_time(self.state['next_post'])}")
+
+    # --- Health endpoint ---
+    def health(self):
+        return {
+            "status": "stopping" if self.stopping else "running",
+            "uptime": round(time.time() - self.started, 1),
+            "queue": len(pending(self.outbox_dir)),
+            "outbox_target": self.outbox_target,
+            "rendering": self._render_task is not None,
+            "logged_in": self.client is not None,
+            "next_post": _format_time(self.state["next_post"]),
+            "last_post": self.state["last_post"] and dict(
+                self.state["last_post"], time=_format_time(self.state["last_post"]["time"])),
+            "posted": self.state["posted"],
+            "last_error": self.last_error,
+        }
+
+    async def _serve_health(self, reader, writer):
+        try:
+            request = (await reader.readline()).decode("latin-1").split()
+            while (await reader.readline()).strip():
+                pass  # Skip the headers
+            if len(request) >= 2 and request[0] == "GET" and request[1] == "/health":
+                status, body = "200 OK", json.dumps(self.health())
+            else:
+                status, body = "404 Not Found", json.dumps({"error": "not found"})
+            body = body.encode("utf-8")
+            writer.write(f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                         f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n"
+                         .encode("latin-1") + body)
+            await writer.drain()
+        finally:
+            writer.close()
+
+    # --- Lifecycle ---
+    def stop(self):
+        """Finish the work in progress, then exit (second call: cancel a render)."""
+        if self.stopping:
+            if self._render_task is not None:
+                print("🛑 Cancelling the render in progress")
+                self._render_task.cancel()
+                self._terminate_workers()
+            return
+        print("🛑 Stopping after the current step (signal again to cancel a render)...")
+        self.stopping = True
+        self._wake.set()
+
+    def _terminate_workers(self):
+        # Cancelling the task only stops waiting for the pool: the worker
+        # processes would keep rendering (and shutdown() wait for them).
+        # Kill each one with its ffmpeg (SIGTERM would let ffmpeg finish
+        # the partial video)
+        processes = list((self.pool._processes or {}).values())
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            try:
+                if hasattr(os, "killpg"):
+                    os.killpg(process.pid, signal.SIGKILL)
+                else:
+                    process.terminate()
+            except (OSError, ValueError):
+                pass  # Already gone
+
+    def _install_signal_handlers(self, loop):
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except NotImplementedError:
+                # Windows: no loop signal handlers
+                signal.signal(sig, lambda *_: loop.call_soon_threadsafe(self.stop))
+
+    async def _sleep(self, seconds):
+        try:
+            await asyncio.wait_for(self._wake.wait(), max(0.0, seconds))
+        except asyncio.TimeoutError:
+            pass
+        self._wake.clear()
+
+    async def run(self):
+        """Run until stopped."""
+        loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self.started = time.time()
+        self._install_signal_handlers(loop)
+        self.load_state()
+
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        server = None
+        if self.port is not None:
+            server = await asyncio.start_server(self._serve_health, self.host, self.port)
+            print(f"🩺 Health: http://{self.host}:{self.port}/health")
+
+        print(f"⏰ Daemon running: {len(pending(self.outbox_dir))} reels in the outbox, "
+              f"keeping {self.outbox_target} ready")
+        try:
+            while not self.stopping:
+                now = time.time()
+                if now >= self.state["next_post"]:
+                    await self.post_next()
+                    continue
+                if (self._render_task is None and now >= self._render_after
+                        and len(pending(self.outbox_dir)) < self.outbox_target):
+                    self.start_render()
+                await self._sleep(min(IDLE_POLL_SECONDS, self.state["next_post"] - now))
+        finally:
+            if self._render_task is not None:
+                print("⏳ Waiting for the render in progress...")
+                try:
+                    await self._render_task
+                except asyncio.CancelledError:
+                    pass
+            if server is not None:
+                server.close()
+                await server.wait_closed()
+            self.pool.shutdown()
+            self.save_state()
+            print("👋 Daemon stopped")
+
+
+def run_daemon(get_content, login=None, upload=None, **options):
+    """Run a ReelDaemon until SIGINT/SIGTERM (see ReelDaemon for options)."""
+    asyncio.run(ReelDaemon(get_content, login, upload, **options).run())
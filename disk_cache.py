@@ -0,0 +1,117 @@
+"""
+💾 Disk Cache Helpers
+=====================
+Small building blocks shared by the persistent caches under .cache/:
+- content hashing of source files (memoised by size + mtime)
+- a size-bounded, LRU-evicted directory of files addressed by key
+
+Entries are written atomically (stage in the cache dir, then os.replace),
+and a hit refreshes the file's mtime, which is what eviction sorts by.
+"""
+
+import hashlib
+import os
+import time
+
+# Root of every persistent cache (kept outside output/, which is wiped per run)
+CACHE_DIR = ".cache"
+
+_digest_memo = {}
+
+
+def file_digest(path):
+    """SHA-256 of a file's content, memoised per (path, size, mtime)."""
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    digest = _digest_memo.get(memo_key)
+    if digest is None:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        _digest_memo[memo_key] = digest
+    return digest
+
+
+def make_key(*parts):
+    """Deterministic cache key from any number of str()-able parts."""
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(str(part).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class DiskCache:
+    """
+    Directory of cached files with size-bounded LRU eviction.
+
+    Args:
+        directory: Where cached files live
+        max_bytes: Total size to keep after each store (None = unbounded)
+    """
+
+    def __init__(self, directory, max_bytes=None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def path(self, key, suffix=""):
+        """Final location of a cached entry."""
+        return os.path.join(self.directory, f"{key}{suffix}")
+
+    def lookup(self, key, suffix=""):
+        """Return the cached path for `key` (refreshing its LRU age) or None."""
+        path = self.path(key, suffix)
+        try:
+            os.utime(path, None)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def staging_path(self, key, suffix=""):
+        """Temp path inside the cache dir to write an entry before store()."""
+        os.makedirs(self.directory, exist_ok=True)
+        return os.path.join(
+            self.directory, f".{key}.{os.getpid()}.{time.time_ns()}.tmp{suffix}"
+        )
+
+    def store(self, key, staged_path, suffix=""):
+        """Atomically move a staged file into the cache and evict if needed."""
+        path = self.path(key, suffix)
+        os.replace(staged_path, path)
+        self.evict()
+        return path
+
+    def entries(self):
+        """List (mtime, size, path) for every committed entry."""
+        found = []
+        if not os.path.isdir(self.directory):
+            return found
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.startswith("."):
+                stat = entry.stat()
+                found.append((stat.st_mtime, stat.st_size, entry.path))
+        return found
+
+    def size(self):
+        """Total bytes currently cached."""
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        """Delete least recently used entries until under max_bytes."""
+        if self.max_bytes is None:
+            return 0
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                removed += 1
+            except OSError:
+                pass
+        return removed
@@ -0,0 +1,327 @@
+"""
+💾 Raw-Frame Pipe Encoder
+=========================
+Streams raw RGB frames into an ffmpeg (libx264) subprocess.
+
+- Frames go through a bounded queue to a writer thread, so Python frame
+  generation and x264 encoding run on different cores at the same time
+- Audio (a NumPy PCM buffer) is fed through its own pipe and encoded
+  once, to AAC, in the same ffmpeg call
+- Encoder settings come from named profiles (draft / standard / archive)
+- The x264 thread count follows the machine's CPU count
+"""
+
+import os
+import queue
+import subprocess
+import tempfile
+import threading
+import wave
+
+import numpy as np
+
+from ffmpeg_utils import get_ffmpeg_exe
+
+AUDIO_FPS = 44100
+
+# --- Encoder profiles ---
+# threads=None means "auto" (one per CPU core)
+ENCODER_PROFILES = {
+    # Quick previews and CI renders
+    "draft": {
+        "preset": "ultrafast",
+        "crf": 28,
+        "tune": "fastdecode",
+        "threads": None,
+        "audio_bitrate": "96k",
+    },
+    # Default for posting (same quality as the old moviepy export)
+    "standard": {
+        "preset": "medium",
+        "crf": 23,
+        "tune": None,
+        "threads": None,
+        "audio_bitrate": "128k",
+    },
+    # Keep-forever masters
+    "archive": {
+        "preset": "slow",
+        "crf": 18,
+        "tune": "film",
+        "threads": None,
+        "audio_bitrate": "192k",
+    },
+}
+DEFAULT_PROFILE = "standard"
+
+# Frames buffered between the generator and the ffmpeg writer thread
+FRAME_QUEUE_SIZE = 8
+
+
+def auto_threads():
+    """Encoder thread count for this machine."""
+    return os.cpu_count() or 1
+
+
+def get_profile(profile):
+    """Resolve a profile name (or dict) into encoder settings."""
+    if isinstance(profile, dict):
+        return profile
+    if profile not in ENCODER_PROFILES:
+        raise ValueError(f"❌ Unknown encoder profile '{profile}'. "
+                         f"Choose from: {', '.join(ENCODER_PROFILES)}")
+    return ENCODER_PROFILES[profile]
+
+
+def video_codec_args(profile, fps):
+    """libx264 arguments for a profile."""
+    settings = get_profile(profile)
+    args = [
+        "-c:v", "libx264",
+        "-preset", settings["preset"],
+        "-crf", str(settings["crf"]),
+    ]
+    if settings.get("tune"):
+        args += ["-tune", settings["tune"]]
+    args += [
+        "-threads", str(settings.get("threads") or auto_threads()),
+        "-pix_fmt", "yuv420p",
+        "-r", str(fps),
+    ]
+    return args
+
+
+def pcm16(audio):
+    """Convert a float [-1, 1] or int16 PCM array to interleaved int16."""
+    audio = np.asarray(audio)
+    if audio.dtype != np.int16:
+        audio = np.clip(audio, -1.0, 1.0) * 32767.0
+        audio = audio.astype(np.int16)
+    if audio.ndim == 1:
+        audio = audio[:, None]
+    return np.ascontiguousarray(audio)
+
+
+def _write_wav(path, audio, audio_fps):
+    with wave.open(path, "wb") as w:
+        w.setnchannels(audio.shape[1])
+        w.setsampwidth(2)
+        w.setframerate(audio_fps)
+        w.writeframes(audio.tobytes())
+
+
+def _pipe_writer(stream, items, errors):
+    """Drain `items` (a queue of bytes-like objects, None = end) into `stream`."""
+    try:
+        while True:
+            item = items.get()
+            if item is None:
+                break
+            stream.write(item)
+    except Exception as e:
+        errors.append(e)
+        # Keep draining so the producer never blocks on a full queue
+        while items.get() is not None:
+            pass
+    finally:
+        try:
+            stream.close()
+        except Exception:
+            pass
+
+
+def _bytes_writer(fd, data, errors):
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+    except Exception as e:
+        errors.append(e)
+
+
+class _AudioInput:
+    """
+    Second ffmpeg input carrying a PCM buffer.
+
+    On POSIX the samples go through an extra pipe (no temp file); elsewhere
+    they are written to a temporary WAV.
+    """
+
+    def __init__(self, audio, audio_fps):
+        self.audio = pcm16(audio)
+        self.pass_fds = ()
+        self._read_fd = self._write_fd = None
+        self._tmp = None
+
+        if os.name == "posix":
+            self._read_fd, self._write_fd = os.pipe()
+            self.pass_fds = (self._read_fd,)
+            self.args = ["-f", "s16le", "-ar", str(audio_fps),
+                         "-ac", str(self.audio.shape[1]), "-i", f"pipe:{self._read_fd}"]
+        else:
+            fd, self._tmp = tempfile.mkstemp(suffix=".wav")
+            os.close(fd)
+            _write_wav(self._tmp, self.audio, audio_fps)
+            self.args = ["-i", self._tmp]
+
+    def start(self, errors):
+        """Call once ffmpeg is running. Returns the writer thread (or None)."""
+        if self._read_fd is None:
+            return None
+        os.close(self._read_fd)
+        thread = threading.Thread(
+            target=_bytes_writer, args=(self._write_fd, self.audio.tobytes(), errors), daemon=True
+        )
+        thread.start()
+        return thread
+
+    def cleanup(self):
+        if self._tmp:
+            try:
+                os.remove(self._tmp)
+            except OSError:
+                pass
+
+
+def _audio_output_args(settings):
+    return ["-map", "1:a", "-c:a", "aac", "-b:a", settings.get("audio_bitrate", "128k")]
+
+
+def _finish(proc, threads, errors, audio_input):
+    """Wait for writer threads and ffmpeg, raising on any failure."""
+    for thread in threads:
+        thread.join()
+    stderr = proc.stderr.read()
+    proc.wait()
+    if audio_input:
+        audio_input.cleanup()
+
+    if proc.returncode != 0:
+        raise RuntimeError(f"❌ ffmpeg encoding failed ({proc.returncode}): "
+                           f"{stderr.decode(errors='replace').strip()}")
+    if errors:
+        raise RuntimeError(f"❌ Writing to ffmpeg failed: {errors[0]}")
+
+
+def encode_frames(frames, output_path, size, fps=30, profile=DEFAULT_PROFILE,
+                  audio=None, audio_fps=AUDIO_FPS, extra_args=None):
+    """
+    Encode a stream of frames (and optional PCM audio) to an MP4.
+
+    Args:
+        frames: Iterable of (h, w, 3) uint8 RGB frames. The same buffer may be
+                yielded repeatedly - each frame is copied before queueing.
+        output_path: Target .mp4 path
+        size: Frame size (width, height)
+        fps: Frame rate
+        profile: Name in ENCODER_PROFILES or a settings dict
+        audio: Optional PCM array, (n,) or (n, channels), float [-1, 1] or int16
+        audio_fps: Audio sample rate
+        extra_args: Extra ffmpeg output arguments (inserted before the path)
+
+    Returns:
+        Number of frames encoded
+    """
+    settings = get_profile(profile)
+    w, h = int(size[0]), int(size[1])
+
+    cmd = [
+        get_ffmpeg_exe(), "-y", "-v", "error",
+        "-f", "rawvideo", "-pix_fmt", "rgb24",
+        "-s", f"{w}x{h}", "-r", str(fps),
+        "-i", "pipe:0",
+    ]
+
+    audio_input = _AudioInput(audio, audio_fps) if audio is not None else None
+    if audio_input:
+        cmd += audio_input.args
+
+    cmd += ["-map", "0:v"]
+    cmd += video_codec_args(settings, fps)
+    if audio_input:
+        cmd += _audio_output_args(settings)
+    cmd += ["-movflags", "+faststart"]
+    cmd += list(extra_args or [])
+    cmd.append(output_path)
+
+    proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=subprocess.PIPE,
+                            pass_fds=audio_input.pass_fds if audio_input else ())
+    errors = []
+    threads = []
+
+    if audio_input:
+        audio_thread = audio_input.start(errors)
+        if audio_thread:
+            threads.append(audio_thread)
+
+    frame_queue = queue.Queue(maxsize=FRAME_QUEUE_SIZE)
+    writer = threading.Thread(
+        target=_pipe_writer, args=(proc.stdin, frame_queue, errors), daemon=True
+    )
+    writer.start()
+    threads.append(writer)
+
+    count = 0
+    try:
+        for frame in frames:
+            if errors:
+                break
+            frame_queue.put(np.ascontiguousarray(frame).tobytes())
+            count += 1
+    finally:
+        frame_queue.put(None)
+        _finish(proc, threads, errors, audio_input)
+
+    return count
+
+
+def concat_chunks(chunk_paths, output_path, profile=DEFAULT_PROFILE,
+                  audio=None, audio_fps=AUDIO_FPS, list_path=None):
+    """
+    Join H.264 chunks encoded with identical parameters without re-encoding
+    (ffmpeg concat demuxer + stream copy), muxing in the audio at the end.
+
+    Args:
+        chunk_paths: Ordered chunk files
+        output_path: Target .mp4 path
+        profile: Profile used for the audio bitrate
+        audio: Optional PCM array (see encode_frames)
+        audio_fps: Audio sample rate
+        list_path: Where to write the concat list (default: next to output)
+    """
+    settings = get_profile(profile)
+    if list_path is None:
+        list_path = output_path + ".concat.txt"
+
+    with open(list_path, "w", encoding="utf-8") as f:
+        for path in chunk_paths:
+            escaped = os.path.abspath(path).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+
+    cmd = [
+        get_ffmpeg_exe(), "-y", "-v", "error",
+        "-f", "concat", "-safe", "0", "-i", list_path,
+    ]
+    audio_input = _AudioInput(audio, audio_fps) if audio is not None else None
+    if audio_input:
+        cmd += audio_input.args
+    cmd += ["-map", "0:v", "-c:v", "copy"]
+    if audio_input:
+        cmd += _audio_output_args(settings)
+    cmd += ["-movflags", "+faststart", output_path]
+
+    proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                            pass_fds=audio_input.pass_fds if audio_input else ())
+    errors = []
+    threads = []
+    if audio_input:
+        audio_thread = audio_input.start(errors)
+        if audio_thread:
+            threads.append(audio_thread)
+
+    try:
+        _finish(proc, threads, errors, audio_input)
+    finally:
+        try:
+            os.remove(list_path)
+        except OSError:
+            pass
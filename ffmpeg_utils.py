@@ -0,0 +1,69 @@
+"""
+🔧 ffmpeg Helpers
+=================
+Locating the ffmpeg binary (the one bundled with imageio-ffmpeg, or the
+system one), reading raw streams from its pipes and decoding compressed
+audio to PCM in memory.
+"""
+
+import shutil
+import subprocess
+
+import numpy as np
+
+
+def get_ffmpeg_exe():
+    """Path of the ffmpeg binary (imageio-ffmpeg's bundled build first)."""
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except Exception:
+        exe = shutil.which("ffmpeg")
+        if not exe:
+            raise RuntimeError("❌ ffmpeg not found! Run: pip install imageio-ffmpeg")
+        return exe
+
+
+def readinto_exact(stream, buffer):
+    """
+    Fill `buffer` (any writable buffer, e.g. a NumPy array slice) from a
+    pipe. Returns the number of bytes read, which is short only at EOF.
+    """
+    view = memoryview(buffer).cast("B")
+    filled = 0
+    while filled < len(view):
+        n = stream.readinto(view[filled:])
+        if not n:
+            break
+        filled += n
+    return filled
+
+
+def decode_audio(source, rate, channels=2):
+    """
+    Decode compressed audio (e.g. MP3) to PCM without temp files.
+
+    Args:
+        source: Encoded bytes (piped to ffmpeg) or a file path
+        rate: Output sample rate
+        channels: Output channel count
+
+    Returns:
+        float32 array, (n,) for mono or (n, channels), in [-1, 1]
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        input_args, data = ["-i", "pipe:0"], bytes(source)
+    else:
+        input_args, data = ["-i", str(source)], None
+
+    cmd = [get_ffmpeg_exe(), "-v", "error", *input_args, "-vn",
+           "-f", "s16le", "-acodec", "pcm_s16le", "-ar", str(rate), "-ac", str(channels),
+           "pipe:1"]
+    result = subprocess.run(cmd, input=data, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            stdin=None if data is not None else subprocess.DEVNULL)
+    if result.returncode != 0:
+        raise RuntimeError(f"❌ ffmpeg audio decoding failed: "
+                           f"{result.stderr.decode(errors='replace').strip()}")
+
+    samples = np.frombuffer(result.stdout, dtype=np.int16).astype(np.float32) / 32768.0
+    return samples if channels == 1 else samples.reshape(-1, channels)
@@ -0,0 +1,78 @@
+"""
+🖼️ Reel Image Loader
+====================
+Loads source photos straight at the size the reel needs.
+
+- JPEGs are decoded with DCT draft scaling (1/2, 1/4, 1/8), so a 6000px
+  photo is never fully decoded when we only need ~2400px
+- The image is cover-cropped to 9:16 and resized once, before any
+  filtering or sharpening touches it
+- A little headroom is kept on top of 1080x1920 so the Ken Burns zoom
+  never has to upscale
+"""
+
+import math
+
+from PIL import Image
+
+# Final reel frame size (width, height)
+REEL_SIZE = (1080, 1920)
+
+# Oversize factor for stills - matches the strongest Ken Burns zoom
+KEN_BURNS_HEADROOM = 1.25
+
+
+def cover_size(size=REEL_SIZE, headroom=KEN_BURNS_HEADROOM):
+    """Pixel size of a still that covers `size` with Ken Burns headroom."""
+    return (int(round(size[0] * headroom)), int(round(size[1] * headroom)))
+
+
+def cover_box(src_size, dst_size):
+    """Centered crop box in `src_size` with the aspect ratio of `dst_size`."""
+    src_w, src_h = src_size
+    dst_w, dst_h = dst_size
+    # The limiting side is kept whole (exactly, no float round trip) and
+    # only the other one is cropped, so the box never leaves the image
+    if dst_w * src_h >= dst_h * src_w:
+        crop_h = min(src_h, src_w * dst_h / dst_w)
+        top = max(0.0, (src_h - crop_h) / 2)
+        return (0, top, src_w, min(src_h, top + crop_h))
+    crop_w = min(src_w, src_h * dst_w / dst_h)
+    left = max(0.0, (src_w - crop_w) / 2)
+    return (left, 0, min(src_w, left + crop_w), src_h)
+
+
+def load_reel_image(image_path, size=REEL_SIZE, headroom=KEN_BURNS_HEADROOM):
+    """
+    Load an image already cover-cropped to the reel aspect ratio.
+
+    Args:
+        image_path: Path to the source image
+        size: Reel frame size (width, height)
+        headroom: Extra scale kept for zooming (1.0 = exact frame size)
+
+    Returns:
+        RGB PIL Image of size cover_size(size, headroom)
+    """
+    target = cover_size(size, headroom)
+
+    img = Image.open(image_path)
+
+    # Let libjpeg skip detail we are going to throw away anyway.
+    # draft() keeps both sides >= the requested size, so cover still fits.
+    if img.format == "JPEG":
+        src_w, src_h = img.size
+        scale = max(target[0] / src_w, target[1] / src_h)
+        img.draft("RGB", (math.ceil(src_w * scale), math.ceil(src_h * scale)))
+
+    img = img.convert("RGB")
+
+    if img.size != target:
+        img = img.resize(
+            target,
+            Image.LANCZOS,
+            box=cover_box(img.size, target),
+            reducing_gap=3.0
+        )
+
+    return img
@@ -0,0 +1,105 @@
+"""
+🎥 Ken Burns Frame Generator
+============================
+Renders zoom/pan motion from an oversized still without moviepy's
+per-frame resize + composite crop.
+
+The still is prepared once (cover-cropped with headroom, see
+image_loader.py). For every timestamp the visible window is computed
+analytically and resampled straight to the output size in one pass
+(PIL resize with a crop box = crop-and-scale affine), then copied into
+a reused output buffer.
+
+Default parameters reproduce the original effect: a centered, linear
+zoom from 1.0x to zoom_ratio over the clip duration.
+"""
+
+import numpy as np
+from PIL import Image
+
+from image_loader import REEL_SIZE
+
+
+class KenBurnsRenderer:
+    """
+    Frame generator for one Ken Burns still.
+
+    Args:
+        source: Oversized still (PIL Image, array or path) with the same
+                aspect ratio as `size`
+        size: Output frame size (width, height)
+        duration: Segment duration in seconds
+        zoom_start: Zoom at t=0 (1.0 = field of view of the plain 9:16 crop)
+        zoom_end: Zoom at t=duration
+        pan: (x, y) drift at the end of the clip, as a fraction of the
+             free margin (-1..1, 0 = stay centered)
+        resample: PIL resampling filter
+        headroom: Source pixels per output pixel at zoom 1.0
+                  (default: inferred from the source width)
+    """
+
+    def __init__(self, source, size=REEL_SIZE, duration=2.0, zoom_start=1.0,
+                 zoom_end=1.2, pan=(0.0, 0.0), resample=Image.BILINEAR,
+                 headroom=None):
+        if isinstance(source, str):
+            source = Image.open(source)
+        elif isinstance(source, np.ndarray):
+            source = Image.fromarray(source)
+        self.source = source.convert("RGB")
+        self.source.load()
+
+        self.size = (int(size[0]), int(size[1]))
+        self.duration = float(duration)
+        self.zoom_start = float(zoom_start)
+        self.zoom_end = float(zoom_end)
+        self.pan = (float(pan[0]), float(pan[1]))
+        self.resample = resample
+
+        # Source pixels per output pixel at zoom 1.0
+        if headroom is None:
+            headroom = self.source.width / self.size[0]
+        self.headroom = float(headroom)
+
+        self._frame = np.empty((self.size[1], self.size[0], 3), dtype=np.uint8)
+
+    def box_at(self, t):
+        """Visible source window (left, top, right, bottom) at time t."""
+        progress = min(max(t / self.duration, 0.0), 1.0) if self.duration > 0 else 1.0
+        zoom = self.zoom_start + (self.zoom_end - self.zoom_start) * progress
+
+        src_w, src_h = self.source.size
+        view_w = min(self.size[0] * self.headroom / zoom, src_w)
+        view_h = min(self.size[1] * self.headroom / zoom, src_h)
+
+        margin_x = (src_w - view_w) / 2
+        margin_y = (src_h - view_h) / 2
+        left = margin_x * (1 + self.pan[0] * progress)
+        top = margin_y * (1 + self.pan[1] * progress)
+
+        return (left, top, left + view_w, top + view_h)
+
+    def render(self, t, out=None):
+        """
+        Render the frame at time t.
+
+        Args:
+            t: Time in seconds from the start of the segment
+            out: Optional (h, w, 3) uint8 buffer to write into
+
+        Returns:
+            The frame (the reused internal buffer when `out` is None)
+        """
+        frame = self.source.resize(self.size, self.resample, box=self.box_at(t))
+        if out is None:
+            out = self._frame
+        np.copyto(out, np.asarray(frame))
+        return out
+
+    def make_frame(self, t):
+        """moviepy-compatible frame function."""
+        return self.render(t)
+
+    def to_clip(self):
+        """Wrap the generator in a moviepy VideoClip."""
+        from moviepy.editor import VideoClip
+        return VideoClip(self.make_frame, duration=self.duration)
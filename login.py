@@ -1,34 +1,42 @@
 """
-Simple Smart Login - Saves sessionid locally for reuse
+Smart Login - One warm Instagram session per process, persisted between runs
+
+The full client settings (device, uuids, cookies, authorization) are saved
+to session.json (gitignored) together with the time the session was last
+validated, so later runs resume the same session on the same "device"
+instead of logging in again. Within a process one client is reused for
+every upload; it is re-validated (one account_info() round trip) only
+when its last check is older than SESSION_TTL, and a background thread
+re-validates it before that happens. Requests on the client hold the
+session (in_use), so the background check never runs alongside an upload.
+
+Login order: saved settings -> sessionid (.session_id or INSTA_SESSIONID)
+-> username/password. The fallbacks log in on the saved device (settings
+loaded first), so an expired session is renewed, not replaced by a new phone.
 """
+import json
 import os
+import threading
+import time
 from dotenv import load_dotenv
-from instagrapi import Client
 
 load_dotenv()
 
 USERNAME = os.getenv("INSTA_USERNAME")
 PASSWORD = os.getenv("INSTA_PASSWORD")
+SESSIONID = os.getenv("INSTA_SESSIONID")
 SESSIONID_FILE = ".session_id"
+SESSION_FILE = "session.json"
 
-
-def save_sessionid(sessionid):
-    """Save sessionid for next use"""
-    try:
-        with open(SESSIONID_FILE, 'w') as f:
-            f.write(sessionid)
-        print(f"💾 SessionID saved")
-        return True
-    except Exception as e:
-        print(f"⚠️ Failed to save: {e}")
-        return False
+SESSION_TTL = 6 * 3600               # Trust a session validated this recently (seconds)
+SESSION_REFRESH_INTERVAL = 4 * 3600  # Background re-validation period (seconds)
 
 
-def load_sessionid():
+def load_sessionid(path=SESSIONID_FILE):
     """Load saved sessionid"""
-    if os.path.exists(SESSIONID_FILE):
+    if os.path.exists(path):
         try:
-            with open(SESSIONID_FILE, 'r') as f:
+            with open(path, 'r') as f:
                 sid = f.read().strip()
             if sid:
                 print(f"✅ Found saved sessionid")
@@ -38,51 +46,247 @@ def load_sessionid():
     return None
 
 
-def delete_sessionid():
+def delete_sessionid(path=SESSIONID_FILE):
     """Delete invalid sessionid"""
     try:
-        if os.path.exists(SESSIONID_FILE):
-            os.remove(SESSIONID_FILE)
+        if os.path.exists(path):
+            os.remove(path)
             print(f"🗑️ Deleted invalid sessionid")
     except:
         pass
 
 
-def login_user():
-    """Try saved sessionid first, then username/password"""
-    cl = Client()
-    
-    # Try saved sessionid
-    sid = load_sessionid()
-    if sid:
-        try:
-            cl.login_by_sessionid(sid)
-            user = cl.account_info()
-            print(f"✅ Logged in as @{user.username}")
-            return cl
-        except:
-            print("❌ SessionID expired, using credentials...")
-            delete_sessionid()
-    
-    # Try username/password
-    if not USERNAME or not PASSWORD:
-        print("❌ Missing INSTA_USERNAME or INSTA_PASSWORD")
-        return None
-    
-    try:
-        cl.login(USERNAME, PASSWORD)
+def instagrapi_client():
+    """New instagrapi Client (imported here: heavy, only needed to log in)."""
+    from instagrapi import Client
+    return Client()
+
+
+class InstagramSession:
+    """
+    Persistent, self-refreshing Instagram login.
+
+    Args:
+        settings_path: Where the client settings are saved
+        username, password: Credentials for a fresh login
+        sessionid: Browser sessionid to fall back on when `sessionid_path`
+                   has none (default: INSTA_SESSIONID)
+        sessionid_path: Saved sessionid file (deleted once rejected)
+        ttl: Skip re-validation of a session checked less than `ttl`
+             seconds ago (also across runs: the time is saved with the
+             settings)
+        refresh_interval: Background re-validation period in seconds
+                          (None = no background refresh)
+        client_factory: Returns a new, logged-out client (default:
+                        instagrapi Client; inject one pointed at a local
+                        stand-in server to test)
+    """
+
+    def __init__(self, settings_path=SESSION_FILE, username=USERNAME, password=PASSWORD,
+                 sessionid=SESSIONID, sessionid_path=SESSIONID_FILE, ttl=SESSION_TTL,
+                 refresh_interval=SESSION_REFRESH_INTERVAL, client_factory=instagrapi_client):
+        self.settings_path = settings_path
+        self.username = username
+        self.password = password
+        self.sessionid = sessionid
+        self.sessionid_path = sessionid_path
+        self.ttl = ttl
+        self.refresh_interval = refresh_interval
+        self.client_factory = client_factory
+
+        self.cl = None
+        self.validated_at = 0.0
+        self._lock = threading.RLock()
+        self._refresher = None
+        self._stop = threading.Event()
+
+    # --- Persistence ---
+    def save(self):
+        """Write the client settings and the time of the last check (atomically)."""
+        settings = dict(self.cl.get_settings(), validated_at=self.validated_at)
+        staged = self.settings_path + ".tmp"
+        with open(staged, "w", encoding="utf-8") as f:
+            json.dump(settings, f, indent=4)
+        os.replace(staged, self.settings_path)
+
+    def _validate(self, cl):
         user = cl.account_info()
         print(f"✅ Logged in as @{user.username}")
-        
-        # Save sessionid for next time
-        if hasattr(cl, 'sessionid') and cl.sessionid:
-            save_sessionid(cl.sessionid)
-        
+        self.validated_at = time.time()
         return cl
-    except Exception as e:
-        print(f"❌ Login failed: {e}")
-        return None
+
+    def _saved_settings(self):
+        """(client settings, time of the last check) from the saved file, or None."""
+        if not os.path.exists(self.settings_path):
+            return None
+        with open(self.settings_path, "r", encoding="utf-8") as f:
+            settings = json.load(f)
+        validated_at = settings.pop("validated_at", 0.0)
+        return settings, validated_at
+
+    def _new_client(self):
+        """
+        Client for a fresh login, on the saved device when there is one.
+
+        Instagram ties a session to its device and uuids; logging in again
+        from a brand new "device" every time the session expires looks
+        like a different phone and invites checkpoints.
+        """
+        cl = self.client_factory()
+        try:
+            saved = self._saved_settings()
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not read saved settings ({e}), using a new device")
+            saved = None
+        if saved:
+            cl.set_settings(saved[0])
+            print("📱 Logging in again on the saved device")
+        return cl
+
+    # --- Login methods, in order ---
+    def _from_settings(self):
+        saved = self._saved_settings()
+        if saved is None:
+            return None
+        settings, validated_at = saved
+        cl = self.client_factory()
+        cl.set_settings(settings)
+        # Files without the time (copied, or saved by older versions) are checked
+        if time.time() - validated_at < self.ttl:
+            print("✅ Reusing saved session")
+            self.validated_at = validated_at
+            return cl
+        return self._validate(cl)
+
+    def _from_sessionid(self):
+        sid = load_sessionid(self.sessionid_path) or self.sessionid
+        if not sid:
+            return None
+        cl = self._new_client()
+        cl.login_by_sessionid(sid)
+        return self._validate(cl)
+
+    def _from_password(self):
+        if not self.username or not self.password:
+            print("❌ Missing INSTA_USERNAME or INSTA_PASSWORD")
+            return None
+        cl = self._new_client()
+        cl.login(self.username, self.password)
+        return self._validate(cl)
+
+    def login(self, reuse_saved=True):
+        """
+        Log in from scratch (saved settings, then sessionid, then password).
+
+        Args:
+            reuse_saved: Try the saved session first (False once it has
+                         been rejected; its device is still kept)
+        """
+        with self._lock:
+            self.cl = None
+            self.validated_at = 0.0
+            methods = (("Saved session", self._from_settings),
+                       ("SessionID", self._from_sessionid),
+                       ("Password login", self._from_password))
+            for name, method in methods[0 if reuse_saved else 1:]:
+                try:
+                    cl = method()
+                except Exception as e:
+                    print(f"❌ {name} failed: {e}")
+                    if name == "SessionID":
+                        delete_sessionid(self.sessionid_path)
+                    continue
+                if cl is None:
+                    continue
+
+                self.cl = cl
+                self.save()
+                self.start_refresh()
+                return cl
+            return None
+
+    # --- Warm client ---
+    def client(self):
+        """
+        The logged-in client, reused across uploads.
+
+        Re-validated only when the last check is older than the TTL; logs
+        in again if that check fails.
+
+        Returns:
+            Logged-in client or None
+        """
+        with self._lock:
+            if self.cl is None:
+                return self.login()
+            if time.time() - self.validated_at >= self.ttl:
+                return self.refresh()
+            return self.cl
+
+    def refresh(self):
+        """Validate the session now (log in again if it expired)."""
+        with self._lock:
+            if self.cl is None:
+                return self.login()
+            try:
+                self._validate(self.cl)
+            except Exception as e:
+                print(f"❌ Session check failed ({e}), logging in again...")
+                return self.login(reuse_saved=False)
+            self.save()
+            return self.cl
+
+    def in_use(self):
+        """
+        Hold the session while a request runs on its client:
+
+            with session.in_use():
+                cl.clip_upload(...)
+
+        The background refresh (and other threads' client()) waits, so
+        the client is never used from two threads at once.
+        """
+        return self._lock
+
+    def invalidate(self):
+        """Force a validation before the next use (e.g. after a failed upload)."""
+        with self._lock:
+            self.validated_at = 0.0
+
+    # --- Background refresh ---
+    def _refresh_loop(self):
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"⚠️ Background session refresh failed: {e}")
+
+    def start_refresh(self):
+        """Start the background refresh thread (once)."""
+        if self.refresh_interval and self._refresher is None:
+            self._refresher = threading.Thread(target=self._refresh_loop, daemon=True,
+                                               name="instagram-session-refresh")
+            self._refresher.start()
+
+    def stop_refresh(self):
+        self._stop.set()
+
+
+_session = None
+
+
+def get_session():
+    """The process-wide Instagram session."""
+    global _session
+    if _session is None:
+        _session = InstagramSession()
+    return _session
+
+
+def login_user():
+    """Logged-in client (warm and reused within a process), or None"""
+    return get_session().client()
 
 
 if __name__ == "__main__":
-    login_user()
\ No newline at end of file
+    login_user()
@@ -3,6 +3,7 @@ import time
 import random
 import json
 import shutil
+import argparse
 from dotenv import load_dotenv
 
 # --- 🛠️ FIX FOR PILLOW 10+ CRASH (MUST BE AT TOP) ---
@@ -11,16 +12,18 @@ if not hasattr(PIL.Image, 'ANTIALIAS'):
     PIL.Image.ANTIALIAS = PIL.Image.LANCZOS
 # ----------------------------------------------------
 
-# Google AI
-from google import genai
-from google.genai import types
- 
-
 # Instagram Login
-from login import login_user
+from login import get_session, login_user
 
 # Advanced Video Editor
-from video_editor import create_viral_reel_advanced, generate_thumbnail 
+from video_editor import create_viral_reel_advanced, plan_reel, render_plan, render_settings
+from reel_plan import ReelPlan, estimate_cost
+from orchestrator import run_batch, run_reel
+from daemon import HEALTH_PORT, run_daemon
+from still_cache import warm_still_cache
+from transition_bank import TransitionBank
+from music_library import MusicLibrary
+from encoder import ENCODER_PROFILES
 
 # --- CONFIGURATION ---
 load_dotenv()
@@ -30,6 +33,9 @@ GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 OUTPUT_DIR = "output"
 IMAGES_DIR = "images"
 
+# Latest posts searched for the caption before a retry (no duplicate posts)
+RECENT_MEDIA_CHECK = 6
+
 def clean_output():
     """Wipes the output folder to prevent old files from mixing in."""
     if os.path.exists(OUTPUT_DIR):
@@ -43,14 +49,23 @@ def clean_output():
     print("🧹 Workspace cleaned.")
 
 # --- STEP 1: VIRAL CONTENT (GEMINI) ---
-# --- STEP 1: VIRAL CONTENT (GEMINI) ---
+_gemini_client = None
+
+def get_gemini_client():
+    """One Gemini client per process (shared by every script of a batch)."""
+    global _gemini_client
+    if _gemini_client is None:
+        from google import genai  # Imported on first use: ~1s of startup otherwise
+        _gemini_client = genai.Client(api_key=GOOGLE_API_KEY)
+    return _gemini_client
+
 def get_viral_content():
     print("🧠 Brainstorming viral hook...")
     
     if not GOOGLE_API_KEY:
         raise ValueError("❌ GOOGLE_API_KEY missing in .env file!")
 
-    client = genai.Client(api_key=GOOGLE_API_KEY)
+    client = get_gemini_client()
     
     # Make prompt dynamic with random themes/topics for variety
     themes = [
@@ -98,6 +113,8 @@ def get_viral_content():
 )
 
 
+    from google.genai import types
+    
     try:
         response = client.models.generate_content(
             model="gemini-2.5-flash-lite",  # Better rate limits than exp
@@ -126,12 +143,15 @@ def get_viral_content():
         raise RuntimeError(f"Failed to generate content from Gemini: {e}")
 
 # --- STEP 3: ADVANCED VIDEO EDITING ---
-def create_viral_reel(audio_path, hindi_text):
+def create_viral_reel(audio_path, hindi_text, encoder_profile="standard", parallel=False,
+                      captions=True, progressive_grade=True, draft=False, draft_scale=0.5,
+                      seed=None):
     """
     Create viral reel using advanced video editor with:
     - Progressive color grading (B&W → Full Color)
-    - Crossfade transitions
+    - Transition clips or crossfades between the moving images
     - edgeTTS deep voice (if available)
+    - Burned-in Hindi captions
     - Fast-paced editing (0.5s per clip)
     - Automatic cleanup
     """
@@ -141,14 +161,21 @@ def create_viral_reel(audio_path, hindi_text):
     output_path = create_viral_reel_advanced(
         hindi_text=hindi_text,
         output_name="viral_reel.mp4",
-        use_voice=True  # Generate edgeTTS voice
+        use_voice=True,  # Generate edgeTTS voice
+        encoder_profile=encoder_profile,
+        parallel=parallel,
+        captions=captions,
+        progressive_grade=progressive_grade,
+        draft=draft,
+        draft_scale=draft_scale,
+        seed=seed
     )
     
     return output_path
 
 # --- STEP 4: UPLOAD TO INSTAGRAM ---
-def upload_reel(video_path, caption):
-    """Upload reel to Instagram"""
+def upload_reel(video_path, caption, client=None):
+    """Upload reel to Instagram (with the warm session unless a client is given)"""
     print("🚀 UPLOAD")
     print("=" * 60)
     
@@ -166,9 +193,11 @@ def upload_reel(video_path, caption):
         thumbnail = None
     
     # Login
-    print("\n🔐 LOGIN")
-    print("=" * 60)
-    cl = login_user()
+    cl = client
+    if cl is None:
+        print("\n🔐 LOGIN")
+        print("=" * 60)
+        cl = login_user()
     if not cl:
         return False
     
@@ -184,51 +213,282 @@ def upload_reel(video_path, caption):
     print("=" * 60)
     print(f"Caption: {caption[:50]}...")
     
-    try:
-        # Try with thumbnail
-        if thumbnail:
-            try:
-                media = cl.clip_upload(path=video_path, caption=caption, thumbnail=thumbnail)
-                if media and hasattr(media, 'code'):
-                    print(f"\n🎉 SUCCESS!")
-                    print(f"🔗 {media.code}")
-                    return True
-            except Exception as e:
-                if "pydantic" in str(e).lower() or "validation" in str(e).lower():
-                    print(f"\n✅ POSTED!")
-                    return True
-                print(f"⚠️ Retry without thumbnail...")
-        
-        # Try without thumbnail
-        media = cl.clip_upload(path=video_path, caption=caption)
-        if media and hasattr(media, 'code'):
-            print(f"\n🎉 SUCCESS!")
-            print(f"🔗 {media.code}")
+    session = get_session()
+    with session.in_use():
+        # A retry (e.g. by the daemon after a timeout) must not post it twice
+        if _already_posted(cl, caption):
             return True
-        
-        print("❌ Failed - no media code")
+        try:
+            return _clip_upload(cl, video_path, caption, thumbnail)
+        except Exception as e:
+            print(f"\n❌ Session rejected: {e}")
+    
+    # Rejected before Instagram took the clip: log in again and retry once
+    print("\n🔁 Logging in again, then retrying once...")
+    cl = session.refresh()
+    if not cl:
         return False
-        
+    with session.in_use():
+        try:
+            return _clip_upload(cl, video_path, caption, thumbnail)
+        except Exception as e:
+            print(f"\n❌ Session rejected again: {e}")
+            session.invalidate()
+            return False
+
+
+def _is_auth_error(error):
+    """Instagram refused the session itself (so the clip was not taken)."""
+    from instagrapi.exceptions import (
+        BadCredentials, ChallengeRequired, ClientLoginRequired, ClientUnauthorizedError,
+        LoginRequired
+    )
+    return isinstance(error, (BadCredentials, ChallengeRequired, ClientLoginRequired,
+                              ClientUnauthorizedError, LoginRequired))
+
+
+def _posted_anyway(error):
+    # instagrapi fails to parse some responses of uploads that did go through
+    return "pydantic" in str(error).lower() or "validation" in str(error).lower()
+
+
+def _already_posted(cl, caption):
+    """
+    Whether one of the account's latest posts has this caption.
+
+    Returns:
+        True / False, or None when the check itself failed
+    """
+    try:
+        medias = cl.user_medias_v1(cl.user_id, amount=RECENT_MEDIA_CHECK)
+    except Exception as e:
+        print(f"⚠️ Could not check recent posts: {e}")
+        return None
+    for media in medias:
+        if (media.caption_text or "").strip() == caption.strip():
+            print(f"✅ Already posted: {media.code}")
+            return True
+    return False
+
+
+def _clip_upload(cl, video_path, caption, thumbnail=None):
+    """
+    Upload the clip (with the thumbnail, then without it if the first try
+    surely didn't post). Any failure after which Instagram may still have
+    taken the clip (timeout, 5xx, no media code) is checked against the
+    latest posts instead of retried.
+
+    Returns:
+        Success; session errors (see _is_auth_error) are raised
+    """
+    if thumbnail:
+        try:
+            return _media_posted(cl, cl.clip_upload(path=video_path, caption=caption,
+                                                    thumbnail=thumbnail), caption)
+        except Exception as e:
+            if _is_auth_error(e):
+                raise
+            if _posted_anyway(e):
+                print(f"\n✅ POSTED!")
+                return True
+            print(f"⚠️ Upload with thumbnail failed: {e}")
+            posted = _already_posted(cl, caption)
+            if posted is not False:
+                # Posted, or no way to tell: a second upload could duplicate it
+                return bool(posted)
+            print(f"⚠️ Retry without thumbnail...")
+    
+    try:
+        return _media_posted(cl, cl.clip_upload(path=video_path, caption=caption), caption)
     except Exception as e:
-        if "pydantic" in str(e).lower() or "validation" in str(e).lower():
+        if _is_auth_error(e):
+            raise
+        if _posted_anyway(e):
             print(f"\n✅ POSTED!")
             return True
-        
         print(f"\n❌ Error: {e}")
-        return False
+        return bool(_already_posted(cl, caption))
+
+
+def _media_posted(cl, media, caption):
+    if media and hasattr(media, 'code'):
+        print(f"\n🎉 SUCCESS!")
+        print(f"🔗 {media.code}")
+        return True
+    print("❌ Failed - no media code")
+    return bool(_already_posted(cl, caption))
+
+# --- COMMAND LINE ---
+def parse_args():
+    parser = argparse.ArgumentParser(description="AutoReelBot - create and post a viral reel")
+    parser.add_argument(
+        "--warm-cache", action="store_true",
+        help="Pre-grade every image in images/ for all filters, then exit"
+    )
+    parser.add_argument(
+        "--prepare-transitions", action="store_true",
+        help="Decode and normalise every transition into the frame bank, then exit"
+    )
+    parser.add_argument(
+        "--prepare-music", action="store_true",
+        help="Decode every background music track into the PCM library, then exit"
+    )
+    parser.add_argument(
+        "--profile", choices=list(ENCODER_PROFILES), default="standard",
+        help="Encoder profile for the reel (default: standard)"
+    )
+    parser.add_argument(
+        "--parallel", action="store_true",
+        help="Encode the segments on all cores instead of one after another"
+    )
+    parser.add_argument(
+        "--no-captions", action="store_true",
+        help="Do not burn the script into the video as captions"
+    )
+    parser.add_argument(
+        "--no-grade", action="store_true",
+        help="Keep full color from the start (no B&W -> color progressive grade)"
+    )
+    parser.add_argument(
+        "--draft", action="store_true",
+        help="Quick preview at reduced size and frame rate with the draft encoder profile "
+             "(overrides --profile; not uploaded)"
+    )
+    parser.add_argument(
+        "--draft-scale", type=float, default=0.5,
+        help="Frame scale of --draft renders (default: 0.5 = 540x960)"
+    )
+    parser.add_argument(
+        "--seed", type=int, default=None,
+        help="Seed for the random choices. Gemini writes a new script each run, so this does not "
+             "reproduce a reel: re-render a draft at full quality with "
+             "--plan output/viral_reel.mp4.plan.json"
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true",
+        help="Generate the script and plan the reel, print the render cost estimate, then exit"
+    )
+    parser.add_argument(
+        "--plan", metavar="PLAN_JSON",
+        help="Render a saved reel plan (e.g. output/viral_reel.mp4.plan.json) without Gemini or upload"
+    )
+    parser.add_argument(
+        "--batch", type=int, metavar="N",
+        help="Generate and render N reels into the local outbox (outbox/) without uploading"
+    )
+    parser.add_argument(
+        "--daemon", action="store_true",
+        help="Keep running: pre-render reels into the outbox and post them on schedule"
+    )
+    parser.add_argument(
+        "--health-port", type=int, default=HEALTH_PORT,
+        help=f"Port of the --daemon health endpoint on 127.0.0.1 (default: {HEALTH_PORT})"
+    )
+    parser.add_argument(
+        "--sequential", action="store_true",
+        help="Run the stages one after another instead of overlapping them"
+    )
+    return parser.parse_args()
 
 # --- MAIN LOOP ---
 if __name__ == "__main__":
+    args = parse_args()
+    
+    if args.warm_cache or args.prepare_transitions or args.prepare_music:
+        if args.warm_cache:
+            warm_still_cache()
+        if args.prepare_transitions:
+            print("⚡ Preparing transition bank...")
+            TransitionBank().prepare_all()
+        if args.prepare_music:
+            print("🎵 Preparing music library...")
+            MusicLibrary().prepare_all()
+        raise SystemExit(0)
+    
+    if args.plan:
+        # Same plan, same reel: only the render settings come from the flags
+        plan = ReelPlan.load(args.plan)
+        render_plan(plan, "viral_reel.mp4", args.profile, args.parallel, args.draft, args.draft_scale)
+        raise SystemExit(0)
+    
+    if args.daemon:
+        # Long-lived process: warm clients and workers, outbox as the queue
+        run_daemon(
+            get_viral_content,
+            login=None if args.draft else login_user,
+            upload=None if args.draft else upload_reel,
+            port=args.health_port,
+            encoder_profile=args.profile,
+            captions=not args.no_captions,
+            progressive_grade=not args.no_grade,
+            draft=args.draft,
+            draft_scale=args.draft_scale
+        )
+        raise SystemExit(0)
+    
     try:
         clean_output()
         
+        if args.batch:
+            # One process, one Gemini client, warm workers and shared asset
+            # prep for the whole batch; renders spread over the cores
+            run_batch(
+                get_viral_content,
+                args.batch,
+                seed=args.seed,
+                encoder_profile=args.profile,
+                captions=not args.no_captions,
+                progressive_grade=not args.no_grade,
+                draft=args.draft,
+                draft_scale=args.draft_scale
+            )
+            raise SystemExit(0)
+        
+        if not (args.sequential or args.dry_run):
+            # Gemini, TTS, image grading, asset prep, rendering and login
+            # overlap as a stage graph; only the critical path is waited on
+            video_file, _ = run_reel(
+                get_viral_content,
+                login=None if args.draft else login_user,
+                upload=None if args.draft else upload_reel,
+                seed=args.seed,
+                encoder_profile=args.profile,
+                parallel=args.parallel,
+                captions=not args.no_captions,
+                progressive_grade=not args.no_grade,
+                draft=args.draft,
+                draft_scale=args.draft_scale
+            )
+            if args.draft:
+                print("📝 Draft render: not uploading (re-run without --draft to post)")
+            raise SystemExit(0)
+        
         # 1. Content Generation
         data = get_viral_content()
         print(f"📜 Hook: {data['hindi_quote'][:40]}...")
         
+        if args.dry_run:
+            plan = plan_reel(data['hindi_quote'], captions=not args.no_captions,
+                             progressive_grade=not args.no_grade, seed=args.seed)
+            plan_path = plan.save(os.path.join(OUTPUT_DIR, "viral_reel.mp4.plan.json"))
+            size, fps, profile = render_settings(args.draft, args.draft_scale, args.profile)
+            estimate = estimate_cost(plan, size, fps, profile)
+            print(f"\n📋 Plan saved: {plan_path}")
+            print(f"   {size[0]}x{size[1]} @ {fps} fps, profile {profile}: "
+                  f"{estimate['frames']} frames, render ~{estimate['render_seconds']:.0f}s, "
+                  f"encode ~{estimate['encode_seconds']:.0f}s, total ~{estimate['estimated_seconds']:.0f}s")
+            raise SystemExit(0)
+        
         # 2. Video Creation (with integrated voice generation)
         # The advanced video editor handles both voice and video creation
-        video_file = create_viral_reel(None, data['hindi_quote'])
+        video_file = create_viral_reel(None, data['hindi_quote'], encoder_profile=args.profile,
+                                       parallel=args.parallel, captions=not args.no_captions,
+                                       progressive_grade=not args.no_grade, draft=args.draft,
+                                       draft_scale=args.draft_scale, seed=args.seed)
+        
+        if args.draft:
+            print("📝 Draft render: not uploading (re-run without --draft to post)")
+            raise SystemExit(0)
         
         # 3. Upload
         caption = f"{data['caption']}\n\n{data['hashtags']}"
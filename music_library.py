@@ -0,0 +1,163 @@
+"""
+🎵 Background Music Library
+===========================
+Tracks from assets/background_music are decoded once to 44.1 kHz stereo
+int16 PCM and stored as memory-mapped .npy files in .cache/music, with
+duration and peak level kept in a small JSON index next to them.
+
+A render then builds its music bed (looped, trimmed, gain-adjusted) by
+slicing the mapped array - no AudioFileClip, no ffmpeg reader process
+and no chunk-by-chunk decoding per render.
+
+Prepare the whole library ahead of time with:
+    python main.py --prepare-music
+"""
+
+import json
+import os
+
+import numpy as np
+
+from disk_cache import CACHE_DIR, DiskCache, file_digest, make_key
+from encoder import AUDIO_FPS
+from ffmpeg_utils import decode_audio
+
+ASSETS_DIR = "assets"
+MUSIC_DIR = os.path.join(ASSETS_DIR, "background_music")
+MUSIC_CACHE_DIR = os.path.join(CACHE_DIR, "music")
+MUSIC_CACHE_MAX_BYTES = 1024 * 1024 * 1024
+MUSIC_LIBRARY_VERSION = 1
+MUSIC_CHANNELS = 2
+MUSIC_EXTENSIONS = ('.mp3',)
+
+# Dot-prefixed so DiskCache never counts or evicts it
+INDEX_NAME = ".index.json"
+
+
+class MusicLibrary:
+    """
+    Decoded background music for one sample format.
+
+    Args:
+        music_dir: Folder with the source tracks
+        rate: Sample rate to decode at
+        channels: Channel count to decode to
+    """
+
+    def __init__(self, music_dir=MUSIC_DIR, rate=AUDIO_FPS, channels=MUSIC_CHANNELS):
+        self.music_dir = music_dir
+        self.rate = rate
+        self.channels = channels
+        self.cache = DiskCache(MUSIC_CACHE_DIR, MUSIC_CACHE_MAX_BYTES)
+        self.index_path = os.path.join(MUSIC_CACHE_DIR, INDEX_NAME)
+        self._samples = {}
+
+    def names(self):
+        """Available track file names."""
+        if not os.path.isdir(self.music_dir):
+            return []
+        return sorted(
+            f for f in os.listdir(self.music_dir)
+            if f.lower().endswith(MUSIC_EXTENSIONS)
+        )
+
+    def key(self, name):
+        """Cache key of a decoded track."""
+        return make_key(
+            "music",
+            MUSIC_LIBRARY_VERSION,
+            file_digest(os.path.join(self.music_dir, name)),
+            self.rate,
+            self.channels,
+        )
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_entry(self, key, entry):
+        """Add one entry to the index (re-read first, written atomically)."""
+        index = self._load_index()
+        index[key] = entry
+        staged = self.cache.staging_path("index", ".json")
+        with open(staged, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=1)
+        os.replace(staged, self.index_path)
+
+    def prepare(self, name):
+        """Decode a track unless already cached. Returns its .npy path."""
+        key = self.key(name)
+        path = self.cache.lookup(key, ".npy")
+        if path and key in self._load_index():
+            return path
+
+        samples = decode_audio(os.path.join(self.music_dir, name), self.rate, self.channels)
+        if len(samples) == 0:
+            raise RuntimeError(f"ffmpeg decoded no audio from {name}")
+        if samples.ndim == 1:
+            samples = samples[:, None]
+
+        staged = self.cache.staging_path(key, ".npy")
+        pcm = np.lib.format.open_memmap(staged, mode="w+", dtype=np.int16, shape=samples.shape)
+        pcm[:] = np.clip(samples * 32768.0, -32768, 32767)
+        pcm.flush()
+        del pcm
+
+        self._save_entry(key, {
+            "name": name,
+            "samples": int(samples.shape[0]),
+            "duration": samples.shape[0] / self.rate,
+            "peak": float(np.abs(samples).max()),
+        })
+        return self.cache.store(key, staged, ".npy")
+
+    def prepare_all(self):
+        """Decode every track. Returns the number of tracks available."""
+        names = self.names()
+        for name in names:
+            self.prepare(name)
+            print(f"   ✓ Music ready: {name} ({self.info(name)['duration']:.1f}s)")
+        return len(names)
+
+    def info(self, name):
+        """Index entry of a track: name, samples, duration (s), peak (0-1)."""
+        key = self.key(name)
+        entry = self._load_index().get(key)
+        if entry is None or not self.cache.lookup(key, ".npy"):
+            self.prepare(name)
+            entry = self._load_index()[key]
+        return entry
+
+    def samples(self, name):
+        """Memory-mapped (n, channels) int16 PCM of a track (decoded on first use)."""
+        samples = self._samples.get(name)
+        if samples is None:
+            samples = np.load(self.prepare(name), mmap_mode="r")
+            self._samples[name] = samples
+        return samples
+
+    def bed(self, name, length, gain=1.0, offset=0):
+        """
+        Music bed of exactly `length` samples: the track from `offset`,
+        looped back to the start when it runs out, scaled by `gain`.
+
+        Returns:
+            (length, channels) float32 PCM
+        """
+        track = self.samples(name)
+        n = len(track)
+        offset %= n
+        scale = np.float32(gain / 32768.0)
+
+        out = np.empty((length, track.shape[1]), dtype=np.float32)
+        filled = 0
+        start = offset
+        while filled < length:
+            take = min(n - start, length - filled)
+            np.multiply(track[start:start + take], scale, out=out[filled:filled + take])
+            filled += take
+            start = 0
+        return out
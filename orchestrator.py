@@ -0,0 +1,347 @@
+"""
+🕸️ Stage Orchestrator
+=====================
+Runs one reel as a graph of stages instead of one step after another:
+
+    content (Gemini) ──► voice (TTS) ──► plan ──► render ──► upload
+    stills (grading) ──────────────────────────────┤          │
+    music / transitions (decode) ──────────────────┘  login ──┘
+
+- Every stage starts the moment its inputs are ready, so a run takes as
+  long as its critical path (Gemini -> TTS -> render -> upload) instead
+  of the sum of all stages
+- I/O-bound stages (Gemini, edgeTTS, Instagram) run from the asyncio
+  event loop; blocking clients run in worker threads
+- CPU-bound stages (grading the stills the seed will pick, decoding music
+  and transitions, rendering the plan) run in a process pool
+- The stills are known before the script exists: the seeded planner
+  picks images and filter before it looks at the voice-over
+  (video_editor.choose_images)
+- Planning only needs the script and the voice-over; asset decoding is
+  waited on by the render alone
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from encoder import auto_threads, get_profile
+from music_library import MusicLibrary
+from outbox import OUTBOX_DIR, add_reel
+from reel_plan import ReelPlan
+from still_cache import get_graded_still
+from transition_bank import TransitionBank
+from video_editor import (IMAGES_DIR, OUTPUT_DIR, choose_images, create_deep_voice_pcm, plan_reel,
+                          render_plan, render_settings)
+
+# Stage kinds
+IO = "io"        # Blocking call, run in a thread
+CPU = "cpu"      # Picklable function, run in the process pool
+ASYNC = "async"  # Coroutine function, awaited on the loop
+
+BATCH_CONTENT_CONCURRENCY = 2  # Gemini requests in flight during a batch
+
+
+class StageGraph:
+    """
+    Stages with dependencies, each started as soon as its inputs are done.
+
+    A stage is called with the results of its dependencies, in order.
+    If a stage fails, its dependents fail with the same error; run()
+    raises it once every other stage has finished (or returns it as the
+    stage result with raise_errors=False).
+
+    Args:
+        workers: Process pool size (default: CPU count)
+        pool: Long-lived ProcessPoolExecutor to use instead of a new one per
+              run (keeps worker processes and their caches warm)
+    """
+
+    def __init__(self, workers=None, pool=None):
+        self.workers = workers or auto_threads()
+        self.stages = {}
+        self.timings = {}
+        self.pool = pool
+        self._own_pool = pool is None
+        self._start = None
+
+    def add(self, name, func, deps=(), kind=IO):
+        """Register a stage. Dependencies must be registered first."""
+        for dep in deps:
+            if dep not in self.stages:
+                raise ValueError(f"❌ Stage '{name}' depends on unknown stage '{dep}'")
+        self.stages[name] = (func, tuple(deps), kind)
+        return self
+
+    async def run_cpu(self, func, *args):
+        """Run a picklable function in the process pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.pool, func, *args)
+
+    async def _run_stage(self, name, tasks):
+        func, deps, kind = self.stages[name]
+        inputs = [await tasks[dep] for dep in deps]
+
+        started = time.perf_counter()
+        try:
+            if kind == CPU:
+                return await self.run_cpu(func, *inputs)
+            if kind == ASYNC:
+                return await func(*inputs)
+            return await asyncio.to_thread(func, *inputs)
+        finally:
+            self.timings[name] = (started - self._start, time.perf_counter() - self._start)
+
+    async def run(self, raise_errors=True):
+        """Run every stage. Returns {stage name: result (or exception)}."""
+        self._start = time.perf_counter()
+        if self._own_pool:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        try:
+            tasks = {}
+            for name in self.stages:
+                tasks[name] = asyncio.ensure_future(self._run_stage(name, tasks))
+            outcomes = await asyncio.gather(*tasks.values(), return_exceptions=True)
+        finally:
+            if self._own_pool:
+                self.pool.shutdown()
+                self.pool = None
+
+        for outcome in outcomes:
+            if raise_errors and isinstance(outcome, BaseException):
+                raise outcome
+        return dict(zip(tasks, outcomes))
+
+    def report(self):
+        """Print when each stage ran, and the time saved by overlapping them."""
+        if not self.timings:
+            return
+        wall = max(end for _, end in self.timings.values())
+        busy = sum(end - start for start, end in self.timings.values())
+        print("\n🕸️ Stage timings")
+        for name, (start, end) in sorted(self.timings.items(), key=lambda item: item[1][0]):
+            print(f"   {name:<12} {start:6.1f}s → {end:6.1f}s  ({end - start:.1f}s)")
+        print(f"   Wall clock: {wall:.1f}s (stages one after another: {busy:.1f}s)")
+
+
+# --- Reel stages (top-level so the process pool can run them) ---
+def prepare_music():
+    """Decode every background track into the PCM library."""
+    return MusicLibrary().prepare_all()
+
+
+def prepare_transitions(size):
+    """Decode every transition into the frame bank, at full and render size."""
+    count = TransitionBank().prepare_all()
+    if tuple(size) != TransitionBank().size:
+        TransitionBank(size=size).prepare_all()
+    return count
+
+
+def render_plan_job(plan_data, output_name, encoder_profile, parallel, draft, draft_scale):
+    """Render a plan shipped as a dict (ReelPlan.to_dict) in a worker process."""
+    return render_plan(ReelPlan.from_dict(plan_data), output_name, encoder_profile, parallel,
+                       draft, draft_scale)
+
+
+def _add_asset_stages(graph, seeds, size):
+    """Shared prep stages: the stills every seed will pick, music and transitions."""
+    # The seed fixes images and filter before the script exists
+    stills = []
+    for seed in seeds:
+        _, images, filter_type = choose_images(random.Random(seed))
+        for name in images:
+            job = (os.path.join(IMAGES_DIR, name), filter_type)
+            if job not in stills:
+                stills.append(job)
+
+    async def grade_stills():
+        await asyncio.gather(*(
+            graph.run_cpu(get_graded_still, path, filter_type, size) for path, filter_type in stills
+        ))
+        return len(stills)
+
+    graph.add("stills", grade_stills, kind=ASYNC)
+    graph.add("music", prepare_music, kind=CPU)
+    graph.add("transitions", partial(prepare_transitions, size), kind=CPU)
+
+
+def _add_reel_stages(graph, suffix, get_content, seed, render, captions, progressive_grade):
+    """content -> voice -> plan -> render stages of one reel (names end in `suffix`)."""
+    def voice(content):
+        # On failure the planner makes a silent reel (without trying TTS again)
+        try:
+            return create_deep_voice_pcm(content["hindi_quote"])
+        except Exception as e:
+            print(f"⚠️ Voice stage failed: {e}")
+            return None
+
+    def plan(content, voice_over):
+        # Music and transitions are decoded by their own stages, for the render
+        return plan_reel(content["hindi_quote"], captions=captions,
+                         progressive_grade=progressive_grade, seed=seed,
+                         use_voice=voice_over is not None, voice_over=voice_over,
+                         prepare_assets=False).to_dict()
+
+    async def render_prepared(plan_data, content, stills, music, transitions):
+        return await render(plan_data, content)
+
+    graph.add("content" + suffix, get_content)
+    graph.add("voice" + suffix, voice, deps=("content" + suffix,))
+    graph.add("plan" + suffix, plan, deps=("content" + suffix, "voice" + suffix))
+    graph.add("render" + suffix, render_prepared,
+              deps=("plan" + suffix, "content" + suffix, "stills", "music", "transitions"),
+              kind=ASYNC)
+
+
+def build_reel_graph(get_content, login=None, upload=None, seed=None, output_name="viral_reel.mp4",
+                     encoder_profile="standard", parallel=False, captions=True,
+                     progressive_grade=True, draft=False, draft_scale=0.5, workers=None):
+    """
+    Stage graph for one reel, from script generation to upload.
+
+    Args:
+        get_content: Blocking function returning the Gemini content dict
+                     ({"hindi_quote", "caption", "hashtags", ...})
+        login: Blocking function returning a logged-in client (None = no upload)
+        upload: Blocking upload(video_path, caption, client) (None = no upload)
+        seed: Seed of the plan (default: a new one)
+        output_name: Output video filename
+        encoder_profile, parallel, captions, progressive_grade, draft,
+        draft_scale: As in video_editor.create_viral_reel_advanced
+        workers: Process pool size (default: CPU count)
+
+    Returns:
+        StageGraph; its "render" stage returns the video path and its
+        "upload" stage (if any) the upload result
+    """
+    if seed is None:
+        seed = random.randrange(2**32)
+    size, _, _ = render_settings(draft, draft_scale, encoder_profile)
+
+    graph = StageGraph(workers)
+
+    async def render(plan_data, content):
+        plan_path = os.path.join(OUTPUT_DIR, output_name + ".plan.json")
+        ReelPlan.from_dict(plan_data).save(plan_path)
+        return await graph.run_cpu(render_plan_job, plan_data, output_name, encoder_profile,
+                                   parallel, draft, draft_scale)
+
+    _add_asset_stages(graph, [seed], size)
+    _add_reel_stages(graph, "", get_content, seed, render, captions, progressive_grade)
+
+    if login and upload:
+        def post(video_path, content, client):
+            caption = f"{content['caption']}\n\n{content['hashtags']}"
+            return upload(video_path, caption, client)
+
+        graph.add("login", login)
+        graph.add("upload", post, deps=("render", "content", "login"))
+    return graph
+
+
+def run_reel(get_content, login=None, upload=None, **options):
+    """
+    Build and run the reel stage graph (see build_reel_graph for options).
+
+    Returns:
+        (video_path, upload_result): upload_result is None without upload
+    """
+    graph = build_reel_graph(get_content, login, upload, **options)
+    try:
+        results = asyncio.run(graph.run())
+    finally:
+        graph.report()
+    return results["render"], results.get("upload")
+
+
+def batch_output_name(k, seed):
+    """Output filename (in OUTPUT_DIR) of reel k of a batch, before it moves to the outbox."""
+    return f"batch_{k}_{seed}.mp4"
+
+
+def build_batch_graph(get_content, count, seed=None, encoder_profile="standard", captions=True,
+                      progressive_grade=True, draft=False, draft_scale=0.5, workers=None,
+                      outbox_dir=OUTBOX_DIR, pool=None):
+    """
+    Stage graph for `count` reels rendered into the outbox.
+
+    All reels share one process, one pool of warm worker processes and
+    the asset prep stages; reel k renders while later reels are still
+    waiting on Gemini or TTS. Each render gets an equal share of the
+    cores for x264.
+
+    Args:
+        get_content: Blocking function returning one Gemini content dict
+        count: Number of reels
+        seed: Seed of the first reel (reel k uses seed + k; default: random)
+        encoder_profile, captions, progressive_grade, draft, draft_scale:
+            As in video_editor.create_viral_reel_advanced
+        workers: Process pool size (default: CPU count)
+        outbox_dir: Where finished reels go (see outbox.py)
+        pool: Long-lived process pool to reuse (see StageGraph)
+
+    Returns:
+        StageGraph; its "render_<k>" stages return the outbox entries
+    """
+    if seed is None:
+        seed = random.randrange(2**32)
+    seeds = [seed + k for k in range(count)]
+    size, _, encoder_profile = render_settings(draft, draft_scale, encoder_profile)
+
+    graph = StageGraph(workers, pool)
+    renders = max(1, min(count, graph.workers))
+    settings = dict(get_profile(encoder_profile), threads=max(1, auto_threads() // renders))
+
+    # Gemini rate limits: only a few scripts in flight at once
+    gemini_slots = threading.Semaphore(BATCH_CONTENT_CONCURRENCY)
+
+    def content():
+        with gemini_slots:
+            return get_content()
+
+    def render_to_outbox(k):
+        async def render(plan_data, content):
+            output_name = batch_output_name(k, seeds[k])
+            video_path = await graph.run_cpu(render_plan_job, plan_data, output_name, settings,
+                                             False, draft, draft_scale)
+            return add_reel(video_path, ReelPlan.from_dict(plan_data), content, outbox_dir)
+        return render
+
+    _add_asset_stages(graph, seeds, size)
+    for k in range(count):
+        _add_reel_stages(graph, f"_{k}", content, seeds[k], render_to_outbox(k), captions,
+                         progressive_grade)
+    return graph
+
+
+def run_batch(get_content, count, **options):
+    """
+    Render `count` reels into the outbox (see build_batch_graph for options).
+
+    Returns:
+        Outbox entries of the reels that were rendered
+    """
+    graph = build_batch_graph(get_content, count, **options)
+    start = time.perf_counter()
+    try:
+        results = asyncio.run(graph.run(raise_errors=False))
+    finally:
+        graph.report()
+    elapsed = time.perf_counter() - start
+
+    # One failed reel doesn't cost the rest of the batch
+    entries = []
+    for k in range(count):
+        result = results[f"render_{k}"]
+        if isinstance(result, BaseException):
+            print(f"❌ Reel {k + 1}/{count} failed: {result}")
+        else:
+            entries.append(result)
+    print(f"\n📬 {len(entries)}/{count} reels in the outbox in {elapsed:.1f}s "
+          f"({elapsed / max(1, len(entries)):.1f}s per reel)")
+    return entries
@@ -0,0 +1,84 @@
+"""
+📬 Reel Outbox
+==============
+Finished reels waiting to be posted, one folder per reel in outbox/:
+
+    outbox/20260118-093000-1a2b3c4d5e6f/
+        reel.mp4      rendered video
+        plan.json     the ReelPlan it was rendered from
+        post.json     caption, hashtags and script from Gemini
+        posted.json   written once uploaded (media code, time)
+
+Folders are created under a temporary name and renamed into place, so a
+crash never leaves a half-written reel in the queue. Reels are posted
+oldest first.
+"""
+
+import json
+import os
+import shutil
+import time
+
+OUTBOX_DIR = "outbox"
+REEL_FILE = "reel.mp4"
+PLAN_FILE = "plan.json"
+POST_FILE = "post.json"
+POSTED_FILE = "posted.json"
+
+
+def _write_json(path, data):
+    staged = path + ".tmp"
+    with open(staged, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=1)
+    os.replace(staged, path)
+
+
+def add_reel(video_path, plan, content, outbox_dir=OUTBOX_DIR):
+    """
+    Move a rendered reel into the outbox.
+
+    Args:
+        video_path: Rendered .mp4 (moved, not copied)
+        plan: ReelPlan it was rendered from
+        content: Gemini content dict (caption, hashtags, hindi_quote, ...)
+        outbox_dir: Outbox folder
+
+    Returns:
+        Path of the new outbox entry
+    """
+    name = f"{time.strftime('%Y%m%d-%H%M%S')}-{plan.hash()[:12]}"
+    entry = os.path.join(outbox_dir, name)
+    staging = os.path.join(outbox_dir, f".staging-{name}")
+    os.makedirs(staging, exist_ok=True)
+
+    shutil.move(video_path, os.path.join(staging, REEL_FILE))
+    plan.save(os.path.join(staging, PLAN_FILE))
+    _write_json(os.path.join(staging, POST_FILE), dict(content, created=time.time()))
+    os.replace(staging, entry)
+    return entry
+
+
+def pending(outbox_dir=OUTBOX_DIR):
+    """Outbox entries not posted yet, oldest first."""
+    if not os.path.isdir(outbox_dir):
+        return []
+    entries = []
+    for name in sorted(os.listdir(outbox_dir)):
+        entry = os.path.join(outbox_dir, name)
+        if (not name.startswith(".") and os.path.isdir(entry)
+                and not os.path.exists(os.path.join(entry, POSTED_FILE))):
+            entries.append(entry)
+    return entries
+
+
+def load_post(entry):
+    """(video_path, caption, content) of an outbox entry."""
+    with open(os.path.join(entry, POST_FILE), "r", encoding="utf-8") as f:
+        content = json.load(f)
+    caption = f"{content['caption']}\n\n{content['hashtags']}"
+    return os.path.join(entry, REEL_FILE), caption, content
+
+
+def mark_posted(entry, media_code=None):
+    """Record that an entry was uploaded (it leaves the queue)."""
+    _write_json(os.path.join(entry, POSTED_FILE), {"media_code": media_code, "posted": time.time()})
@@ -0,0 +1,220 @@
+"""
+📋 Reel Plan
+============
+Every decision about a reel - images, filter, zooms, durations,
+transitions, music, captions, grade - in one JSON-serialisable object.
+
+Planning and rendering are separate steps:
+- a seeded planner makes all random choices and times the segments to
+  the voice-over (video_editor.plan_reel)
+- a renderer turns the plan into an MP4 at any quality
+  (video_editor.render_plan), without making any choice of its own
+
+So the same plan always gives the same reel: it can be saved and
+re-rendered later (a draft first, then full quality), shipped to a
+worker process, keyed by its hash in the render cache, or costed
+without rendering (estimate_cost).
+
+Plans are plain JSON:
+    {"version": 2, "seed": 42, "text": "...", "filter": "warm",
+     "voice": {"name": "hi-IN-MadhurNeural", "prosody": {...}, "digest": "..."},
+     "music": {"name": "track.mp3", "gain": 1.0},
+     "segments": [segment specs, see timeline.py], "duration": 14.5}
+"""
+
+import json
+import os
+import shutil
+
+from disk_cache import CACHE_DIR, DiskCache, file_digest, make_key
+from encoder import auto_threads, get_profile
+from timeline import segment_frame_counts
+
+REEL_PLAN_VERSION = 2
+
+# Finished reels by plan hash + render settings
+RENDER_CACHE_DIR = os.path.join(CACHE_DIR, "reels")
+RENDER_CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024
+
+# --- Dry-run cost model ---
+# Rough single-core seconds per megapixel per frame, measured on the
+# 1080x1920 render path
+RENDER_COST = {
+    "still": 0.033,       # Ken Burns crop-and-scale
+    "transition": 0.001,  # Copy from the memory-mapped bank
+    "crossfade": 0.07,    # Both stills' Ken Burns frames + one int16 lerp
+}
+GRADE_COST = 0.0055       # Progressive grade (frames inside the ramp)
+CAPTION_COST = 0.002      # Caption tiles (frames with a cue)
+ENCODE_COST = {           # libx264, per x264 preset
+    "ultrafast": 0.01,
+    "superfast": 0.014,
+    "veryfast": 0.02,
+    "faster": 0.03,
+    "fast": 0.04,
+    "medium": 0.05,
+    "slow": 0.09,
+}
+
+
+class ReelPlan:
+    """
+    Complete, renderer-independent description of one reel.
+
+    Args:
+        text: Script (voice-over and captions)
+        seed: Seed the planner drew its random choices from
+        filter_type: Colour grade preset of every still
+        segments: Ordered segment specs (stills, transitions, crossfades)
+                  with their captions and grade attached
+        voice: {"name", "prosody", "digest"} of the voice-over (digest: its
+               tts_cache.pcm_digest), or None for silent reels
+        music: {"name", "gain"} of the background music, or None
+        duration: Reel duration in seconds (default: sum of the segments)
+    """
+
+    def __init__(self, text, seed, filter_type, segments, voice=None, music=None,
+                 duration=None):
+        self.text = text
+        self.seed = seed
+        self.filter_type = filter_type
+        self.segments = list(segments)
+        self.voice = voice
+        self.music = music
+        self.duration = (duration if duration is not None
+                         else sum(spec["duration"] for spec in self.segments))
+
+    def to_dict(self):
+        return {
+            "version": REEL_PLAN_VERSION,
+            "seed": self.seed,
+            "text": self.text,
+            "filter": self.filter_type,
+            "voice": self.voice,
+            "music": self.music,
+            "segments": self.segments,
+            "duration": self.duration,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("version") != REEL_PLAN_VERSION:
+            raise ValueError(f"❌ Unsupported reel plan version: {data.get('version')} "
+                             f"(expected {REEL_PLAN_VERSION})")
+        return cls(data["text"], data["seed"], data["filter"], data["segments"],
+                   voice=data.get("voice"), music=data.get("music"),
+                   duration=data.get("duration"))
+
+    def to_json(self, indent=None):
+        return json.dumps(self.to_dict(), ensure_ascii=False, sort_keys=True, indent=indent)
+
+    @classmethod
+    def from_json(cls, text):
+        return cls.from_dict(json.loads(text))
+
+    def save(self, path):
+        """Write the plan as JSON (atomically). Returns path."""
+        staged = path + ".tmp"
+        with open(staged, "w", encoding="utf-8") as f:
+            f.write(self.to_json(indent=1))
+        os.replace(staged, path)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_json(f.read())
+
+    def hash(self):
+        """Content hash of the plan (identical plans -> identical reels)."""
+        return make_key("reel-plan", self.to_json())
+
+    def images(self):
+        """Image paths the plan uses, in order of first appearance."""
+        paths = []
+        for spec in self.segments:
+            ends = (spec["from"], spec["to"]) if spec["type"] == "crossfade" else (spec,)
+            for end in ends:
+                if end["type"] == "still" and end["image"] not in paths:
+                    paths.append(end["image"])
+        return paths
+
+    def transitions(self):
+        """Transition clip names the plan uses."""
+        return sorted({spec["name"] for spec in self.segments if spec["type"] == "transition"})
+
+
+def render_key(plan, size, fps, profile, sources=()):
+    """
+    Render cache key of a plan at given render settings.
+
+    Args:
+        plan: ReelPlan
+        size: Frame size (width, height)
+        fps: Frame rate
+        profile: Encoder profile name or settings dict
+        sources: Asset files the render reads (images, transitions, music);
+                 their content is part of the key
+    """
+    return make_key(
+        "reel",
+        plan.hash(),
+        [file_digest(path) for path in sources],
+        tuple(size),
+        fps,
+        sorted(get_profile(profile).items()),
+    )
+
+
+_render_cache = DiskCache(RENDER_CACHE_DIR, RENDER_CACHE_MAX_BYTES)
+
+
+def lookup_render(key):
+    """Path of a cached reel or None."""
+    return _render_cache.lookup(key, ".mp4")
+
+
+def store_render(key, video_path):
+    """Copy a finished reel into the render cache. Returns the cached path."""
+    staged = _render_cache.staging_path(key, ".mp4")
+    shutil.copyfile(video_path, staged)
+    return _render_cache.store(key, staged, ".mp4")
+
+
+def estimate_cost(plan, size, fps, profile):
+    """
+    Dry-run estimate of the work to render a plan, without rendering.
+
+    Returns:
+        Dict with frames, megapixels, per-stage seconds (render, encode)
+        and the estimated wall-clock seconds
+    """
+    megapixels = size[0] * size[1] / 1e6
+    frames = {}
+    render = 0.0
+    counts = segment_frame_counts([spec["duration"] for spec in plan.segments], fps)
+    for spec, count in zip(plan.segments, counts):
+        frames[spec["type"]] = frames.get(spec["type"], 0) + count
+        cost = RENDER_COST[spec["type"]]
+        if spec.get("saturation"):
+            cost += GRADE_COST * min(1.0, spec["saturation"][1] / spec["duration"])
+        if spec.get("captions"):
+            shown = sum(cue["end"] - cue["start"] for cue in spec["captions"])
+            cost += CAPTION_COST * min(1.0, shown / spec["duration"])
+        render += count * cost * megapixels
+
+    total_frames = sum(frames.values())
+    preset = get_profile(profile)["preset"]
+    encode = total_frames * ENCODE_COST.get(preset, ENCODE_COST["medium"]) * megapixels
+
+    # Frame generation runs on one core; x264 spreads over the rest
+    threads = auto_threads()
+    wall = max(render, encode / max(1, threads - 1)) if threads > 1 else render + encode
+    return {
+        "frames": total_frames,
+        "frames_by_type": frames,
+        "megapixels": round(total_frames * megapixels, 1),
+        "render_seconds": round(render, 1),
+        "encode_seconds": round(encode, 1),
+        "estimated_seconds": round(wall, 1),
+    }
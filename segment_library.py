@@ -0,0 +1,100 @@
+"""
+📚 Encoded Segment Library
+==========================
+Persistent store of encoded, concat-compatible H.264 chunks in
+.cache/segments, so a Ken Burns still (same image, filter and zoom) or a
+transition that was encoded for an earlier reel is never rendered or
+encoded again.
+
+Keys are deterministic:
+- stills: graded still key (image content, filter preset, size, pipeline
+  version) + zoom + duration (+ motion window when crossfades overlap it)
+- transitions: transition bank key (file content, size, fps, duration)
+  + duration
+- crossfades: graded still keys, zooms and motion durations of both ends
+- all: frame rate, frame count (see timeline.segment_frame_counts),
+  encoder settings and SEGMENT_LIBRARY_VERSION, plus
+  the progressive grade and burned-in caption cues when there are any
+
+Zoom ratios are quantised to ZOOM_LEVELS so random choices hit the library.
+"""
+
+import os
+import shutil
+
+from disk_cache import CACHE_DIR, DiskCache, make_key
+from encoder import get_profile
+from still_cache import still_key
+from transition_bank import TransitionBank
+
+SEGMENT_CACHE_DIR = os.path.join(CACHE_DIR, "segments")
+SEGMENT_CACHE_MAX_BYTES = 1024 * 1024 * 1024
+SEGMENT_LIBRARY_VERSION = 2
+
+# Zoom ratios a Ken Burns segment can use (keeps the library small)
+ZOOM_LEVELS = (1.15, 1.2, 1.25)
+
+# Encoder settings that change the bitstream (threads only changes speed)
+ENCODER_KEY_FIELDS = ("preset", "crf", "tune")
+
+_library = DiskCache(SEGMENT_CACHE_DIR, SEGMENT_CACHE_MAX_BYTES)
+
+
+def quantize_zoom(zoom):
+    """Snap a zoom ratio to the nearest entry of ZOOM_LEVELS."""
+    return min(ZOOM_LEVELS, key=lambda level: abs(level - zoom))
+
+
+def segment_key(spec, size, fps, profile, chunk_args=(), frames=None):
+    """
+    Deterministic library key of an encoded segment.
+
+    `frames` is the segment's frame count in its reel: the same spec can
+    get one frame more or less depending on where it starts.
+    """
+    settings = get_profile(profile)
+    encoder_key = tuple(settings.get(field) for field in ENCODER_KEY_FIELDS)
+
+    kind = spec["type"]
+    if kind == "still":
+        source_key = (still_key(spec["image"], spec["filter"], size), spec["zoom"])
+        if "motion" in spec:
+            source_key += (spec.get("start", 0.0), spec["motion"])
+    elif kind == "transition":
+        source_key = (TransitionBank(size=size).key(spec["name"]),)
+    elif kind == "crossfade":
+        source_key = tuple(
+            (still_key(end["image"], end["filter"], size), end["zoom"], end["duration"])
+            for end in (spec["from"], spec["to"])
+        )
+    else:
+        raise ValueError(f"❌ Unknown segment type: {kind}")
+    if spec.get("saturation"):
+        source_key += (tuple(spec["saturation"]),)
+    if spec.get("captions"):
+        source_key += (spec["captions"],)
+
+    return make_key(
+        "segment",
+        SEGMENT_LIBRARY_VERSION,
+        kind,
+        *source_key,
+        spec["duration"],
+        tuple(size),
+        fps,
+        frames,
+        encoder_key,
+        tuple(chunk_args),
+    )
+
+
+def lookup_segment(key):
+    """Path of a cached chunk (refreshing its LRU age) or None."""
+    return _library.lookup(key, ".mp4")
+
+
+def store_segment(key, chunk_path):
+    """Move an encoded chunk into the library. Returns its library path."""
+    staged = _library.staging_path(key, ".mp4")
+    shutil.move(chunk_path, staged)
+    return _library.store(key, staged, ".mp4")
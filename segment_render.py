@@ -0,0 +1,161 @@
+"""
+🧩 Segment Rendering
+====================
+A reel is a sequence of independent segments (graded Ken Burns stills,
+transitions and crossfades). Each segment is rendered and encoded as a
+closed-GOP H.264 chunk - one after another in this process, or in
+parallel mode each in its own worker process. All chunks share the exact
+same encoder parameters, so ffmpeg's concat demuxer can join them with a
+stream copy (no re-encode); the mixed audio is muxed in at the end.
+
+Encoded chunks are kept in the segment library (segment_library.py), so
+segments already encoded for an earlier reel are reused as-is and only
+new ones are rendered: building a new reel is mostly picking chunks.
+
+Every render works in its own scratch folder under CHUNKS_DIR, so renders
+running side by side (batch, daemon) never touch each other's chunks.
+"""
+
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from encoder import (
+    AUDIO_FPS, DEFAULT_PROFILE, auto_threads, concat_chunks, encode_frames, get_profile
+)
+from image_loader import REEL_SIZE
+from segment_library import lookup_segment, segment_key, store_segment
+from timeline import build_segment, frame_count, segment_frame_counts
+
+OUTPUT_DIR = "output"
+CHUNKS_DIR = os.path.join(OUTPUT_DIR, "temp")
+
+
+def chunk_args(fps):
+    """Output arguments that make every chunk start on a closed-GOP keyframe."""
+    return [
+        "-flags", "+cgop",
+        "-g", str(int(fps * 2)),
+        "-sc_threshold", "0",
+        "-an",
+    ]
+
+
+def chunk_settings(profile, threads):
+    """Encoder settings for one chunk: the profile with a fixed thread count."""
+    settings = dict(get_profile(profile))
+    settings["threads"] = threads
+    return settings
+
+
+def encode_segment_chunk(spec, chunk_path, size=REEL_SIZE, fps=30,
+                         profile=DEFAULT_PROFILE, threads=1, count=None):
+    """
+    Render one segment spec and encode it as a standalone chunk.
+
+    Args:
+        count: Frames to encode (default: enough to cover the segment on
+               its own; see timeline.segment_frame_counts inside a reel)
+
+    Returns:
+        chunk_path
+    """
+    segment = build_segment(spec, size)
+    if count is None:
+        count = frame_count(segment.duration, fps)
+    frames = (segment.render(i / fps) for i in range(count))
+    encode_frames(frames, chunk_path, size, fps, chunk_settings(profile, threads),
+                  extra_args=chunk_args(fps))
+    return chunk_path
+
+
+def _encode_chunk_job(job):
+    return encode_segment_chunk(*job)
+
+
+def render_segments_parallel(specs, output_path, size=REEL_SIZE, fps=30,
+                             profile=DEFAULT_PROFILE, audio=None, audio_fps=AUDIO_FPS,
+                             workers=None, chunks_dir=None, use_library=True):
+    """
+    Render a list of segment specs in parallel and join them into one MP4.
+
+    Args:
+        specs: Ordered segment specs (see timeline.build_segment)
+        output_path: Target .mp4 path
+        size: Frame size (width, height)
+        fps: Frame rate
+        profile: Encoder profile name or settings dict
+        audio: Optional PCM array for the whole reel
+        audio_fps: Audio sample rate
+        workers: Worker processes (default: CPU count, capped at the segments to
+                 encode; 1 = encode in this process)
+        chunks_dir: Scratch folder for the chunks and the concat list,
+                    deleted afterwards (default: a new one under CHUNKS_DIR)
+        use_library: Reuse and store chunks in the segment library (default: True)
+
+    Returns:
+        output_path
+    """
+    if not specs:
+        raise ValueError("❌ Nothing to render!")
+
+    size = tuple(size)
+    args = chunk_args(fps)
+    # Frame counts from the reel's cumulative boundaries, so the chunks add
+    # up to the reel's duration instead of gaining a frame per segment
+    counts = segment_frame_counts([spec["duration"] for spec in specs], fps)
+    keys = [segment_key(spec, size, fps, profile, args, count)
+            for spec, count in zip(specs, counts)]
+
+    # Chunks already in the library, then one job per distinct missing segment
+    chunk_paths = {}
+    if use_library:
+        for key in keys:
+            if key not in chunk_paths:
+                path = lookup_segment(key)
+                if path:
+                    chunk_paths[key] = path
+
+    if chunks_dir is None:
+        os.makedirs(CHUNKS_DIR, exist_ok=True)
+        chunks_dir = tempfile.mkdtemp(prefix="chunks-", dir=CHUNKS_DIR)
+    else:
+        os.makedirs(chunks_dir, exist_ok=True)
+    missing = {}
+    for key, spec, count in zip(keys, specs, counts):
+        if key not in chunk_paths and key not in missing:
+            missing[key] = (spec, count)
+
+    print(f"   Segments: {len(specs)} total, {len(missing)} to encode, "
+          f"{len(specs) - sum(1 for k in keys if k in missing)} from library")
+
+    try:
+        if missing:
+            workers = max(1, min(workers or auto_threads(), len(missing)))
+            # Split the cores between workers (unless the profile fixes the
+            # thread count); threads don't change the bitstream, so chunks
+            # stay concat-compatible
+            threads = get_profile(profile).get("threads") or max(1, auto_threads() // workers)
+            jobs = [
+                (spec, os.path.join(chunks_dir, f"{key}.mp4"), size, fps, profile, threads, count)
+                for key, (spec, count) in missing.items()
+            ]
+            if workers == 1:
+                paths = [_encode_chunk_job(job) for job in jobs]
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    paths = list(pool.map(_encode_chunk_job, jobs))
+            chunk_paths.update(zip(missing, paths))
+
+        concat_chunks([chunk_paths[key] for key in keys], output_path, profile, audio, audio_fps,
+                      list_path=os.path.join(chunks_dir, "concat.txt"))
+
+        # Only after the join, so storing can never evict a chunk we still need
+        if use_library:
+            for key in missing:
+                store_segment(key, chunk_paths[key])
+    finally:
+        shutil.rmtree(chunks_dir, ignore_errors=True)
+
+    return output_path
@@ -0,0 +1,119 @@
+"""
+🗂️ Graded Still Cache
+=====================
+Persistent cache of ready-to-use 9:16 stills (cover-cropped, graded,
+sharpened), so a render only has to grade an image the first time it
+is ever used with a given filter.
+
+Entries are keyed by:
+- the source image content hash (renaming/moving a file is still a hit)
+- the filter preset name and its operations (editing a preset invalidates)
+- the target frame size and Ken Burns headroom
+- STILL_PIPELINE_VERSION (bump when the loader/grading code changes)
+
+Run `python main.py --warm-cache` to pre-grade the whole images/ library.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from color_grading import FILTER_PRESETS, grade_still
+from disk_cache import CACHE_DIR, DiskCache, file_digest, make_key
+from image_loader import KEN_BURNS_HEADROOM, REEL_SIZE, load_reel_image
+
+IMAGES_DIR = "images"
+STILL_CACHE_DIR = os.path.join(CACHE_DIR, "stills")
+STILL_CACHE_MAX_BYTES = 512 * 1024 * 1024
+STILL_PIPELINE_VERSION = 1
+IMAGE_EXTENSIONS = ('.jpg', '.png', '.jpeg')
+
+_cache = DiskCache(STILL_CACHE_DIR, STILL_CACHE_MAX_BYTES)
+
+
+def still_key(image_path, filter_type, size=REEL_SIZE, headroom=KEN_BURNS_HEADROOM):
+    """Cache key of a graded still."""
+    return make_key(
+        "still",
+        STILL_PIPELINE_VERSION,
+        file_digest(image_path),
+        filter_type,
+        FILTER_PRESETS.get(filter_type),
+        tuple(size),
+        headroom,
+    )
+
+
+def _store_still(key, img):
+    staged = _cache.staging_path(key, ".jpg")
+    img.save(staged, "JPEG", quality=95)
+    return _cache.store(key, staged, ".jpg")
+
+
+def get_graded_still(image_path, filter_type, size=REEL_SIZE, headroom=KEN_BURNS_HEADROOM):
+    """
+    Return the path of a graded, cover-cropped still, creating it on a miss.
+
+    Args:
+        image_path: Source image
+        filter_type: Key of FILTER_PRESETS
+        size: Reel frame size (width, height)
+        headroom: Ken Burns oversize factor
+
+    Returns:
+        (path, hit): JPEG path inside the cache, and whether it was cached
+    """
+    key = still_key(image_path, filter_type, size, headroom)
+    path = _cache.lookup(key, ".jpg")
+    if path:
+        return path, True
+
+    img = load_reel_image(image_path, size, headroom)
+    return _store_still(key, grade_still(img, filter_type)), False
+
+
+def _warm_one(job):
+    """Grade one image for several filters, decoding the source only once."""
+    image_path, filters, size = job
+    missing = [
+        (filter_type, still_key(image_path, filter_type, size))
+        for filter_type in filters
+    ]
+    missing = [(f, key) for f, key in missing if not _cache.lookup(key, ".jpg")]
+
+    if missing:
+        img = load_reel_image(image_path, size)
+        for filter_type, key in missing:
+            _store_still(key, grade_still(img, filter_type))
+    return len(missing)
+
+
+def warm_still_cache(images_dir=IMAGES_DIR, filters=None, size=REEL_SIZE, workers=None):
+    """
+    Pre-grade every image in `images_dir` for every filter preset.
+
+    Args:
+        images_dir: Image library folder
+        filters: Filter presets to prepare (default: all)
+        size: Reel frame size (width, height)
+        workers: Worker processes (default: CPU count)
+
+    Returns:
+        Number of stills that had to be graded
+    """
+    if filters is None:
+        filters = list(FILTER_PRESETS)
+
+    image_files = sorted(
+        f for f in os.listdir(images_dir) if f.lower().endswith(IMAGE_EXTENSIONS)
+    )
+    jobs = [(os.path.join(images_dir, f), tuple(filters), tuple(size)) for f in image_files]
+
+    print(f"🔥 Warming still cache: {len(image_files)} images x {len(filters)} filters")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        created = sum(pool.map(_warm_one, jobs))
+
+    total = len(image_files) * len(filters)
+    print(f"✅ Still cache ready: {created} graded, {total - created} already cached "
+          f"({_cache.size()/1024/1024:.1f} MB)")
+    return created
@@ -1,90 +1,13 @@
 """
-Simple Reel Upload - Saves sessionid locally for reuse
+Simple Reel Upload - Uses the saved Instagram session (login.py)
 """
 import os
 import time
 import random
-from dotenv import load_dotenv
-from instagrapi import Client
 
-load_dotenv()
+from login import login_user
 
-USERNAME = os.getenv("INSTA_USERNAME")
-PASSWORD = os.getenv("INSTA_PASSWORD")
 OUTPUT_DIR = "output"
-SESSIONID_FILE = ".session_id"
-
-
-def save_sessionid(sessionid):
-    """Save sessionid for next use"""
-    try:
-        with open(SESSIONID_FILE, 'w') as f:
-            f.write(sessionid)
-        print(f"💾 SessionID saved")
-        return True
-    except Exception as e:
-        print(f"⚠️ Failed to save: {e}")
-        return False
-
-
-def load_sessionid():
-    """Load saved sessionid"""
-    if os.path.exists(SESSIONID_FILE):
-        try:
-            with open(SESSIONID_FILE, 'r') as f:
-                sid = f.read().strip()
-            if sid:
-                print(f"✅ Found saved sessionid")
-                return sid
-        except:
-            pass
-    return None
-
-
-def delete_sessionid():
-    """Delete invalid sessionid"""
-    try:
-        if os.path.exists(SESSIONID_FILE):
-            os.remove(SESSIONID_FILE)
-            print(f"🗑️ Deleted invalid sessionid")
-    except:
-        pass
-
-
-def login():
-    """Try saved sessionid first, then username/password"""
-    cl = Client()
-    
-    # Try saved sessionid
-    sid = load_sessionid()
-    if sid:
-        try:
-            cl.login_by_sessionid(sid)
-            user = cl.account_info()
-            print(f"✅ Logged in as @{user.username}")
-            return cl
-        except:
-            print("❌ SessionID expired, using credentials...")
-            delete_sessionid()
-    
-    # Try username/password
-    if not USERNAME or not PASSWORD:
-        print("❌ Missing INSTA_USERNAME or INSTA_PASSWORD")
-        return None
-    
-    try:
-        cl.login(USERNAME, PASSWORD)
-        user = cl.account_info()
-        print(f"✅ Logged in as @{user.username}")
-        
-        # Save sessionid for next time
-        if hasattr(cl, 'sessionid') and cl.sessionid:
-            save_sessionid(cl.sessionid)
-        
-        return cl
-    except Exception as e:
-        print(f"❌ Login failed: {e}")
-        return None
 
 
 def upload():
@@ -106,7 +29,7 @@ def upload():
     # Login
     print("\n🔐 LOGIN")
     print("=" * 60)
-    cl = login()
+    cl = login_user()
     if not cl:
         return False
     
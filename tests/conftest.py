@@ -0,0 +1,25 @@
+"""
+Shared pytest setup: the modules live flat in the repository root, and
+every persistent cache is pointed at a temporary folder so tests never
+read or fill the real .cache/.
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from disk_cache import DiskCache  # noqa: E402
+
+
+@pytest.fixture
+def tts_cache_dir(tmp_path, monkeypatch):
+    """Empty TTS cache for one test."""
+    import tts_cache
+    directory = tmp_path / "tts"
+    monkeypatch.setattr(tts_cache, "_cache", DiskCache(str(directory), None))
+    return directory
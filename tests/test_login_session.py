@@ -0,0 +1,158 @@
+"""InstagramSession: TTL reuse, re-login on expiry, and the saved settings (login.py)."""
+
+import json
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from login import InstagramSession
+
+SESSIONID = "1234567890%3AabcdefghijklmnopqrstuvwxyzABCD"
+
+
+class FakeClient:
+    """instagrapi Client stand-in: settings, logins and account_info() checks."""
+
+    instances = []
+
+    def __init__(self, valid=True):
+        self.settings = {"uuids": {"phone_id": f"phone-{len(FakeClient.instances)}"},
+                         "authorization_data": {}}
+        self.valid = valid
+        self.checks = 0
+        self.logins = []
+        FakeClient.instances.append(self)
+
+    def get_settings(self):
+        return json.loads(json.dumps(self.settings))
+
+    def set_settings(self, settings):
+        self.settings = json.loads(json.dumps(settings))
+
+    def login_by_sessionid(self, sessionid):
+        self.logins.append("sessionid")
+        self.settings["authorization_data"] = {"sessionid": sessionid}
+        self.valid = True
+
+    def login(self, username, password):
+        self.logins.append("password")
+        self.settings["authorization_data"] = {"sessionid": f"{username}-fresh"}
+        self.valid = True
+
+    def account_info(self):
+        self.checks += 1
+        if not self.valid:
+            raise RuntimeError("login_required")
+        return SimpleNamespace(username="tester")
+
+
+@pytest.fixture(autouse=True)
+def fresh_clients():
+    FakeClient.instances = []
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return {"settings_path": str(tmp_path / "session.json"),
+            "sessionid_path": str(tmp_path / ".session_id")}
+
+
+def make_session(paths, **kwargs):
+    options = dict(paths, username=None, password=None, sessionid=SESSIONID,
+                   ttl=3600, refresh_interval=None, client_factory=FakeClient)
+    options.update(kwargs)
+    return InstagramSession(**options)
+
+
+def write_settings(paths, **settings):
+    with open(paths["settings_path"], "w", encoding="utf-8") as f:
+        json.dump(settings, f)
+
+
+def read_settings(paths):
+    with open(paths["settings_path"], encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_settings_round_trip(paths):
+    first = make_session(paths)
+    cl = first.client()
+    assert cl.logins == ["sessionid"]
+    saved = read_settings(paths)
+    assert saved["uuids"] == {"phone_id": "phone-0"}
+    assert saved["authorization_data"] == {"sessionid": SESSIONID}
+    assert saved["validated_at"] == pytest.approx(first.validated_at)
+
+    second = make_session(paths)
+    cl = second.client()
+    assert cl.settings == {k: v for k, v in saved.items() if k != "validated_at"}
+    assert second.validated_at == saved["validated_at"]
+
+
+def test_recent_session_is_reused_without_a_check(paths):
+    make_session(paths).client()
+
+    session = make_session(paths)
+    cl = session.client()
+    assert cl.logins == [] and cl.checks == 0
+    assert session.client() is cl  # Warm client within the process
+    assert cl.checks == 0
+
+
+def test_stale_session_is_checked(paths):
+    write_settings(paths, uuids={"phone_id": "saved"}, authorization_data={"sessionid": "old"},
+                   validated_at=time.time() - 7200)
+    session = make_session(paths)
+    cl = session.client()
+    assert cl.checks == 1 and cl.logins == []
+    assert read_settings(paths)["validated_at"] == pytest.approx(time.time(), abs=5)
+
+
+def test_file_without_check_time_is_checked(paths):
+    write_settings(paths, uuids={"phone_id": "copied"}, authorization_data={})
+    cl = make_session(paths).client()
+    assert cl.checks == 1
+
+
+def test_expired_session_logs_in_again_on_the_saved_device(paths):
+    write_settings(paths, uuids={"phone_id": "saved"}, authorization_data={"sessionid": "old"},
+                   validated_at=time.time() - 7200)
+    cl = make_session(paths, client_factory=lambda: FakeClient(valid=False)).client()
+
+    assert cl.logins == ["sessionid"]
+    assert cl.settings["uuids"] == {"phone_id": "saved"}
+    saved = read_settings(paths)
+    assert saved["uuids"] == {"phone_id": "saved"}
+    assert saved["authorization_data"] == {"sessionid": SESSIONID}
+
+
+def test_rejected_session_is_renewed_not_reused(paths):
+    session = make_session(paths, username="tester", password="secret", sessionid=None)
+    cl = session.client()
+    assert cl.logins == ["password"]
+    phone = cl.settings["uuids"]
+
+    cl.valid = False             # Instagram drops the session
+    session.invalidate()
+    renewed = session.client()
+    assert renewed is not cl
+    assert renewed.logins == ["password"]
+    assert renewed.settings["uuids"] == phone
+    assert session.client() is renewed
+
+
+def test_rejected_sessionid_file_is_deleted(paths):
+    with open(paths["sessionid_path"], "w") as f:
+        f.write("not-a-sessionid")
+
+    def rejecting():
+        cl = FakeClient()
+        cl.login_by_sessionid = lambda sid: cl.logins.append("sessionid") or 1 / 0
+        return cl
+
+    session = make_session(paths, username="tester", password="secret", client_factory=rejecting)
+    cl = session.client()
+    assert cl.logins == ["password"]
+    assert not os.path.exists(paths["sessionid_path"])
@@ -0,0 +1,136 @@
+"""Outbox queue and the daemon's persistent schedule (outbox.py + daemon.py)."""
+
+import asyncio
+import json
+import os
+import time
+
+import pytest
+
+import outbox
+from daemon import POST_RETRY_SECONDS, STATE_FILE, ReelDaemon, next_post_time, slot_jitter
+from reel_plan import ReelPlan
+
+CONTENT = {"caption": "सुप्रभात", "hashtags": "#motivation", "hindi_quote": "नमस्ते"}
+
+
+def make_plan(seed):
+    still = {"type": "still", "image": "images/a.jpg", "duration": 2.0}
+    return ReelPlan("नमस्ते", seed, "warm", [still])
+
+
+def add(tmp_path, outbox_dir, seed):
+    video = tmp_path / f"render-{seed}.mp4"
+    video.write_bytes(b"mp4")
+    return outbox.add_reel(str(video), make_plan(seed), CONTENT, outbox_dir)
+
+
+@pytest.fixture
+def outbox_dir(tmp_path):
+    return str(tmp_path / "outbox")
+
+
+def make_daemon(outbox_dir, **kwargs):
+    return ReelDaemon(lambda: CONTENT, outbox_dir=outbox_dir, port=None, workers=1, **kwargs)
+
+
+def test_outbox_queue(tmp_path, outbox_dir):
+    assert outbox.pending(outbox_dir) == []
+    first = add(tmp_path, outbox_dir, 1)
+    second = add(tmp_path, outbox_dir, 2)
+    assert not os.path.exists(tmp_path / "render-1.mp4")   # Moved into the entry
+
+    assert sorted(outbox.pending(outbox_dir)) == sorted([first, second])
+    video_path, caption, content = outbox.load_post(first)
+    assert open(video_path, "rb").read() == b"mp4"
+    assert caption == "सुप्रभात\n\n#motivation"
+    assert content["hindi_quote"] == "नमस्ते"
+    assert ReelPlan.load(os.path.join(first, outbox.PLAN_FILE)).hash() == make_plan(1).hash()
+
+    outbox.mark_posted(first, "ABC123")
+    assert outbox.pending(outbox_dir) == [second]
+    with open(os.path.join(first, outbox.POSTED_FILE), encoding="utf-8") as f:
+        assert json.load(f)["media_code"] == "ABC123"
+
+
+def test_hidden_files_stay_out_of_the_queue(tmp_path, outbox_dir):
+    os.makedirs(os.path.join(outbox_dir, ".staging-crashed"))
+    make_daemon(outbox_dir).save_state()
+    assert outbox.pending(outbox_dir) == []
+
+
+def test_post_times_are_deterministic():
+    now = time.time()
+    first = next_post_time(now)
+    assert first == next_post_time(now) and first > now
+    # A posted slot never comes up again, even just after its jittered time
+    assert next_post_time(first) > first
+    assert next_post_time(first + 1) == next_post_time(first)
+
+    assert slot_jitter(1_700_000_000) == slot_jitter(1_700_000_000)
+    assert abs(slot_jitter(1_700_000_000, 15)) <= 15 * 60
+    assert next_post_time(now, jitter_minutes=0) % 60 == 0
+
+
+def test_schedule_survives_a_restart(outbox_dir):
+    daemon = make_daemon(outbox_dir)
+    daemon.load_state()
+    scheduled = daemon.state["next_post"]
+    assert scheduled > time.time()
+
+    resumed = make_daemon(outbox_dir)
+    resumed.load_state()
+    assert resumed.state == daemon.state
+
+
+def test_missed_post_is_rescheduled(outbox_dir):
+    os.makedirs(outbox_dir)
+    stale = time.time() - 2 * 3600
+    with open(os.path.join(outbox_dir, STATE_FILE), "w", encoding="utf-8") as f:
+        json.dump({"next_post": stale, "attempts": 2, "last_post": None, "posted": 4}, f)
+
+    daemon = make_daemon(outbox_dir)
+    daemon.load_state()
+    assert daemon.state["next_post"] > time.time()
+    assert daemon.state["attempts"] == 0 and daemon.state["posted"] == 4
+
+
+def test_posting_updates_the_saved_state(tmp_path, outbox_dir):
+    first = add(tmp_path, outbox_dir, 1)
+    second = add(tmp_path, outbox_dir, 2)
+    uploads = []
+
+    def upload(video_path, caption, client):
+        uploads.append((video_path, caption, client))
+        return True
+
+    daemon = make_daemon(outbox_dir, login=lambda: "client", upload=upload)
+    daemon.load_state()
+    asyncio.run(daemon.post_next())
+
+    oldest, newest = sorted([first, second])
+    assert uploads == [(os.path.join(oldest, outbox.REEL_FILE), "सुप्रभात\n\n#motivation", "client")]
+    assert outbox.pending(outbox_dir) == [newest]
+
+    resumed = make_daemon(outbox_dir)
+    resumed.load_state()
+    assert resumed.state["posted"] == 1
+    assert resumed.state["last_post"]["entry"] == os.path.basename(oldest)
+    assert resumed.state["next_post"] > time.time()
+
+
+def test_failed_upload_is_retried_then_skipped(tmp_path, outbox_dir):
+    add(tmp_path, outbox_dir, 1)
+    daemon = make_daemon(outbox_dir, login=lambda: "client", upload=lambda *args: False)
+    daemon.load_state()
+
+    asyncio.run(daemon.post_next())
+    assert daemon.state["attempts"] == 1
+    assert daemon.state["next_post"] == pytest.approx(time.time() + POST_RETRY_SECONDS, abs=5)
+    with open(daemon.state_path, encoding="utf-8") as f:
+        assert json.load(f)["attempts"] == 1
+
+    for _ in range(2):
+        asyncio.run(daemon.post_next())
+    assert daemon.state["attempts"] == 0     # Gave up on the slot, next one scheduled
+    assert len(outbox.pending(outbox_dir)) == 1
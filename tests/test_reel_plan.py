@@ -0,0 +1,92 @@
+"""Seeded planning and plan hashes (video_editor.plan_reel + reel_plan.ReelPlan)."""
+
+import pytest
+from PIL import Image
+
+import captions
+from reel_plan import ReelPlan, render_key
+from video_editor import plan_reel
+
+SCRIPT = "यह एक छोटा सा परीक्षण है।"
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Project folder with ten tiny images (plan_reel reads images/ relative to it)."""
+    monkeypatch.chdir(tmp_path)
+    images = tmp_path / "images"
+    images.mkdir()
+    for i in range(10):
+        Image.new("RGB", (54, 96), (20 * i, 100, 200 - 15 * i)).save(images / f"img{i:02d}.jpg")
+    return tmp_path
+
+
+def silent_plan(seed, **kwargs):
+    options = dict(use_voice=False, use_background_music=False, captions=False,
+                   transition_style="crossfade", seed=seed, prepare_assets=False)
+    options.update(kwargs)
+    return plan_reel(SCRIPT, **options)
+
+
+def test_same_seed_same_plan(workdir):
+    first = silent_plan(7)
+    second = silent_plan(7)
+    assert first.to_dict() == second.to_dict()
+    assert first.hash() == second.hash()
+    assert first.seed == 7 and first.segments
+
+
+def test_different_seed_different_plan(workdir):
+    assert silent_plan(7).hash() != silent_plan(8).hash()
+
+
+def test_hash_survives_serialisation(workdir):
+    plan = silent_plan(7)
+    assert ReelPlan.from_dict(plan.to_dict()).hash() == plan.hash()
+    assert ReelPlan.from_json(plan.to_json()).hash() == plan.hash()
+
+    path = plan.save(str(workdir / "plan.json"))
+    assert ReelPlan.load(path).hash() == plan.hash()
+
+
+def test_hash_covers_every_choice(workdir):
+    plan = silent_plan(7)
+    changed = ReelPlan.from_dict(plan.to_dict())
+    changed.segments[0] = dict(changed.segments[0], duration=changed.segments[0]["duration"] + 0.1)
+    assert changed.hash() != plan.hash()
+
+    other = "warm" if plan.filter_type == "cool" else "cool"
+    regraded = ReelPlan.from_dict(dict(plan.to_dict(), filter=other))
+    assert regraded.hash() != plan.hash()
+
+
+def test_render_key_depends_on_settings(workdir):
+    plan = silent_plan(7)
+    key = render_key(plan, (540, 960), 15, "draft")
+    assert key == render_key(ReelPlan.load(plan.save(str(workdir / "p.json"))), (540, 960), 15, "draft")
+    assert key != render_key(plan, (1080, 1920), 15, "draft")
+    assert key != render_key(plan, (540, 960), 30, "draft")
+
+
+def test_unknown_version_is_rejected(workdir):
+    data = dict(silent_plan(7).to_dict(), version=1)
+    with pytest.raises(ValueError):
+        ReelPlan.from_dict(data)
+
+
+def test_captions_without_a_font_are_an_error(workdir, monkeypatch):
+    monkeypatch.setattr(captions, "DEVANAGARI_FONTS", [str(workdir / "missing.ttf")])
+    monkeypatch.setattr(captions, "_renderers", {})
+    with pytest.raises(RuntimeError, match="No caption font"):
+        silent_plan(7, captions=True)
+
+
+def test_captions_without_raqm_are_an_error(workdir, monkeypatch):
+    font = workdir / "font.ttf"
+    font.write_bytes(b"")
+    monkeypatch.setattr(captions, "DEVANAGARI_FONTS", [str(font)])
+    monkeypatch.setattr(captions, "_renderers", {})
+    monkeypatch.setattr(captions.ImageFont, "truetype", lambda *args, **kwargs: object())
+    monkeypatch.setattr(captions.features, "check", lambda feature: False)
+    with pytest.raises(RuntimeError, match="raqm"):
+        silent_plan(7, captions=True)
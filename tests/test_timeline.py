@@ -0,0 +1,22 @@
+"""Frame counts of a reel's segments (timeline.segment_frame_counts)."""
+
+from timeline import frame_count, segment_frame_counts
+
+DURATIONS = [1.93, 1.71, 2.07, 1.66, 1.88, 1.79, 1.86]   # 12.9 seconds
+
+
+def test_counts_add_up_to_the_reel():
+    for fps in (15, 24, 30):
+        counts = segment_frame_counts(DURATIONS, fps)
+        assert abs(sum(counts) - sum(DURATIONS) * fps) <= 0.5 + 1e-9
+        assert all(abs(count - d * fps) < 1 for count, d in zip(counts, DURATIONS))
+
+
+def test_no_extra_frame_per_segment():
+    rounded_up = sum(frame_count(d, 15) for d in DURATIONS)
+    assert rounded_up == 196
+    assert sum(segment_frame_counts(DURATIONS, 15)) == 194
+
+
+def test_exact_durations_are_unchanged():
+    assert segment_frame_counts([2.0, 0.6, 1.4], 30) == [60, 18, 42]
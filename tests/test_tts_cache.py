@@ -0,0 +1,125 @@
+"""TTS cache keys, hits and misses, and backend separation (tts_cache + tts_engine)."""
+
+import base64
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import tts_cache
+from tts_engine import (EDGE_TTS_PROSODY, EDGE_TTS_VOICE, HTTPTTSBackend, backend_id,
+                        synthesize_batch, tts_job)
+
+WORDS = [{"text": "नमस्ते", "start": 0.1, "end": 0.5}]
+
+
+class FakeBackend:
+    """In-process backend that records every script it is asked to speak."""
+
+    def __init__(self, cache_id="edge-tts", audio=b"ID3-fake-mp3", fail=False):
+        self.cache_id = cache_id
+        self.audio = audio
+        self.fail = fail
+        self.calls = []
+
+    async def synthesize(self, text, voice, prosody):
+        self.calls.append(text)
+        if self.fail:
+            raise ConnectionError("TTS service down")
+        return {"audio": self.audio, "words": WORDS}
+
+
+@pytest.fixture
+def standin_url():
+    """Local stand-in TTS service (HTTPTTSBackend protocol) answering with fixed audio."""
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers["Content-Length"]))
+            body = json.dumps({"audio": base64.b64encode(b"ID3-standin").decode(),
+                               "words": WORDS}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/tts"
+    server.shutdown()
+
+
+def test_raw_key_ignores_formatting_only():
+    key = tts_cache.raw_key("नमस्ते   दुनिया", EDGE_TTS_VOICE, EDGE_TTS_PROSODY)
+    assert key == tts_cache.raw_key(" नमस्ते दुनिया\n", EDGE_TTS_VOICE, EDGE_TTS_PROSODY)
+    assert key != tts_cache.raw_key("नमस्ते", EDGE_TTS_VOICE, EDGE_TTS_PROSODY)
+    assert key != tts_cache.raw_key("नमस्ते   दुनिया", "hi-IN-SwaraNeural", EDGE_TTS_PROSODY)
+    assert key != tts_cache.raw_key("नमस्ते   दुनिया", EDGE_TTS_VOICE,
+                                    dict(EDGE_TTS_PROSODY, rate="+20%"))
+
+
+def test_keys_depend_on_backend():
+    standin = HTTPTTSBackend("http://127.0.0.1:9/tts")
+    assert backend_id() == "edge-tts"
+    assert backend_id(standin) == "http:http://127.0.0.1:9/tts"
+    for make_key in (lambda b: tts_cache.raw_key("x", EDGE_TTS_VOICE, EDGE_TTS_PROSODY, b),
+                     lambda b: tts_cache.deep_key("x", EDGE_TTS_VOICE, EDGE_TTS_PROSODY, 44100, b)):
+        assert make_key(backend_id()) != make_key(backend_id(standin))
+
+
+def test_miss_then_hit(tts_cache_dir):
+    backend = FakeBackend()
+    first = synthesize_batch(["पहला", "दूसरा"], backend)
+    assert backend.calls == ["पहला", "दूसरा"]
+
+    second = synthesize_batch(["दूसरा", "पहला"], backend)
+    assert backend.calls == ["पहला", "दूसरा"]  # Both served from the cache
+    assert second == [first[1], first[0]]
+    assert second[0] == {"audio": b"ID3-fake-mp3", "words": WORDS}
+
+
+def test_identical_scripts_synthesised_once(tts_cache_dir):
+    backend = FakeBackend()
+    results = synthesize_batch(["एक", "एक", tts_job("एक")], backend)
+    assert backend.calls == ["एक"]
+    assert results[0] == results[1] == results[2]
+
+
+def test_use_cache_false_neither_reads_nor_writes(tts_cache_dir):
+    backend = FakeBackend()
+    synthesize_batch(["एक"], backend, use_cache=False)
+    synthesize_batch(["एक"], backend, use_cache=False)
+    assert backend.calls == ["एक", "एक"]
+    assert tts_cache.load_result(tts_cache.raw_key("एक", EDGE_TTS_VOICE, EDGE_TTS_PROSODY)) is None
+
+
+def test_failures_are_not_cached(tts_cache_dir):
+    down = FakeBackend(fail=True)
+    [result] = synthesize_batch(["एक"], down, retries=1)
+    assert isinstance(result, ConnectionError)
+
+    up = FakeBackend()
+    [result] = synthesize_batch(["एक"], up)
+    assert up.calls == ["एक"]
+    assert result["audio"] == b"ID3-fake-mp3"
+
+
+def test_standin_audio_never_serves_edge_tts(tts_cache_dir, standin_url):
+    standin = HTTPTTSBackend(standin_url)
+    [result] = synthesize_batch(["एक"], standin)
+    assert result["audio"] == b"ID3-standin"
+
+    # Same script through the production backend: a miss, not the stand-in audio
+    edge = FakeBackend(cache_id=backend_id())
+    [result] = synthesize_batch(["एक"], edge)
+    assert edge.calls == ["एक"]
+    assert result["audio"] == b"ID3-fake-mp3"
+
+    # Each backend now hits its own entry
+    assert synthesize_batch(["एक"], standin)[0]["audio"] == b"ID3-standin"
+    assert synthesize_batch(["एक"], edge)[0]["audio"] == b"ID3-fake-mp3"
+    assert edge.calls == ["एक"]
@@ -0,0 +1,224 @@
+"""
+🎞️ Timeline Engine
+==================
+Plays a fixed sequence of full-frame segments (Ken Burns stills,
+transitions, crossfades) back to back.
+
+Every segment already renders exact reel-sized frames, so there is
+nothing to composite: segment boundaries are computed up front, each
+frame is looked up with a bisect and rendered by the active segment
+straight into one preallocated frame buffer.
+
+A segment is any object with:
+- `duration` (seconds)
+- `render(t, out)` writing the frame at local time t into `out`
+  (see KenBurnsRenderer, TransitionSegment and CrossfadeSegment)
+
+Segments are described by plain, picklable spec dicts so they can be
+built in worker processes (see build_segment):
+    {"type": "still", "image": path, "filter": name, "zoom": 1.2, "duration": 2.0}
+    (+ "start", "motion" when crossfades overlap it: the segment shows
+     seconds start..start+duration of a Ken Burns move lasting "motion")
+    {"type": "transition", "name": file_name, "duration": 1.0}
+    {"type": "crossfade", "from": still_spec, "to": still_spec, "duration": 0.6}
+Any spec may also carry "saturation" (progressive B&W -> colour grade,
+see frame_effects.attach_color_ramp) and "captions": cues in
+segment-local time (see attach_captions), which are burned into its
+frames after grading.
+"""
+
+import math
+from bisect import bisect_right
+
+import numpy as np
+
+from captions import CaptionedSegment, get_caption_renderer, slice_cues
+from frame_effects import CrossfadeSegment, GradedSegment
+from image_loader import REEL_SIZE
+from ken_burns import KenBurnsRenderer
+from still_cache import get_graded_still
+from transition_bank import TransitionBank
+
+# Guards frame times like 59/30 against landing a hair before a boundary
+TIME_EPSILON = 1e-6
+
+
+def frame_count(duration, fps):
+    """Frames needed to cover `duration` at `fps` (same count as moviepy's iter_frames)."""
+    return int(math.ceil(duration * fps - TIME_EPSILON))
+
+
+def segment_frame_counts(durations, fps):
+    """
+    Frames of each segment of a reel, cut at the frame nearest to each
+    boundary on the reel's clock: round(end * fps) - round(start * fps).
+
+    Rounding every segment up on its own would add up to one frame per
+    segment, drifting the video away from its audio (worst at draft fps).
+    """
+    counts = []
+    start = end = 0.0
+    for duration in durations:
+        end += duration
+        counts.append(int(math.floor(end * fps + 0.5 + TIME_EPSILON))
+                      - int(math.floor(start * fps + 0.5 + TIME_EPSILON)))
+        start = end
+    return counts
+
+
+def still_spec(image_path, filter_type, zoom, duration):
+    """Spec of a graded Ken Burns still."""
+    return {"type": "still", "image": image_path, "filter": filter_type,
+            "zoom": zoom, "duration": duration}
+
+
+def transition_spec(name, duration):
+    """Spec of a transition from the transition bank."""
+    return {"type": "transition", "name": name, "duration": duration}
+
+
+def overlap_still(spec, head, tail):
+    """
+    Make room for crossfades around a still spec (in place).
+
+    The still's Ken Burns move is extended by `head` seconds before and
+    `tail` seconds after its solo `duration`; the crossfades on either
+    side play those parts (see crossfade_spec), so the fades overlap the
+    stills instead of adding time.
+    """
+    if head or tail:
+        spec["start"] = round(head, 4)
+        spec["motion"] = round(head + spec["duration"] + tail, 4)
+    return spec
+
+
+def crossfade_spec(from_spec, to_spec, duration):
+    """Spec of a crossfade between two (overlap_still) still specs, both in motion."""
+    def still(spec):
+        return still_spec(spec["image"], spec["filter"], spec["zoom"],
+                          spec.get("motion", spec["duration"]))
+    return {"type": "crossfade", "from": still(from_spec), "to": still(to_spec),
+            "duration": duration}
+
+
+def attach_captions(specs, cues):
+    """Give each spec the caption cues that fall inside it (in local time)."""
+    position = 0.0
+    for spec in specs:
+        local = slice_cues(cues, position, position + spec["duration"])
+        if local:
+            spec["captions"] = local
+        position += spec["duration"]
+    return specs
+
+
+def build_segment(spec, size=REEL_SIZE, transition_bank=None):
+    """
+    Turn a segment spec into a renderable segment.
+
+    Args:
+        spec: Segment spec dict (see module docstring)
+        size: Frame size (width, height)
+        transition_bank: TransitionBank to reuse (default: a new one for `size`)
+
+    Returns:
+        Segment with duration and render(t, out)
+    """
+    kind = spec["type"]
+    if kind == "still":
+        still_path, _ = get_graded_still(spec["image"], spec["filter"], size)
+        motion = spec.get("motion", spec["duration"])
+        segment = KenBurnsRenderer(still_path, size, motion, zoom_end=spec["zoom"])
+        if motion != spec["duration"]:
+            segment = TrimmedSegment(segment, spec.get("start", 0.0), spec["duration"])
+    elif kind == "transition":
+        bank = transition_bank or TransitionBank(size=size)
+        segment = bank.segment(spec["name"], spec["duration"])
+    elif kind == "crossfade":
+        segment = CrossfadeSegment(
+            build_segment(spec["from"], size), build_segment(spec["to"], size),
+            spec["duration"], size
+        )
+    else:
+        raise ValueError(f"❌ Unknown segment type: {kind}")
+
+    if spec.get("saturation"):
+        segment = GradedSegment(segment, spec["saturation"], size)
+    if spec.get("captions"):
+        segment = CaptionedSegment(segment, spec["captions"], get_caption_renderer(size))
+    return segment
+
+
+class TrimmedSegment:
+    """The part of a segment from `start` to `start + duration`."""
+
+    def __init__(self, segment, start, duration):
+        self.segment = segment
+        self.start = float(start)
+        self.duration = float(duration)
+
+    def render(self, t, out=None):
+        return self.segment.render(self.start + t, out)
+
+
+class Timeline:
+    """
+    Sequence of segments rendered into a single reused frame buffer.
+
+    Args:
+        segments: Ordered segments (objects with duration and render(t, out))
+        size: Frame size (width, height)
+    """
+
+    def __init__(self, segments, size=REEL_SIZE):
+        self.segments = list(segments)
+        if not self.segments:
+            raise ValueError("❌ Timeline needs at least one segment!")
+
+        self.size = (int(size[0]), int(size[1]))
+        self.starts = []
+        position = 0.0
+        for segment in self.segments:
+            self.starts.append(position)
+            position += segment.duration
+        self.duration = position
+
+        self._frame = np.empty((self.size[1], self.size[0], 3), dtype=np.uint8)
+
+    def segment_at(self, t):
+        """Return (index, local time) of the segment playing at time t."""
+        t = min(max(t, 0.0), self.duration)
+        index = bisect_right(self.starts, t + TIME_EPSILON) - 1
+        index = min(max(index, 0), len(self.segments) - 1)
+        return index, t - self.starts[index]
+
+    def render(self, t, out=None):
+        """Render the frame at time t into `out` (default: the shared buffer)."""
+        if out is None:
+            out = self._frame
+        index, local_t = self.segment_at(t)
+        self.segments[index].render(local_t, out)
+        return out
+
+    def make_frame(self, t):
+        """moviepy-compatible frame function."""
+        return self.render(t)
+
+    def frame_count(self, fps):
+        """Number of frames at `fps` (same count as moviepy's iter_frames)."""
+        return frame_count(self.duration, fps)
+
+    def iter_frames(self, fps):
+        """
+        Yield every frame at `fps`.
+
+        The same buffer is yielded each time - consume (or copy) a frame
+        before asking for the next one.
+        """
+        for i in range(self.frame_count(fps)):
+            yield self.render(i / fps)
+
+    def to_clip(self):
+        """Wrap the timeline in a moviepy VideoClip."""
+        from moviepy.editor import VideoClip
+        return VideoClip(self.make_frame, duration=self.duration)
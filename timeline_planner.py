@@ -0,0 +1,126 @@
+"""
+📐 Timeline Planner
+===================
+Sizes the image segments of a reel to the voice-over instead of a fixed
+N images x 2 s + 1 s transitions.
+
+- The reel lasts as long as the voice plus a short tail
+- The number of images follows from the duration (within the allowed
+  per-image range and the images available)
+- Cuts (transition centres) are snapped to the nearest phrase boundary
+  (word followed by punctuation such as । , ! ?) when one is close to the
+  evenly spaced position, so images change between phrases
+- Durations are quantised to DURATION_STEP so encoded segments stay
+  reusable by the segment library
+
+Word timings come from the TTS engine, already in voice-track seconds:
+    [{"text": "नमस्ते", "start": 0.1, "end": 0.55}, ...]
+"""
+
+import re
+
+# --- Planner settings ---
+VOICE_TAIL = 0.5               # Seconds kept after the last word
+MIN_IMAGE_DURATION = 1.2
+MAX_IMAGE_DURATION = 3.5
+DEFAULT_IMAGE_DURATION = 2.0   # Without a voice (old fixed layout)
+DURATION_STEP = 0.1
+SNAP_WINDOW = 0.3              # Fraction of an image slot a cut may move to reach a phrase end
+PHRASE_PUNCTUATION = "।॥.!?,;:…"
+
+_PHRASE_END = re.compile(r"\s*[" + re.escape(PHRASE_PUNCTUATION) + "]")
+
+
+def phrase_ends(words, text):
+    """
+    Times (seconds) where a phrase ends: the end of every word followed by
+    punctuation in the script, plus the end of the last word.
+    """
+    ends = []
+    cursor = 0
+    for word in words:
+        found = text.find(word["text"], cursor)
+        if found < 0:
+            continue
+        cursor = found + len(word["text"])
+        if _PHRASE_END.match(text, cursor):
+            ends.append(word["end"])
+    if words and (not ends or ends[-1] != words[-1]["end"]):
+        ends.append(words[-1]["end"])
+    return ends
+
+
+def _quantize(duration):
+    return round(round(duration / DURATION_STEP) * DURATION_STEP, 3)
+
+
+def plan_image_durations(voice_duration=None, phrase_times=(), num_images=6, max_images=None,
+                         transition_duration=1.0):
+    """
+    Plan how long each image stays on screen.
+
+    Args:
+        voice_duration: Voice-over length in seconds (None = fixed layout)
+        phrase_times: Phrase end times in seconds (see phrase_ends)
+        num_images: Preferred number of images
+        max_images: Images available (default: num_images)
+        transition_duration: Length of the transition between two images
+                             (0 when there are no transitions)
+
+    Returns:
+        List of image durations; the reel lasts
+        sum(durations) + (len(durations) - 1) * transition_duration
+    """
+    max_images = max(1, max_images or num_images)
+    num_images = max(1, min(num_images, max_images))
+    td = transition_duration
+    if voice_duration is None:
+        return [DEFAULT_IMAGE_DURATION] * num_images
+
+    total = voice_duration + VOICE_TAIL
+
+    # Pick a count that keeps every image inside the allowed range
+    def slot(n):
+        return (total - (n - 1) * td) / n
+    n = num_images
+    while n > 1 and slot(n) < MIN_IMAGE_DURATION:
+        n -= 1
+    while n < max_images and slot(n) > MAX_IMAGE_DURATION:
+        n += 1
+
+    # Cut k sits at the centre of transition k. Each cut starts from an even
+    # split of what is left and snaps to a nearby phrase end as long as the
+    # image before it stays within the allowed range
+    cuts = []
+    previous = 0.0
+    for k in range(1, n):
+        ideal = previous + (total - previous) / (n - k + 1)
+        head = td / 2 if k == 1 else td
+        lower = previous + MIN_IMAGE_DURATION + head
+        upper = total - (n - k) * (MIN_IMAGE_DURATION + td) + td / 2
+        longest = max(previous + MAX_IMAGE_DURATION + head, ideal)
+        window = SNAP_WINDOW * (total / n)
+        candidates = [
+            p for p in phrase_times
+            if abs(p - ideal) <= window and lower <= p <= min(upper, longest)
+        ]
+        if candidates:
+            cut = min(candidates, key=lambda p: abs(p - ideal))
+        else:
+            cut = min(max(ideal, lower), upper)
+        cuts.append(cut)
+        previous = cut
+
+    edges = [0.0] + cuts + [total]
+    durations = []
+    for k in range(n):
+        duration = edges[k + 1] - edges[k]
+        duration -= td / 2 if k > 0 else 0.0
+        duration -= td / 2 if k < n - 1 else 0.0
+        durations.append(max(MIN_IMAGE_DURATION, _quantize(duration)))
+
+    # Quantisation must never cut the voice short: grow the last image
+    shortfall = total - (sum(durations) + (n - 1) * td)
+    if shortfall > 1e-6:
+        durations[-1] = _quantize(durations[-1] + shortfall + DURATION_STEP / 2)
+    return durations
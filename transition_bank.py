@@ -0,0 +1,185 @@
+"""
+⚡ Transition Bank
+==================
+Transition clips from assets/transitions are decoded once, normalised to
+the reel format (cover-scaled + center-cropped to 1080x1920, 30 fps,
+1 second, no audio) and stored as memory-mapped .npy frame arrays in
+.cache/transitions.
+
+Renders then read frames straight from the mapped file - no
+VideoFileClip, resize or crop per insertion, and no ffmpeg reader
+process per use.
+
+Prepare every transition ahead of time with:
+    python main.py --prepare-transitions
+"""
+
+import os
+import subprocess
+
+import numpy as np
+
+from disk_cache import CACHE_DIR, DiskCache, file_digest, make_key
+from ffmpeg_utils import get_ffmpeg_exe, readinto_exact
+from image_loader import REEL_SIZE
+
+ASSETS_DIR = "assets"
+TRANSITIONS_DIR = os.path.join(ASSETS_DIR, "transitions")
+TRANSITION_CACHE_DIR = os.path.join(CACHE_DIR, "transitions")
+TRANSITION_CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024
+TRANSITION_BANK_VERSION = 1
+TRANSITION_FPS = 30
+TRANSITION_DURATION = 1.0
+TRANSITION_EXTENSIONS = ('.mp4', '.mov')
+
+
+class TransitionSegment:
+    """
+    Frame generator over a decoded transition.
+
+    Args:
+        frames: (n, h, w, 3) uint8 array, usually memory-mapped
+        fps: Frame rate the frames were decoded at
+        duration: Segment duration in seconds (default: all frames)
+    """
+
+    def __init__(self, frames, fps=TRANSITION_FPS, duration=None):
+        self.frames = frames
+        self.fps = fps
+        self.duration = duration if duration is not None else len(frames) / fps
+        self.size = (frames.shape[2], frames.shape[1])
+
+    def render(self, t, out=None):
+        """Frame at time t, as a zero-copy view unless `out` is given."""
+        index = min(max(int(t * self.fps + 1e-6), 0), len(self.frames) - 1)
+        if out is None:
+            return self.frames[index]
+        np.copyto(out, self.frames[index])
+        return out
+
+    def make_frame(self, t):
+        """moviepy-compatible frame function."""
+        return self.render(t)
+
+    def to_clip(self):
+        """Wrap the segment in a moviepy VideoClip."""
+        from moviepy.editor import VideoClip
+        return VideoClip(self.make_frame, duration=self.duration)
+
+
+class TransitionBank:
+    """
+    Decoded, normalised transitions for one output format.
+
+    Args:
+        transitions_dir: Folder with the source .mp4/.mov transitions
+        size: Output frame size (width, height)
+        fps: Output frame rate
+        duration: Seconds of each transition to keep
+    """
+
+    def __init__(self, transitions_dir=TRANSITIONS_DIR, size=REEL_SIZE,
+                 fps=TRANSITION_FPS, duration=TRANSITION_DURATION):
+        self.transitions_dir = transitions_dir
+        self.size = (int(size[0]), int(size[1]))
+        self.fps = fps
+        self.duration = duration
+        self.cache = DiskCache(TRANSITION_CACHE_DIR, TRANSITION_CACHE_MAX_BYTES)
+        self._frames = {}
+
+    def names(self):
+        """Available transition file names."""
+        if not os.path.isdir(self.transitions_dir):
+            return []
+        return sorted(
+            f for f in os.listdir(self.transitions_dir)
+            if f.lower().endswith(TRANSITION_EXTENSIONS)
+        )
+
+    def key(self, name):
+        """Cache key of a normalised transition."""
+        return make_key(
+            "transition",
+            TRANSITION_BANK_VERSION,
+            file_digest(os.path.join(self.transitions_dir, name)),
+            self.size,
+            self.fps,
+            self.duration,
+        )
+
+    def prepare(self, name):
+        """Decode and normalise a transition unless already cached. Returns its .npy path."""
+        key = self.key(name)
+        path = self.cache.lookup(key, ".npy")
+        if path:
+            return path
+
+        src = os.path.join(self.transitions_dir, name)
+        w, h = self.size
+        n_frames = max(1, int(round(self.duration * self.fps)))
+
+        cmd = [
+            get_ffmpeg_exe(), "-v", "error",
+            "-i", src,
+            "-t", f"{self.duration:.3f}",
+            "-an",
+            "-vf", (f"fps={self.fps},"
+                    f"scale={w}:{h}:force_original_aspect_ratio=increase,"
+                    f"crop={w}:{h}"),
+            "-f", "rawvideo", "-pix_fmt", "rgb24",
+            "pipe:1",
+        ]
+
+        staged = self.cache.staging_path(key, ".npy")
+        frames = np.lib.format.open_memmap(staged, mode="w+", dtype=np.uint8,
+                                           shape=(n_frames, h, w, 3))
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        try:
+            decoded = 0
+            while decoded < n_frames:
+                if readinto_exact(proc.stdout, frames[decoded]) < frames[decoded].nbytes:
+                    break
+                decoded += 1
+            proc.stdout.read()
+            stderr = proc.stderr.read()
+            proc.wait()
+        except BaseException:
+            proc.kill()
+            proc.wait()
+            del frames
+            os.remove(staged)
+            raise
+
+        if decoded == 0:
+            del frames
+            os.remove(staged)
+            raise RuntimeError(f"ffmpeg decoded no frames from {name}: "
+                               f"{stderr.decode(errors='replace').strip()}")
+
+        # Short source: hold the last frame, like moviepy does past the end
+        frames[decoded:] = frames[decoded - 1]
+        frames.flush()
+        del frames
+
+        return self.cache.store(key, staged, ".npy")
+
+    def prepare_all(self):
+        """Prepare every transition. Returns the number of transitions available."""
+        names = self.names()
+        for name in names:
+            self.prepare(name)
+            print(f"   ✓ Transition ready: {name}")
+        return len(names)
+
+    def frames(self, name):
+        """Memory-mapped (n, h, w, 3) frames of a transition (decoded on first use)."""
+        frames = self._frames.get(name)
+        if frames is None:
+            frames = np.load(self.prepare(name), mmap_mode="r")
+            self._frames[name] = frames
+        return frames
+
+    def segment(self, name, duration=None):
+        """TransitionSegment for a transition."""
+        return TransitionSegment(self.frames(name), self.fps,
+                                 self.duration if duration is None else duration)
@@ -0,0 +1,113 @@
+"""
+🗣️ TTS Cache
+============
+Persistent, content-addressed cache of voice-overs in .cache/tts, so
+re-rendering a script (upload retries, variants, tests) never calls
+edgeTTS or re-runs the voice DSP.
+
+Two kinds of entries:
+- raw: the MP3 bytes edgeTTS returned plus its word timings (.json),
+  keyed by normalised text + voice + prosody (rate/pitch/volume)
+  + TTS backend (tts_engine.backend_id: audio from a local stand-in
+  never serves a production run) + TTS_CACHE_VERSION
+- deep: the processed PCM (float32 .npy) keyed by the raw key + the DSP
+  chain version (audio_dsp.DSP_CHAIN_VERSION) + sample rate
+
+Text is normalised (Unicode NFC, collapsed whitespace) so trivial
+formatting differences in a Gemini script still hit.
+
+A reel plan records the pcm_digest of its voice-over, so a render can
+tell whether it got the same voice back.
+"""
+
+import hashlib
+import json
+import os
+import re
+import unicodedata
+
+import numpy as np
+
+from audio_dsp import DSP_CHAIN_VERSION
+from disk_cache import CACHE_DIR, DiskCache, make_key
+
+TTS_CACHE_DIR = os.path.join(CACHE_DIR, "tts")
+TTS_CACHE_MAX_BYTES = 256 * 1024 * 1024
+TTS_CACHE_VERSION = 2
+
+_cache = DiskCache(TTS_CACHE_DIR, TTS_CACHE_MAX_BYTES)
+
+
+def normalize_text(text):
+    """Canonical form of a script for cache keys."""
+    text = unicodedata.normalize("NFC", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def raw_key(text, voice_name, prosody, backend="edge-tts"):
+    """Cache key of the raw TTS output (backend: tts_engine.backend_id)."""
+    return make_key(
+        "tts",
+        TTS_CACHE_VERSION,
+        normalize_text(text),
+        voice_name,
+        sorted(prosody.items()),
+        backend,
+    )
+
+
+def deep_key(text, voice_name, prosody, rate, backend="edge-tts"):
+    """Cache key of the processed (deep voice) PCM."""
+    return make_key("deep", raw_key(text, voice_name, prosody, backend), DSP_CHAIN_VERSION, rate)
+
+
+def load_result(key):
+    """Cached synthesis result {"audio", "words"} or None."""
+    words = load_words(key)
+    audio_path = _cache.lookup(key, ".mp3")
+    if words is None or not audio_path:
+        return None
+    with open(audio_path, "rb") as f:
+        return {"audio": f.read(), "words": words}
+
+
+def load_words(key):
+    """Cached word timings of a synthesis result, or None."""
+    path = _cache.lookup(key, ".json")
+    if not path:
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def store_result(key, result):
+    staged = _cache.staging_path(key, ".json")
+    with open(staged, "w", encoding="utf-8") as f:
+        json.dump(result["words"], f, ensure_ascii=False)
+    _cache.store(key, staged, ".json")
+
+    staged = _cache.staging_path(key, ".mp3")
+    with open(staged, "wb") as f:
+        f.write(result["audio"])
+    return _cache.store(key, staged, ".mp3")
+
+
+def load_deep(key):
+    """Cached processed PCM (float32 array) or None."""
+    path = _cache.lookup(key, ".npy")
+    if not path:
+        return None
+    return np.load(path)
+
+
+def pcm_digest(samples):
+    """Short content hash of a processed voice-over (float32 PCM)."""
+    data = np.ascontiguousarray(samples, dtype=np.float32)
+    return hashlib.sha256(data.tobytes()).hexdigest()[:16]
+
+
+def store_deep(key, samples):
+    staged = _cache.staging_path(key, ".npy")
+    with open(staged, "wb") as f:
+        np.save(f, np.asarray(samples, dtype=np.float32))
+    return _cache.store(key, staged, ".npy")
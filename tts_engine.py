@@ -0,0 +1,210 @@
+"""
+🗣️ TTS Engine
+=============
+Voice-over synthesis for one script or a whole batch on a single event
+loop.
+
+- Backends are pluggable: EdgeTTSBackend (Microsoft edgeTTS, default) or
+  HTTPTTSBackend (any HTTP service returning MP3, e.g. a local stand-in
+  server for tests and benchmarks)
+- A batch runs every script concurrently, bounded by a semaphore, with
+  retries and exponential backoff per script
+- Results go through the TTS cache: cached scripts never reach a backend
+
+A synthesis result is a plain dict:
+    {"audio": mp3_bytes,
+     "words": [{"text": "नमस्ते", "start": 0.1, "end": 0.55}, ...]}
+with word times in seconds of the raw TTS audio.
+"""
+
+import asyncio
+import base64
+from importlib.util import find_spec
+
+import tts_cache
+
+# edge_tts (and the aiohttp stack under it) is only imported on the first
+# synthesis, so plan-only and upload-only runs never load it
+EDGE_TTS_AVAILABLE = find_spec("edge_tts") is not None
+if not EDGE_TTS_AVAILABLE:
+    print("⚠️ edge-tts not installed. Install with: pip install edge-tts")
+
+# --- Voice settings ---
+EDGE_TTS_VOICE = "hi-IN-MadhurNeural"
+# Optimized for consistency and naturalness
+EDGE_TTS_PROSODY = {
+    "rate": "+10%",    # Slightly faster but more natural
+    "pitch": "-15Hz",  # Moderate deepening for consistency
+    "volume": "+15%",  # Clear but not overpowering
+}
+EDGE_TTS_SAMPLE_RATE = 24000  # edgeTTS MP3 output rate
+
+# --- Batch settings ---
+TTS_CONCURRENCY = 4
+TTS_RETRIES = 3
+TTS_RETRY_DELAY = 1.0  # seconds, doubled after every failed attempt
+
+# edgeTTS reports boundary offsets in 100 ns ticks
+TICKS_PER_SECOND = 10_000_000
+
+
+class EdgeTTSBackend:
+    """Synthesis through edgeTTS."""
+
+    name = "edge-tts"
+    cache_id = name
+
+    async def synthesize(self, text, voice, prosody):
+        """Return the synthesis result (audio + word timings) for one script."""
+        if not EDGE_TTS_AVAILABLE:
+            raise ImportError("edge-tts not installed! Run: pip install edge-tts")
+        import edge_tts
+        communicate = edge_tts.Communicate(text=text, voice=voice, boundary="WordBoundary",
+                                           **prosody)
+        chunks = []
+        words = []
+        async for chunk in communicate.stream():
+            if chunk["type"] == "audio":
+                chunks.append(chunk["data"])
+            elif chunk["type"] == "WordBoundary":
+                start = chunk["offset"] / TICKS_PER_SECOND
+                words.append({"text": chunk["text"], "start": start,
+                              "end": start + chunk["duration"] / TICKS_PER_SECOND})
+        return {"audio": b"".join(chunks), "words": words}
+
+
+class HTTPTTSBackend:
+    """
+    Synthesis through an HTTP service.
+
+    The service gets a JSON POST {"text", "voice", "rate", "pitch", "volume"}
+    and answers either with the MP3 bytes (no word timings) or with JSON
+    {"audio": base64 MP3, "words": [{"text", "start", "end"}, ...]}.
+
+    Args:
+        url: Endpoint to POST to
+        timeout: Request timeout in seconds
+    """
+
+    name = "http"
+
+    def __init__(self, url, timeout=60):
+        self.url = url
+        self.timeout = timeout
+        self.cache_id = f"{self.name}:{url}"
+
+    async def synthesize(self, text, voice, prosody):
+        import aiohttp
+        payload = dict(prosody, text=text, voice=voice)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            async with session.post(self.url, json=payload) as response:
+                response.raise_for_status()
+                if response.content_type == "application/json":
+                    result = await response.json()
+                    return {"audio": base64.b64decode(result["audio"]),
+                            "words": result.get("words", [])}
+                return {"audio": await response.read(), "words": []}
+
+
+def backend_id(backend=None):
+    """Identity of a backend in TTS cache keys (default: edgeTTS)."""
+    backend = backend or EdgeTTSBackend()
+    return getattr(backend, "cache_id", None) or type(backend).__name__
+
+
+def scale_words(words, factor):
+    """Word timings with every time multiplied by `factor` (e.g. after a tempo change)."""
+    return [dict(word, start=word["start"] * factor, end=word["end"] * factor) for word in words]
+
+
+def tts_job(text, voice=EDGE_TTS_VOICE, prosody=None):
+    """One synthesis request."""
+    return {"text": text, "voice": voice, "prosody": dict(prosody or EDGE_TTS_PROSODY)}
+
+
+async def _synthesize_one(backend, job, semaphore, retries, retry_delay):
+    delay = retry_delay
+    for attempt in range(1, retries + 1):
+        try:
+            async with semaphore:
+                result = await backend.synthesize(job["text"], job["voice"], job["prosody"])
+            if not result["audio"]:
+                raise RuntimeError("❌ TTS returned no audio!")
+            return result
+        except Exception as e:
+            if attempt == retries:
+                return e
+            print(f"   ⚠️ TTS attempt {attempt}/{retries} failed ({e}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            delay *= 2
+
+
+async def synthesize_batch_async(jobs, backend=None, concurrency=TTS_CONCURRENCY,
+                                 retries=TTS_RETRIES, retry_delay=TTS_RETRY_DELAY):
+    """
+    Synthesise jobs concurrently on the running event loop.
+
+    Returns:
+        One entry per job: synthesis result, or the exception of its last attempt
+    """
+    backend = backend or EdgeTTSBackend()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    return await asyncio.gather(*(
+        _synthesize_one(backend, job, semaphore, retries, retry_delay) for job in jobs
+    ))
+
+
+def synthesize_batch(jobs, backend=None, concurrency=TTS_CONCURRENCY, retries=TTS_RETRIES,
+                     retry_delay=TTS_RETRY_DELAY, use_cache=True):
+    """
+    Synthesise many scripts at once (one event loop for the whole batch).
+
+    Args:
+        jobs: tts_job() dicts, or plain script strings (default voice/prosody)
+        backend: EdgeTTSBackend (default) or HTTPTTSBackend
+        concurrency: Maximum requests in flight
+        retries: Attempts per script
+        retry_delay: Delay before the first retry (doubles each time)
+        use_cache: Read and fill the TTS cache (default: True)
+
+    Returns:
+        One entry per job: synthesis result, or the exception that made it fail
+    """
+    jobs = [tts_job(job) if isinstance(job, str) else job for job in jobs]
+    results = [None] * len(jobs)
+    source = backend_id(backend)
+    keys = [tts_cache.raw_key(job["text"], job["voice"], job["prosody"], source) for job in jobs]
+
+    # Cached scripts first; identical scripts are synthesised once
+    pending = {}
+    for i, key in enumerate(keys):
+        cached = tts_cache.load_result(key) if use_cache else None
+        if cached is not None:
+            results[i] = cached
+        else:
+            pending.setdefault(key, []).append(i)
+
+    if pending:
+        print(f"🎙️ Synthesising {len(pending)} voice-over(s) "
+              f"({len(jobs) - sum(len(v) for v in pending.values())} cached, "
+              f"concurrency {concurrency})...")
+        batch = [jobs[indices[0]] for indices in pending.values()]
+        outputs = asyncio.run(
+            synthesize_batch_async(batch, backend, concurrency, retries, retry_delay)
+        )
+        for (key, indices), output in zip(pending.items(), outputs):
+            if use_cache and not isinstance(output, Exception):
+                tts_cache.store_result(key, output)
+            for i in indices:
+                results[i] = output
+
+    return results
+
+
+def synthesize(text, voice=EDGE_TTS_VOICE, prosody=None, backend=None, use_cache=True):
+    """Synthesise one script. Returns the synthesis result, raising on failure."""
+    result = synthesize_batch([tts_job(text, voice, prosody)], backend, use_cache=use_cache)[0]
+    if isinstance(result, Exception):
+        raise result
+    return result
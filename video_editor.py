@@ -8,6 +8,7 @@ Contains all the video editing functionality with advanced effects:
 - Background music mixing
 - edgeTTS natural and consistent voice generation
 - Optimal 15-second viral reel creation
+- Seeded reel planning (ReelPlan) separate from rendering
 - Automatic cleanup of temp files
 """
 
@@ -22,22 +23,29 @@ import random
 import shutil
 import time
 import gc
-from moviepy.editor import (
-    ImageClip, concatenate_videoclips, AudioFileClip,
-    CompositeVideoClip, ColorClip
+from PIL import Image
+
+from color_grading import FILTER_PRESETS, grade_still
+from image_loader import REEL_SIZE, load_reel_image
+from ken_burns import KenBurnsRenderer
+from transition_bank import TransitionBank
+from timeline import attach_captions, crossfade_spec, overlap_still, still_spec, transition_spec
+from frame_effects import CROSSFADE_DURATION, GRADE_RAMP_DURATION, attach_color_ramp
+from captions import build_cues, get_caption_renderer
+from segment_render import render_segments_parallel
+from segment_library import quantize_zoom
+from encoder import AUDIO_FPS, DEFAULT_PROFILE
+from audio_dsp import deep_voice_chain, deep_voice_time_scale, resample
+from ffmpeg_utils import decode_audio
+from music_library import MusicLibrary
+from audio_mixer import mix_voice_music
+import tts_cache
+from tts_engine import (
+    EDGE_TTS_PROSODY, EDGE_TTS_SAMPLE_RATE, EDGE_TTS_VOICE, TTS_CONCURRENCY,
+    backend_id, scale_words, synthesize_batch, synthesize_batch_async, tts_job
 )
-from moviepy.video.fx import resize, crop, fadein, fadeout
-import numpy as np
-from PIL import Image, ImageEnhance, ImageFilter
-
-# --- edgeTTS Integration ---
-try:
-    import edge_tts
-    import asyncio
-    EDGE_TTS_AVAILABLE = True
-except ImportError:
-    EDGE_TTS_AVAILABLE = False
-    print("⚠️ edge-tts not installed. Install with: pip install edge-tts")
+from timeline_planner import phrase_ends, plan_image_durations
+from reel_plan import ReelPlan, estimate_cost, lookup_render, render_key, store_render
 
 # --- Configuration ---
 OUTPUT_DIR = "output"
@@ -46,6 +54,26 @@ ASSETS_DIR = "assets"
 TRANSITIONS_DIR = os.path.join(ASSETS_DIR, "transitions")
 MUSIC_DIR = os.path.join(ASSETS_DIR, "background_music")
 TEMP_DIR = os.path.join(OUTPUT_DIR, "temp")
+VIDEO_FPS = 30
+
+# --- Cuts between images ---
+# "clips": 1 second transition clips from assets, inserted between stills
+# "crossfade": the stills overlap and dissolve into each other in motion
+TRANSITION_STYLES = ("clips", "crossfade")
+TRANSITION_CLIP_DURATION = 1.0
+CROSSFADE_SHARE = 0.5     # Share of reels cut with crossfades (transition_style=None)
+
+# --- Draft (preview) renders ---
+# Same plan, audio and random choices as the full render; only the frame
+# size, frame rate and encoder preset change
+DRAFT_SCALE = 0.5         # 540x960
+DRAFT_FPS = 15
+DRAFT_PROFILE = "draft"
+
+
+def scaled_size(scale, size=REEL_SIZE):
+    """Frame size scaled by `scale`, rounded to even dimensions (H.264/yuv420p)."""
+    return tuple(max(2, int(round(dim * scale / 2)) * 2) for dim in size)
 
 
 def ensure_directories():
@@ -56,142 +84,152 @@ def ensure_directories():
 
 
 def cleanup_temp_files():
-    """Delete all temp files and temp directory after final video is created"""
-    deleted_count = 0
-    deleted_size = 0
-    
-    if os.path.exists(TEMP_DIR):
-        # Count files before deletion
-        import glob
-        all_files = glob.glob(os.path.join(TEMP_DIR, "*"))
-        for f in all_files:
-            if os.path.isfile(f):
-                deleted_count += 1
-                deleted_size += os.path.getsize(f)
-        
-        # Delete entire temp directory
-        try:
-            shutil.rmtree(TEMP_DIR)
-            if deleted_count > 0:
-                print(f"🗑️  Deleted {deleted_count} temp files ({deleted_size/1024/1024:.1f} MB freed)")
-            else:
-                print("🗑️  Temp directory cleaned")
-        except Exception as e:
-            print(f"⚠️ Could not delete temp files: {e}")
+    """
+    Remove the temp directory once no render is using it.
+
+    Each render deletes its own scratch folder inside it (see
+    segment_render); renders still running in other processes keep it
+    non-empty, so it is left alone for them.
+    """
+    try:
+        os.rmdir(TEMP_DIR)
+        print("🗑️  Temp directory cleaned")
+    except FileNotFoundError:
+        pass
+    except OSError:
+        print("🗑️  Temp directory still in use by another render, leaving it")
 
 
 # --- VOICE-OVER GENERATION WITH edgeTTS ---
-async def generate_edge_tts_voice(text, output_path, voice_name="hi-IN-MadhurNeural"):
+async def generate_edge_tts_voice(text, output_path, voice_name=EDGE_TTS_VOICE):
     """
-    Generate natural-sounding Hindi voice-over using edgeTTS.
-    Optimized for consistency and naturalness.
+    Generate natural-sounding Hindi voice-over using edgeTTS and save it
+    as an MP3 file.
     """
     print(f"🎙️ Generating voice with edgeTTS ({voice_name})...")
-    
-    # Optimized for consistency and naturalness
-    communicate = edge_tts.Communicate(
-        text=text,
-        voice=voice_name,
-        rate="+10%",   # Slightly faster but more natural
-        pitch="-15Hz",  # Moderate deepening for consistency
-        volume="+15%"   # Clear but not overpowering
-    )
-    
-    await communicate.save(output_path)
+    data = (await synthesize_batch_async([tts_job(text, voice_name)]))[0]
+    if isinstance(data, Exception):
+        raise data
+    with open(output_path, "wb") as f:
+        f.write(data)
     print(f"✅ Voice-over saved: {output_path}")
 
 
-def create_deep_voice_edgetts(text, output_name="voiceover.mp3"):
-    """Wrapper for async edgeTTS voice generation with pydub enhancement"""
-    if not EDGE_TTS_AVAILABLE:
-        raise ImportError("edge-tts not installed! Run: pip install edge-tts")
+def create_deep_voices_pcm(texts, voice_name=EDGE_TTS_VOICE, prosody=None, use_cache=True,
+                           backend=None, concurrency=TTS_CONCURRENCY):
+    """
+    Generate several voice-overs as in-memory PCM buffers.
     
-    ensure_directories()
-    output_path = os.path.join(TEMP_DIR, output_name)
+    All scripts missing from the TTS cache are synthesised concurrently on
+    one event loop; each MP3 is decoded in memory and run through the deep
+    voice chain. Nothing is written to disk except cache entries, and the
+    only lossy encode left is the AAC track of the final video.
     
-    # Run async function
-    asyncio.run(generate_edge_tts_voice(text, output_path))
+    Args:
+        texts: Scripts to speak
+        voice_name: edgeTTS voice
+        prosody: rate/pitch/volume settings (default: EDGE_TTS_PROSODY)
+        use_cache: Read and fill the TTS cache (default: True)
+        backend: TTS backend (default: edgeTTS, see tts_engine)
+        concurrency: Maximum TTS requests in flight
     
-    # Further enhancement with pydub for consistency
-    try:
-        from pydub import AudioSegment
-        from pydub.effects import compress_dynamic_range, normalize
-        
-        sound = AudioSegment.from_file(output_path)
-        
-        # Gentle deepening for natural sound
-        octaves = -0.15
-        new_sample_rate = int(sound.frame_rate * (2.0 ** octaves))
-        deep_sound = sound._spawn(sound.raw_data, overrides={'frame_rate': new_sample_rate})
-        deep_sound = deep_sound.set_frame_rate(44100)
-        
-        # Balanced EQ for clarity and naturalness
-        deep_sound = deep_sound.low_pass_filter(3800).high_pass_filter(85)
-        
-        # Normalize and compress for consistency
-        deep_sound = normalize(deep_sound)
-        deep_sound = compress_dynamic_range(deep_sound, threshold=-20.0, ratio=3.0)
-        
-        deep_path = output_path.replace(".mp3", "_deep.mp3")
-        deep_sound.export(deep_path, format="mp3", bitrate="192k")
-        print("🎙️ Voice optimized: Natural + Consistent + Clear")
-        return deep_path
+    Returns:
+        One entry per script: (samples, sample_rate, words) with mono
+        float32 PCM at AUDIO_FPS and word timings in seconds of that PCM,
+        or the exception that made it fail
+    """
+    prosody = prosody or EDGE_TTS_PROSODY
+    time_scale = deep_voice_time_scale(EDGE_TTS_SAMPLE_RATE)
+    source = backend_id(backend)
+    results = [None] * len(texts)
+    
+    missing = []
+    for i, text in enumerate(texts):
+        samples = words = None
+        if use_cache:
+            samples = tts_cache.load_deep(
+                tts_cache.deep_key(text, voice_name, prosody, AUDIO_FPS, source))
+            words = tts_cache.load_words(tts_cache.raw_key(text, voice_name, prosody, source))
+        if samples is not None and words is not None:
+            results[i] = (samples, AUDIO_FPS, scale_words(words, time_scale))
+        else:
+            missing.append(i)
+    if len(missing) < len(texts):
+        print(f"🎙️ {len(texts) - len(missing)} voice-over(s) loaded from TTS cache")
+    
+    jobs = [tts_job(texts[i], voice_name, prosody) for i in missing]
+    tts_results = synthesize_batch(jobs, backend, concurrency, use_cache=use_cache)
+    
+    for i, tts_result in zip(missing, tts_results):
+        if isinstance(tts_result, Exception):
+            results[i] = tts_result
+            continue
+        # A corrupt or empty MP3 fails this script only, not the batch
+        try:
+            samples = decode_audio(tts_result["audio"], EDGE_TTS_SAMPLE_RATE, channels=1)
+            if not len(samples):
+                raise ValueError("❌ Decoded voice-over is empty")
+        except Exception as e:
+            results[i] = e
+            continue
         
-    except Exception as e:
-        print(f"⚠️ pydub processing skipped: {e}")
-        return output_path
+        # Further enhancement for consistency (the deepening slows the
+        # voice down, so the word timings stretch with it)
+        try:
+            samples, rate = deep_voice_chain(samples, EDGE_TTS_SAMPLE_RATE)
+            words = scale_words(tts_result["words"], time_scale)
+            print("🎙️ Voice optimized: Natural + Consistent + Clear")
+            if use_cache:
+                tts_cache.store_deep(
+                    tts_cache.deep_key(texts[i], voice_name, prosody, AUDIO_FPS, source), samples
+                )
+        except Exception as e:
+            print(f"⚠️ Voice processing skipped: {e}")
+            samples, rate = resample(samples, EDGE_TTS_SAMPLE_RATE, AUDIO_FPS), AUDIO_FPS
+            words = tts_result["words"]
+        results[i] = (samples, rate, words)
+    
+    return results
+
+
+def create_deep_voice_pcm(text, voice_name=EDGE_TTS_VOICE, prosody=None, use_cache=True,
+                          backend=None):
+    """
+    Generate one voice-over as an in-memory PCM buffer (see create_deep_voices_pcm).
+    
+    Returns:
+        (samples, sample_rate, words): mono float32 PCM at AUDIO_FPS and
+        word timings in seconds
+    """
+    result = create_deep_voices_pcm([text], voice_name, prosody, use_cache, backend)[0]
+    if isinstance(result, Exception):
+        raise result
+    return result
 
 
 # --- UNIFIED VISUAL FILTER ---
-def apply_unified_filter(image_path, filter_type="cinematic"):
+def apply_unified_filter(image_path, filter_type="cinematic", size=None):
     """
     Apply a consistent visual filter to all images.
     
     Args:
         image_path: Path to input image
         filter_type: Type of filter to apply (cinematic, warm, cool)
+        size: Reel frame size (width, height). When given, the image is
+              decoded and cover-cropped to that size (plus Ken Burns
+              headroom) before filtering. None keeps native resolution.
     
     Returns:
         PIL Image with applied filter
     """
-    img = Image.open(image_path).convert('RGB')
-    
-    if filter_type == "cinematic":
-        # Cinematic look - slight desaturation, enhanced contrast
-        enhancer = ImageEnhance.Contrast(img)
-        img = enhancer.enhance(1.2)
-        
-        enhancer = ImageEnhance.Color(img)
-        img = enhancer.enhance(0.9)
-        
-        enhancer = ImageEnhance.Brightness(img)
-        img = enhancer.enhance(1.05)
-        
-    elif filter_type == "warm":
-        # Warm golden filter
-        enhancer = ImageEnhance.Color(img)
-        img = enhancer.enhance(1.3)
-        
-        # Add warm tint
-        img_array = np.array(img, dtype=np.float32)
-        img_array[:, :, 0] = np.clip(img_array[:, :, 0] * 1.1, 0, 255)  # Red
-        img_array[:, :, 2] = np.clip(img_array[:, :, 2] * 0.9, 0, 255)  # Blue
-        img = Image.fromarray(img_array.astype(np.uint8))
-        
-    elif filter_type == "cool":
-        # Cool blue filter
-        enhancer = ImageEnhance.Color(img)
-        img = enhancer.enhance(1.2)
-        
-        img_array = np.array(img, dtype=np.float32)
-        img_array[:, :, 2] = np.clip(img_array[:, :, 2] * 1.1, 0, 255)  # Blue
-        img_array[:, :, 0] = np.clip(img_array[:, :, 0] * 0.9, 0, 255)  # Red
-        img = Image.fromarray(img_array.astype(np.uint8))
-    
-    # Slight sharpening for all filters
-    img = img.filter(ImageFilter.SHARPEN)
+    if size is not None:
+        img = load_reel_image(image_path, size)
+    else:
+        img = Image.open(image_path).convert('RGB')
     
-    return img
+    # Colour grade in one fused pass (presets live in color_grading.FILTER_PRESETS)
+    # followed by slight sharpening for all filters
+    return grade_still(img, filter_type)
 
 
 # --- KEN BURNS EFFECT (ZOOM/PAN) ---
@@ -206,92 +244,158 @@ def apply_ken_burns_effect(clip, zoom_ratio=1.2):
     Returns:
         Clip with Ken Burns effect applied
     """
-    # Apply resize that gradually zooms in over the duration
-    return clip.resize(lambda t: 1 + (zoom_ratio - 1) * t / clip.duration)
+    # Centered zoom from 1.0 to zoom_ratio, rendered with one resample per frame
+    renderer = KenBurnsRenderer(
+        clip.get_frame(0), clip.size, clip.duration,
+        zoom_end=zoom_ratio, headroom=1.0
+    )
+    return renderer.to_clip()
 
 
 # --- CREATE VIRAL REEL WITH ADVANCED EFFECTS ---
-def create_viral_reel_advanced(hindi_text, output_name="viral_reel_auto.mp4", use_voice=True, 
-                               num_images=None, filter_type=None, use_transitions=True, 
-                               use_background_music=True):
+def render_settings(draft=False, draft_scale=DRAFT_SCALE, encoder_profile=DEFAULT_PROFILE):
     """
-    Create viral reel with advanced effects:
-    - 6-7 random images with unified filter
-    - 2 seconds per image with Ken Burns motion effect
-    - 1 second transition effects from assets
-    - Background music mixed with voice
-    - More consistent and natural voice
+    (size, fps, encoder profile) of a full or draft render. Drafts use
+    DRAFT_PROFILE unless `encoder_profile` is already a settings dict.
+    """
+    if draft:
+        if not isinstance(encoder_profile, dict):
+            encoder_profile = DRAFT_PROFILE
+        return scaled_size(draft_scale), DRAFT_FPS, encoder_profile
+    return REEL_SIZE, VIDEO_FPS, encoder_profile
+
+
+def choose_images(rng, num_images=None, filter_type=None):
+    """
+    First random choices of a plan: the images and the filter.
+    
+    Args:
+        rng: random.Random of the plan (consumed exactly as plan_reel does)
+        num_images: Preferred number of images (default: random 6-7)
+        filter_type: Visual filter type (default: random)
+    
+    Returns:
+        (image_files, selected_images, filter_type): every image available,
+        the chosen file names and the filter
+    """
+    image_files = sorted(f for f in os.listdir(IMAGES_DIR) if f.lower().endswith(('.jpg', '.png', '.jpeg')))
+    
+    if not image_files:
+        raise ValueError(f"❌ No images found in '{IMAGES_DIR}/' folder!")
+    
+    # Select 6-7 random images (or specified number)
+    if num_images is None:
+        num_images = rng.randint(6, 7)
+    num_images = min(num_images, len(image_files))
+    selected_images = rng.sample(image_files, num_images)
+    
+    # Select random filter (or use specified)
+    if filter_type is None:
+        filters = list(FILTER_PRESETS)
+        filter_type = rng.choice(filters)
+    return image_files, selected_images, filter_type
+
+
+def plan_reel(hindi_text, use_voice=True, num_images=None, filter_type=None,
+              use_transitions=True, use_background_music=True, captions=True,
+              progressive_grade=True, seed=None, voice_name=EDGE_TTS_VOICE, prosody=None,
+              transition_style=None, voice_over=None, prepare_assets=True):
+    """
+    Make every choice for a reel up front (nothing is rendered):
+    - 6-7 random images with unified filter (more or fewer to fit the voice)
+    - Images timed to the voice-over (2 seconds each without voice), cut
+      between phrases, with a random Ken Burns zoom
+    - Cuts: 1 second transition effects from assets, or crossfades between
+      the moving stills (see transition_style)
+    - Background music, progressive grade and captions
     
     Args:
         hindi_text: Hindi text for voice-over
-        output_name: Output video filename
         use_voice: Whether to generate voice-over (default: True)
-        num_images: Number of images to use (default: random 6-7)
+        num_images: Preferred number of images (default: random 6-7)
         filter_type: Visual filter type (cinematic/warm/cool, default: random)
         use_transitions: Use transition effects from assets (default: True)
         use_background_music: Add background music (default: True)
+        captions: Burn the script into the video as captions (default: True;
+                  raises RuntimeError when no font or raqm layout can draw
+                  them, see CaptionRenderer.require)
+        progressive_grade: Open in black & white and fade to full color
+                           (default: True)
+        seed: Seed for every random choice (default: a new one)
+        voice_name: edgeTTS voice
+        prosody: edgeTTS rate/pitch/volume (default: EDGE_TTS_PROSODY)
+        transition_style: "clips" or "crossfade" (default: crossfades for
+                          CROSSFADE_SHARE of the seeds, and whenever no
+                          transition clip is available)
+        voice_over: (samples, sample_rate, words) of create_deep_voice_pcm
+                    already run for this text, voice and prosody (default:
+                    generate it here)
+        prepare_assets: Decode the chosen music and transitions now, so a
+                        broken transition is replaced at plan time
+                        (default: True; False when they are decoded
+                        elsewhere, e.g. by the orchestrator's asset stages)
     
     Returns:
-        Path to created video file
+        ReelPlan (render it with render_plan)
     """
-    print("\n🎬 Creating Enhanced Viral Reel...")
-    
     ensure_directories()
     
-    # 1. Get random images (6-7 images)
-    print("\n🖼️ Step 1: Selecting random images")
-    image_files = [f for f in os.listdir(IMAGES_DIR) if f.lower().endswith(('.jpg', '.png', '.jpeg'))]
-    
-    if not image_files:
-        raise ValueError(f"❌ No images found in '{IMAGES_DIR}/' folder!")
+    # All random choices come from one seeded generator, so the same seed
+    # and script always give the same plan
+    if seed is None:
+        seed = random.randrange(2**32)
+    rng = random.Random(seed)
+    print(f"\n📋 Planning reel (seed {seed})")
     
-    # Select 6-7 random images (or specified number)
-    if num_images is None:
-        num_images = random.randint(6, 7)
-    num_images = min(num_images, len(image_files))
-    selected_images = random.sample(image_files, num_images)
+    # 1. Get random images (6-7 images) and filter
+    print("\n🖼️ Step 1: Selecting random images")
+    image_files, selected_images, filter_type = choose_images(rng, num_images, filter_type)
+    num_images = len(selected_images)
     
     print(f"   Selected {num_images} random images from {len(image_files)} available")
-    
-    # 2. Select random filter (or use specified)
-    if filter_type is None:
-        filters = ["cinematic", "warm", "cool"]
-        filter_type = random.choice(filters)
     print(f"   Selected filter: {filter_type}")
     
-    # 3. Generate voice-over
-    audio_path = None
-    audio = None
+    # 3. Voice-over: only its duration and word timings shape the plan (the
+    # PCM stays in the TTS cache for the renderer)
+    voice = None
+    voice_duration = None
+    voice_words = []
     
     if use_voice:
         print("\n🎙️ Step 2: Generate Voice-over")
+        voice = {"name": voice_name, "prosody": dict(prosody or EDGE_TTS_PROSODY)}
         try:
-            audio_path = create_deep_voice_edgetts(hindi_text, "viral_voice.mp3")
-            audio = AudioFileClip(audio_path)
-            print(f"   Audio duration: {audio.duration:.1f}s")
+            samples, _, voice_words = voice_over or create_deep_voice_pcm(
+                hindi_text, voice_name, voice["prosody"])
+            voice_duration = len(samples) / AUDIO_FPS
+            # Ties the plan (and its render key) to this exact voice-over
+            voice["digest"] = tts_cache.pcm_digest(samples)
+            print(f"   Audio duration: {voice_duration:.1f}s")
         except Exception as e:
             print(f"❌ Voice generation failed: {e}")
             print("💡 Creating video without voice")
-            audio_path = None
-            audio = None
+            voice = None
     else:
         print("\n🎬 Step 2: Skipping voice-over (silent mode)")
     
     # 4. Select random background music
-    bg_music = None
-    selected_music_name = None
+    music = None
     
     if use_background_music:
         print("\n🎵 Step 3: Select background music")
         if os.path.exists(MUSIC_DIR):
-            music_files = [f for f in os.listdir(MUSIC_DIR) if f.lower().endswith('.mp3')]
+            music_library = MusicLibrary(MUSIC_DIR, AUDIO_FPS)
+            music_files = music_library.names()
             
             if music_files:
-                selected_music = random.choice(music_files)
-                selected_music_name = selected_music
-                music_path = os.path.join(MUSIC_DIR, selected_music)
-                bg_music = AudioFileClip(music_path)
-                print(f"   Selected: {selected_music}")
+                selected_music = rng.choice(music_files)
+                music = {"name": selected_music, "gain": 1.0}
+                if prepare_assets:
+                    # Decoded once per file into the memory-mapped PCM library
+                    music_info = music_library.info(selected_music)
+                    print(f"   Selected: {selected_music} ({music_info['duration']:.1f}s)")
+                else:
+                    print(f"   Selected: {selected_music}")
             else:
                 print("   No background music found")
         else:
@@ -302,169 +406,242 @@ def create_viral_reel_advanced(hindi_text, output_name="viral_reel_auto.mp4", us
     # 5. Get transition effects
     print("\n⚡ Step 4: Loading transition effects")
     transition_files = []
-    
-    if use_transitions and os.path.exists(TRANSITIONS_DIR):
-        transition_files = [f for f in os.listdir(TRANSITIONS_DIR) if f.lower().endswith(('.mp4', '.mov'))]
+    transition_bank = None
+    
+    if transition_style is None:
+        transition_style = "crossfade" if rng.random() < CROSSFADE_SHARE else "clips"
+    elif transition_style not in TRANSITION_STYLES:
+        raise ValueError(f"❌ Unknown transition style: {transition_style}")
+    
+    if not use_transitions:
+        print("   Transition effects disabled")
+    elif transition_style == "crossfade":
+        print("   Crossfading between images")
+    elif os.path.exists(TRANSITIONS_DIR):
+        transition_bank = TransitionBank(TRANSITIONS_DIR)
+        transition_files = transition_bank.names()
         
         if not transition_files:
-            print("   No transition effects found, will use Ken Burns only")
+            print("   No transition effects found, will use crossfades")
         else:
             print(f"   Found {len(transition_files)} transition effects")
     else:
-        print("   Transition effects disabled or folder not found")
-    
-    # 6. Create image clips with unified filter and Ken Burns effect
-    print(f"\n🎨 Step 5: Creating {num_images} clips with filter and motion")
+        print("   Transition folder not found, will use crossfades")
+    if use_transitions and not transition_files:
+        transition_style = "crossfade"
+    
+    # 6. Plan image durations around the voice, cutting between phrases
+    # (a crossfade overlaps the two stills, a clip is played between them)
+    transition_duration = TRANSITION_CLIP_DURATION
+    if transition_style == "crossfade":
+        transition_duration = CROSSFADE_DURATION
+    image_durations = plan_image_durations(
+        voice_duration,
+        phrase_ends(voice_words, hindi_text) if voice is not None else (),
+        num_images,
+        max_images=len(image_files),
+        transition_duration=transition_duration if use_transitions else 0.0
+    )
+    if len(image_durations) < num_images:
+        selected_images = selected_images[:len(image_durations)]
+    elif len(image_durations) > num_images:
+        remaining = [f for f in image_files if f not in selected_images]
+        selected_images += rng.sample(remaining, len(image_durations) - num_images)
+    num_images = len(selected_images)
+    
+    # Image clips with unified filter and Ken Burns effect
+    print(f"\n🎨 Step 5: Planning {num_images} clips with filter and motion")
+    if voice_duration is not None:
+        print(f"   Timed to voice: {voice_duration:.1f}s, "
+              f"{min(image_durations):.1f}-{max(image_durations):.1f}s per image")
     
     clips = []
-    image_duration = 2.0  # 2 seconds per image
     
-    for i, img_file in enumerate(selected_images):
+    for i, (img_file, image_duration) in enumerate(zip(selected_images, image_durations)):
         img_path = os.path.join(IMAGES_DIR, img_file)
         
-        # Apply unified filter
-        filtered_img = apply_unified_filter(img_path, filter_type)
-        
-        # Save temp filtered image
-        temp_path = os.path.join(TEMP_DIR, f"filtered_{i:03d}.jpg")
-        filtered_img.save(temp_path, quality=95)
-        
-        # Create clip with Ken Burns effect
-        clip = ImageClip(temp_path).set_duration(image_duration)
-        
-        # Resize to 9:16 (1080x1920)
-        clip = clip.resize(height=1920)
-        if clip.w < 1080:
-            clip = clip.resize(width=1080)
-        clip = clip.crop(x1=clip.w/2 - 540, width=1080, height=1920)
-        
-        # Apply Ken Burns effect (zoom in)
-        zoom_ratio = random.uniform(1.15, 1.25)
-        clip = apply_ken_burns_effect(clip, zoom_ratio)
-        
+        # Ken Burns effect (zoom in) on the graded still. The still is cached
+        # 9:16 with zoom headroom, so each frame is one crop-and-scale
+        # Zoom is snapped to a few levels so encoded segments can be reused
+        zoom_ratio = quantize_zoom(rng.uniform(1.15, 1.25))
+        clip = still_spec(img_path, filter_type, zoom_ratio, image_duration)
+        if use_transitions and transition_style == "crossfade":
+            # The motion carries on through the crossfades on either side
+            overlap_still(clip, transition_duration if i > 0 else 0.0,
+                          transition_duration if i < len(image_durations) - 1 else 0.0)
         clips.append(clip)
-        print(f"   ✓ Clip {i+1}/{num_images} created (filter: {filter_type}, zoom: {zoom_ratio:.2f}x)")
+        print(f"   ✓ Clip {i+1}/{num_images} planned (filter: {filter_type}, zoom: {zoom_ratio:.2f}x)")
     
     # 7. Add transition effects between clips
     print(f"\n🎞️ Step 6: Adding transition effects")
     
-    transition_duration = 1.0  # 1 second transitions
-    final_clips = []
+    segments = []
     
     for i, clip in enumerate(clips):
         # Add the main clip
-        final_clips.append(clip)
+        segments.append(clip)
         
         # Add transition after each clip except the last one
-        if i < len(clips) - 1 and transition_files:
-            # Pick a random transition
-            trans_file = random.choice(transition_files)
-            trans_path = os.path.join(TRANSITIONS_DIR, trans_file)
-            
-            try:
-                from moviepy.editor import VideoFileClip
-                trans_clip = VideoFileClip(trans_path)
-                trans_clip = trans_clip.set_duration(transition_duration)
-                
-                # Resize transition to 9:16
-                trans_clip = trans_clip.resize(height=1920)
-                if trans_clip.w < 1080:
-                    trans_clip = trans_clip.resize(width=1080)
-                trans_clip = trans_clip.crop(x1=trans_clip.w/2 - 540, width=1080, height=1920)
-                
-                # Remove audio from transition
-                trans_clip = trans_clip.without_audio()
-                
-                final_clips.append(trans_clip)
-                print(f"   ✓ Added transition {i+1}")
+        if i < len(clips) - 1 and use_transitions:
+            if transition_style == "crossfade":
+                transition = crossfade_spec(clip, clips[i + 1], transition_duration)
+            else:
+                # Pick a random transition
+                trans_file = rng.choice(transition_files)
                 
-            except Exception as e:
-                print(f"   ⚠️ Failed to load transition {trans_file}: {e}")
+                try:
+                    # Decoded once per file into the memory-mapped bank (1080x1920@30fps, no audio)
+                    if prepare_assets:
+                        transition_bank.prepare(trans_file)
+                    transition = transition_spec(trans_file, transition_duration)
+                    
+                except Exception as e:
+                    # Hard cut instead: the still keeps the transition's time
+                    print(f"   ⚠️ Failed to load transition {trans_file}: {e}, cutting instead")
+                    segments[-1] = dict(clip, duration=round(clip["duration"] + transition_duration, 4))
+                    continue
+            
+            segments.append(transition)
+            print(f"   ✓ Added {transition['type']} {i+1}")
+    
+    video_duration = sum(spec["duration"] for spec in segments)
+    
+    # Progressive grade: saturation ramps up in place on the frame buffer
+    # of the segments in the opening seconds
+    if progressive_grade:
+        attach_color_ramp(segments, min(GRADE_RAMP_DURATION, video_duration))
+        print(f"   ✓ Progressive grade: B&W → full color over {min(GRADE_RAMP_DURATION, video_duration):.1f}s")
+    
+    # Burned-in captions: each line is rasterised once and blended only
+    # over its bounding box in the segments where it is on screen
+    if captions:
+        get_caption_renderer().require(hindi_text)
+        cues = build_cues(hindi_text, voice_words, video_duration)
+        attach_captions(segments, cues)
+        print(f"   ✓ Captions: {len(cues)} cues "
+              f"({'word-timed' if voice_words else 'spread over the reel'})")
+    
+    plan = ReelPlan(hindi_text, seed, filter_type, segments, voice=voice, music=music,
+                    duration=video_duration)
+    print(f"   Plan {plan.hash()[:12]}: {len(segments)} segments, {video_duration:.2f}s")
+    return plan
+
+
+def render_plan(plan, output_name="viral_reel_auto.mp4", encoder_profile=DEFAULT_PROFILE,
+                parallel=False, draft=False, draft_scale=DRAFT_SCALE, use_cache=True):
+    """
+    Render a ReelPlan to an MP4 (no random choices are made here).
     
-    # 8. Combine all clips
-    print(f"\n🎬 Step 7: Combining clips")
-    final_video = concatenate_videoclips(final_clips, method="compose")
+    Args:
+        plan: ReelPlan from plan_reel (or ReelPlan.load)
+        output_name: Output video filename
+        encoder_profile: Encoder profile (draft/standard/archive, default: standard)
+        parallel: Encode the segments in worker processes on all cores
+                  instead of one after another (default: False); either way
+                  chunks are reused from the segment library
+        draft: Quick preview: render at draft_scale, DRAFT_FPS and the draft
+               encoder profile (default: False, full 1080x1920 @ 30 fps)
+        draft_scale: Frame scale of draft renders (default: 0.5 = 540x960)
+        use_cache: Reuse a reel already rendered from the same plan and
+                   settings, and store new ones (default: True)
+    
+    Returns:
+        Path to created video file
+    """
+    ensure_directories()
+    size, fps, encoder_profile = render_settings(draft, draft_scale, encoder_profile)
+    output_path = os.path.join(OUTPUT_DIR, output_name)
+    print(f"\n🎬 Rendering plan {plan.hash()[:12]}: {size[0]}x{size[1]} @ {fps} fps "
+          f"({'draft' if draft else 'full'}, seed {plan.seed})")
+    
+    # Same plan + same assets + same settings = same reel
+    sources = plan.images() + [os.path.join(TRANSITIONS_DIR, name) for name in plan.transitions()]
+    if plan.music:
+        sources.append(os.path.join(MUSIC_DIR, plan.music["name"]))
+    key = render_key(plan, size, fps, encoder_profile, sources)
+    cached = lookup_render(key) if use_cache else None
+    if cached:
+        shutil.copyfile(cached, output_path)
+        print(f"   ♻️ Already rendered, reusing it: {output_path}")
+        return output_path
     
-    print(f"   Video duration: {final_video.duration:.2f}s")
+    estimate = estimate_cost(plan, size, fps, encoder_profile)
+    print(f"   Estimated: {estimate['frames']} frames, ~{estimate['estimated_seconds']:.0f}s")
     
-    # 9. Add audio (voice + background music)
-    print(f"\n🎙️ Step 8: Adding audio")
+    # 1. Voice-over (from the TTS cache when the plan was made here). The
+    # images are timed to it and the render key stands for it, so a reel
+    # without it (or with a different one) is not rendered or cached
+    voice = None
+    if plan.voice:
+        print("\n🎙️ Step 1: Loading voice-over")
+        try:
+            voice, _, _ = create_deep_voice_pcm(plan.text, plan.voice["name"], plan.voice["prosody"])
+        except Exception as e:
+            raise RuntimeError(f"❌ Voice-over of the plan can't be generated ({e}): "
+                               f"re-plan the reel") from e
+        if plan.voice.get("digest") not in (None, tts_cache.pcm_digest(voice)):
+            raise RuntimeError("❌ Voice-over differs from the planned one (TTS cache "
+                               "evicted?): re-plan the reel")
+    
+    # 2. Combine all clips
+    # Every segment becomes one encoded chunk; chunks already in the segment
+    # library (from earlier reels) are reused, only new ones are rendered
+    print(f"\n🎬 Step 2: Combining clips")
+    print(f"   Video duration: {plan.duration:.2f}s")
+    
+    # 3. Add audio (voice + background music)
+    print(f"\n🎙️ Step 3: Adding audio")
+    
+    audio_samples = int(round(plan.duration * AUDIO_FPS))
+    music_library = None
+    music_pcm = None
+    
+    if plan.music:
+        # The bed is looped and trimmed to the video by slicing the mapped PCM
+        music_library = MusicLibrary(MUSIC_DIR, AUDIO_FPS)
+        music_pcm = music_library.bed(plan.music["name"], audio_samples, gain=plan.music["gain"])
+    
+    # Voice envelope -> sidechain-ducked music -> mix -> limiter, in one
+    # vectorised pass before encoding starts
+    audio_pcm = mix_voice_music(
+        voice[:audio_samples] if voice is not None else None,
+        music_pcm,
+        length=audio_samples,
+        rate=AUDIO_FPS
+    )
     
-    if audio_path and audio:
-        # Mix voice with background music
-        if bg_music:
-            # Reduce background music volume to not overpower voice
-            bg_music_reduced = bg_music.volumex(0.3)
-            
-            # Loop background music if shorter than video
-            if bg_music_reduced.duration < final_video.duration:
-                from moviepy.editor import concatenate_audioclips
-                loops_needed = int(final_video.duration / bg_music_reduced.duration) + 1
-                bg_music_list = [bg_music_reduced] * loops_needed
-                bg_music_reduced = concatenate_audioclips(bg_music_list)
-            
-            # Trim to video duration
-            bg_music_reduced = bg_music_reduced.subclip(0, min(bg_music_reduced.duration, final_video.duration))
-            
-            # Mix audio (voice + music)
-            from moviepy.audio.AudioClip import CompositeAudioClip
-            
-            # Trim voice to video duration
-            audio_trimmed = audio.subclip(0, min(audio.duration, final_video.duration))
-            
-            mixed_audio = CompositeAudioClip([audio_trimmed, bg_music_reduced])
-            final_video = final_video.set_audio(mixed_audio)
-            print("   ✓ Mixed voice with background music")
-        else:
-            # Just voice
-            final_video = final_video.set_audio(audio.subclip(0, min(audio.duration, final_video.duration)))
-            print("   ✓ Added voice-over")
-    elif bg_music:
-        # Just background music
-        if bg_music.duration < final_video.duration:
-            from moviepy.editor import concatenate_audioclips
-            loops_needed = int(final_video.duration / bg_music.duration) + 1
-            bg_music_list = [bg_music] * loops_needed
-            bg_music = concatenate_audioclips(bg_music_list)
-        bg_music = bg_music.subclip(0, min(bg_music.duration, final_video.duration))
-        final_video = final_video.set_audio(bg_music)
+    if voice is not None and music_pcm is not None:
+        print("   ✓ Mixed voice with ducked background music")
+    elif voice is not None:
+        print("   ✓ Added voice-over")
+    elif music_pcm is not None:
         print("   ✓ Added background music only")
     
-    # 10. Export
-    output_path = os.path.join(OUTPUT_DIR, output_name)
-    print(f"\n💾 Step 9: Exporting final video...")
+    # 4. Export
+    print(f"\n💾 Step 4: Exporting final video...")
     
-    final_video.write_videofile(
+    print(f"   Encoder profile: {encoder_profile}")
+    # One closed-GOP chunk per segment (in this process, or on all cores in
+    # parallel mode), joined by stream copy with the audio muxed in
+    if parallel:
+        print(f"   Rendering {len(plan.segments)} segments in parallel")
+    render_segments_parallel(
+        plan.segments,
         output_path,
-        fps=30,
-        codec='libx264',
-        audio_codec='aac',
-        threads=4,
-        preset='medium',
-        verbose=False,
-        logger=None
+        size,
+        fps=fps,
+        profile=encoder_profile,
+        audio=audio_pcm,
+        audio_fps=AUDIO_FPS,
+        workers=None if parallel else 1
     )
     
-    # 11. Close clips to release file handles
-    print("\n🔒 Closing video clips...")
-    try:
-        final_video.close()
-        if audio_path and audio:
-            audio.close()
-        if bg_music:
-            bg_music.close()
-        for clip in clips:
-            try:
-                clip.close()
-            except:
-                pass
-        for clip in final_clips:
-            try:
-                clip.close()
-            except:
-                pass
-    except Exception as e:
-        print(f"   ⚠️ Warning closing clips: {e}")
+    if use_cache:
+        store_render(key, output_path)
+    
+    # 5. Release memory-mapped frames and music
+    print("\n🔒 Releasing buffers...")
+    music_library = None
     
     # Force garbage collection to release file handles
     gc.collect()
@@ -472,24 +649,29 @@ def create_viral_reel_advanced(hindi_text, output_name="viral_reel_auto.mp4", us
     # Small delay to ensure OS releases files
     time.sleep(0.5)
     
-    # 12. Cleanup temp files
+    # 6. Cleanup temp files
     print("🗑️  Cleaning up temp files...")
     cleanup_temp_files()
     
     # Success message
     file_size = os.path.getsize(output_path) / 1024 / 1024
+    image_durations = [spec["duration"] for spec in plan.segments if spec["type"] == "still"]
+    transition_types = sorted({spec["type"] for spec in plan.segments} - {"still"})
     
     print("\n" + "="*60)
     print("🎉 SUCCESS! ENHANCED VIRAL REEL CREATED!")
     print("="*60)
     print(f"📹 File: {output_path}")
-    print(f"⏱️  Duration: {final_video.duration:.1f}s")
-    print(f"🖼️  Images: {num_images} ({image_duration}s each)")
-    print(f"🎨 Filter: {filter_type}")
+    print(f"⏱️  Duration: {plan.duration:.1f}s")
+    print(f"📐 Render: {size[0]}x{size[1]} @ {fps} fps{' (draft)' if draft else ''}, seed {plan.seed}")
+    print(f"🖼️  Images: {len(image_durations)} ({min(image_durations):.1f}-{max(image_durations):.1f}s each)")
+    print(f"🎨 Filter: {plan.filter_type}")
     print(f"⚡ Motion: Ken Burns effect on all images")
-    print(f"🎬 Transitions: {len(transition_files) if transition_files else 'None'}")
-    print(f"�️ Voice: {'Consistent Natural Hindi' if audio_path else 'None'}")
-    print(f"🎵 Music: {selected_music_name if bg_music else 'None'}")
+    print(f"🎬 Transitions: {', '.join(transition_types) if transition_types else 'None'}")
+    print(f"🌈 Grade: {'B&W → Full Color' if any(spec.get('saturation') for spec in plan.segments) else 'Full Color'}")
+    print(f"�️ Voice: {'Consistent Natural Hindi' if voice is not None else 'None'}")
+    print(f"🎵 Music: {plan.music['name'] if plan.music else 'None'}")
+    print(f"💬 Captions: {'Burned-in' if any(spec.get('captions') for spec in plan.segments) else 'None'}")
     print(f"💾 File size: {file_size:.1f} MB")
     print(f"✨ Output folder: Clean (temp files deleted)")
     print("="*60)
@@ -497,6 +679,72 @@ def create_viral_reel_advanced(hindi_text, output_name="viral_reel_auto.mp4", us
     return output_path
 
 
+def create_viral_reel_advanced(hindi_text, output_name="viral_reel_auto.mp4", use_voice=True, 
+                               num_images=None, filter_type=None, use_transitions=True, 
+                               use_background_music=True, encoder_profile=DEFAULT_PROFILE,
+                               parallel=False, captions=True, progressive_grade=True,
+                               draft=False, draft_scale=DRAFT_SCALE, seed=None,
+                               transition_style=None):
+    """
+    Create viral reel with advanced effects (plan_reel + render_plan):
+    - 6-7 random images with unified filter (more or fewer to fit the voice)
+    - Images timed to the voice-over (2 seconds each without voice), cut
+      between phrases, with Ken Burns motion effect
+    - Cuts: 1 second transition effects from assets, or crossfades between
+      the moving stills (see transition_style)
+    - Progressive color grading (B&W → full color over the opening seconds)
+    - Background music mixed with voice
+    - More consistent and natural voice
+    - Burned-in captions of the script
+    
+    The plan is saved next to the video (<output_name>.plan.json), so the
+    same reel can be rendered again, e.g. at full quality after a draft.
+    
+    Args:
+        hindi_text: Hindi text for voice-over
+        output_name: Output video filename
+        use_voice: Whether to generate voice-over (default: True)
+        num_images: Preferred number of images (default: random 6-7)
+        filter_type: Visual filter type (cinematic/warm/cool, default: random)
+        use_transitions: Use transition effects from assets (default: True)
+        use_background_music: Add background music (default: True)
+        encoder_profile: Encoder profile (draft/standard/archive, default: standard)
+        parallel: Encode the segments in worker processes on all cores
+                  instead of one after another (default: False); either way
+                  chunks are reused from the segment library
+        captions: Burn the script into the video as captions (default: True)
+        progressive_grade: Open in black & white and fade to full color
+                           (default: True)
+        draft: Quick preview: render at draft_scale, DRAFT_FPS and the draft
+               encoder profile (default: False, full 1080x1920 @ 30 fps)
+        draft_scale: Frame scale of draft renders (default: 0.5 = 540x960)
+        seed: Seed for every random choice (default: a new one, printed so
+              a draft can be re-rendered at full quality with the same plan)
+        transition_style: "clips" or "crossfade" (default: chosen by the
+                          seed, see plan_reel)
+    
+    Returns:
+        Path to created video file
+    """
+    print("\n🎬 Creating Enhanced Viral Reel...")
+    
+    plan = plan_reel(
+        hindi_text,
+        use_voice=use_voice,
+        num_images=num_images,
+        filter_type=filter_type,
+        use_transitions=use_transitions,
+        use_background_music=use_background_music,
+        captions=captions,
+        progressive_grade=progressive_grade,
+        seed=seed,
+        transition_style=transition_style
+    )
+    plan.save(os.path.join(OUTPUT_DIR, output_name + ".plan.json"))
+    
+    return render_plan(plan, output_name, encoder_profile, parallel, draft, draft_scale)
+
+
 def generate_thumbnail(video_path):
     """Extract middle frame from video as thumbnail for Instagram."""
     print("📸 Generating thumbnail...")